@@ -7,6 +7,8 @@ from os import path
 language = path.join(os.getcwd(), "resources", "languages")
 samples = path.join(os.getcwd(), "resources", "samples")
 test_output = path.join(os.getcwd(), "tests", "output")
+# caches are kept within the repository whatever the working directory is
+language_snapshots = path.join(path.dirname(path.dirname(path.abspath(__file__))), "cache", "languages")
 
 try:
     with open('path_conf.json') as file:
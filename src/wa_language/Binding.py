@@ -1,50 +1,99 @@
 from collections.abc import Mapping
-from typing import Any, Dict, Iterator, Union
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
 
 from wa_typechecker import typechecked
 from wa_language.LangVar import LangVar
 
 
 class Binding(Mapping[LangVar, Any]):
+    """An immutable mapping of variables to their values
+
+    A binding keeps its own pairs in a flat tuple and shares the binding it was merged with
+    instead of copying it: values bound one variable after another (spreading) extend
+    the binding of the previous value by a pair, there are tens of thousands of them.
+    The own pairs override the shared ones, the order is the same as for merged dicts.
+
+    Tests:
+    >>> a, b, c = LangVar("a"), LangVar("b"), LangVar("c")
+    >>> binding = Binding({a: 1, b: 2}) | {c: 3} | Binding({a: 4})
+    >>> binding
+    Binding({LangVar('a'): 4, LangVar('b'): 2, LangVar('c'): 3})
+    >>> len(binding), binding[a], c in binding, LangVar("d") in binding
+    (3, 4, True, False)
+    >>> {b: 5} | binding == {a: 4, b: 2, c: 3}
+    True
+    """
+    __slots__ = ("__pairs", "__shared", "__len")
+
     @typechecked
     def __init__(self, data: Dict[LangVar, Any]):
-        # TODO: prevent copying for reliable sources
-        self.__data = data.copy()
+        self.__pairs = tuple(item for pair in data.items() for item in pair)
+        self.__shared = None
+        self.__len = len(data)
+
+    @classmethod
+    def _merged(cls, shared: Optional["Binding"], pairs: Tuple) -> "Binding":
+        """Binding of the flat pairs (with unique variables) over the shared binding"""
+        inst = cls.__new__(cls)
+        inst.__pairs = pairs
+        inst.__shared = shared
+        if shared is None:
+            inst.__len = len(pairs) // 2
+        else:
+            inst.__len = len(shared) + sum(1 for variable in pairs[::2] if variable not in shared)
+        return inst
+
+    @classmethod
+    def pair(cls, variable: LangVar, value: Any) -> "Binding":
+        """Binding of the only variable"""
+        return cls._merged(None, (variable, value))
 
     def __getitem__(self, lang_var) -> Any:
-        return self.__data[lang_var]
+        binding = self
+        while binding is not None:
+            pairs = binding.__pairs
+            for idx in range(0, len(pairs), 2):
+                if pairs[idx] == lang_var:
+                    return pairs[idx + 1]
+            binding = binding.__shared
+        raise KeyError(lang_var)
 
     def __iter__(self) -> Iterator[LangVar]:
-        return iter(self.__data)
+        own_variables = self.__pairs[::2]
+        if self.__shared is not None:
+            yield from self.__shared
+            own_variables = (variable for variable in own_variables if variable not in self.__shared)
+        yield from own_variables
 
     def __contains__(self, lang_var) -> bool:
-        return lang_var in self.__data
+        binding = self
+        while binding is not None:
+            if lang_var in binding.__pairs[::2]:
+                return True
+            binding = binding.__shared
+        return False
 
     def __len__(self) -> int:
-        return len(self.__data)
+        return self.__len
 
     @typechecked
     def __or__(self, other: Union['Binding', Dict[LangVar, Any]]) -> 'Binding':
-        if isinstance(other, Binding):
-            merged = self.__data | other.__data
-        elif isinstance(other, Dict):
-            merged = self.__data | other
+        if isinstance(other, (Binding, Dict)):
+            if len(other) == 0:
+                return self
+            return Binding._merged(self, tuple(item for pair in other.items() for item in pair))
         else:
             return NotImplemented
-        return Binding(merged)
 
     @typechecked
     def __ror__(self, other: Union['Binding', Dict[LangVar, Any]]) -> 'Binding':
-        if isinstance(other, Binding):
-            merged = other.__data | self.__data
-        elif isinstance(other, Dict):
-            merged = other | self.__data
+        if isinstance(other, (Binding, Dict)):
+            return Binding._merged(Binding(dict(other)), tuple(item for pair in self.items() for item in pair))
         else:
             return NotImplemented
-        return Binding(merged)
 
     def __repr__(self):
-        return f"{self.__class__.__name__}({repr(self.__data)})"
+        return f"{self.__class__.__name__}({repr(dict(self.items()))})"
 
 
 EMPTY_BINDING = Binding(dict())
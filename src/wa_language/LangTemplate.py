@@ -0,0 +1,127 @@
+from typing import Any, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+
+from wa_typechecker import typechecked
+from .syntax.IdentifierExpression import IdentifierExpression
+from .syntax.Interpolation import Interpolation
+from .LangValue import LangValue, build_variables_and_conditions
+from .LangVar import LangVar
+from .Binding import Binding
+from .Spreading import Spread
+
+
+class LangTemplate:
+    """Text of a LangValue compiled into literal parts and slots of variables
+
+    A template renders texts of the value bound with variable values
+    without building LangValues (and their interpolations) for all the values of a spread,
+    so only the chosen values have to be bound.
+    Rendered texts are the same as texts of the bound LangValues:
+    unbound slots are rendered as their expressions (like "{reg1}").
+
+    Tests:
+    >>> from wa_language.Language import Language
+    >>> from wa_language.LangKey import LangKey
+    >>> from wa_types import LanguageCode
+    >>> lang = Language({}, LanguageCode.EN)
+    >>> value = LangValue("{reg1} of {reg2}, {reg1}", lang, LangKey("str_date"))
+    >>> day, year = LangVar("reg1"), LangVar("reg2")
+    >>> template = LangTemplate.compile(value, (day, year))
+    >>> template.render({year: 1257})
+    '{reg1} of 1257, {reg1}'
+    >>> str(template.bind({year: 1257, day: 2})) == str(value.bind(year, 1257).bind(day, 2)) == '2 of 1257, 2'
+    True
+    >>> LangTemplate.compile(LangValue("{reg3?{reg1}:none}", lang, LangKey("str_nested")), (day,)) is None
+    True
+
+    Bindings are spread with the cardinality of LangValue.spread:
+    >>> bindings = template.spread([{}], day, Spread(1, 2))
+    >>> [template.render(binding) for binding in bindings] == [str(v) for v in value.spread(day, Spread(1, 2))]
+    True
+    >>> template.spread(bindings, LangVar("s1"), Spread("a", "b", "c")) == bindings  # s1 is not in the value
+    True
+    """
+    @typechecked
+    def __init__(self, value: LangValue, parts: Tuple[str, ...], slots: Tuple[Tuple[LangVar, str], ...]):
+        """
+        :param parts: Literal parts around the slots, one more than the slots.
+        :param slots: Variables of the slots and their unbound texts.
+        """
+        assert len(parts) == len(slots) + 1
+        self.__value = value
+        self.__parts = parts
+        self.__slots = slots
+        self.__variables = frozenset(variable for variable, _ in slots)
+
+    @classmethod
+    @typechecked
+    def compile(cls, value: LangValue, variables: Iterable[LangVar]) -> Optional["LangTemplate"]:
+        """Compile the value with slots of the variables
+
+        Returns None if some of the variables is used within a conditional expression,
+        which text depends on a binding in other ways than a substitution.
+        So every variable of the value among the variables is a slot.
+        """
+        variables = frozenset(variables)
+        parts: List[str] = []
+        slots: List[Tuple[LangVar, str]] = []
+        literal: List[str] = []
+        for item in value._interpolation.items:
+            if isinstance(item, IdentifierExpression) and LangVar(item.identifier) in variables:
+                parts.append("".join(literal))
+                literal.clear()
+                slots.append((LangVar(item.identifier), str(item)))
+                continue
+            if not isinstance(item, (str, IdentifierExpression)):
+                item_variables = set()
+                build_variables_and_conditions(Interpolation((item,)), item_variables, set())
+                if item_variables & variables:
+                    return None
+            literal.append(str(item))
+        parts.append("".join(literal))
+        if not variables & value.variables <= {variable for variable, _ in slots}:
+            return None
+        return cls(value, tuple(parts), tuple(slots))
+
+    @property
+    def value(self) -> LangValue:
+        return self.__value
+
+    @property
+    def variables(self) -> FrozenSet[LangVar]:
+        """Variables of the slots"""
+        return self.__variables
+
+    @property
+    def parts(self) -> Tuple[str, ...]:
+        """Literal parts around the slots"""
+        return self.__parts
+
+    @property
+    def slots_variables(self) -> Tuple[LangVar, ...]:
+        """Variables of the slots in the order of the text"""
+        return tuple(variable for variable, _ in self.__slots)
+
+    def spread(self,
+               bindings: List[Mapping[LangVar, Any]],
+               variable: LangVar,
+               variable_values: Spread) -> List[Mapping[LangVar, Any]]:
+        """The bindings spread with the variable values as LangValue.spread does
+
+        A variable that is not in the value doesn't multiply values: every binding is kept once.
+        """
+        if variable not in self.__variables:
+            return bindings
+        return [{**binding, variable: value} for binding in bindings for value in variable_values]
+
+    def render(self, binding: Mapping[LangVar, Any]) -> str:
+        """Text of the value bound with the binding"""
+        pieces = [self.__parts[0]]
+        for (variable, unbound_text), part in zip(self.__slots, self.__parts[1:]):
+            pieces.append(str(binding[variable]) if variable in binding else unbound_text)
+            pieces.append(part)
+        return "".join(pieces)
+
+    def bind(self, binding: Mapping[LangVar, Any]) -> LangValue:
+        """The value bound with the binding as LangValue.bind does"""
+        return self.__value.bind(Binding({variable: value for variable, value in binding.items()
+                                          if variable in self.__variables}))
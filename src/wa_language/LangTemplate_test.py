@@ -0,0 +1,48 @@
+import pytest
+
+from wa_language.Language import RootLanguage
+from wa_language.LangKey import LangKey
+from wa_language.LangTemplate import LangTemplate
+from wa_language.LangVar import LangVar, PlayerSexVar
+from wa_language.Spreading import Spread, Spreading
+from wa_types import LanguageCode
+
+REG_1 = LangVar("reg1")
+REG_2 = LangVar("reg2")
+S_1 = LangVar("s1")
+
+SPREADING = Spreading({REG_1: Spread(1, 2, 3),
+                       S_1: Spread("Ada", "Bjorn"),
+                       REG_2: Spread(range(1257, 1259))})
+
+LANG = RootLanguage({"both": "{reg1} of {reg2}",
+                     "twice": "{reg1}, {reg1} and {s1}",
+                     "absent": "Nothing to spread here",
+                     "last_absent": "{s1} rides",
+                     "condition": "{reg1?{s1}:nobody}",
+                     "sex": "{s1} is {sir/madam}"},
+                    LanguageCode.EN)
+
+
+def template_spread(template, spreading):
+    bindings = [{}]
+    for variable, variable_values in spreading.items():
+        bindings = template.spread(bindings, variable, variable_values)
+    return bindings
+
+
+@pytest.mark.parametrize("key", ["both", "twice", "absent", "last_absent"])
+def test_spread_is_the_one_of_lang_value(key):
+    value = LANG[LangKey(key)]
+    template = LangTemplate.compile(value, SPREADING)
+    bindings = template_spread(template, SPREADING)
+    expected = [str(spread_value) for spread_value in value.spread(SPREADING)]
+    # the same cardinality and order, variables absent from the value don't multiply bindings
+    assert [template.render(binding) for binding in bindings] == expected
+    assert [str(template.bind(binding)) for binding in bindings] == expected
+
+
+def test_conditions_are_not_compiled():
+    assert LangTemplate.compile(LANG[LangKey("condition")], SPREADING) is None
+    assert LangTemplate.compile(LANG[LangKey("sex")], {S_1, PlayerSexVar}) is None
+    assert LangTemplate.compile(LANG[LangKey("sex")], {S_1}) is not None
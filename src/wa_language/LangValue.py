@@ -1,5 +1,5 @@
 from functools import partial
-from typing import overload, Any, FrozenSet, Iterable, Iterator, List, Mapping, NamedTuple, Set, Union, TYPE_CHECKING
+from typing import overload, Any, FrozenSet, Iterable, Iterator, List, Mapping, NamedTuple, Set, Tuple, Union, TYPE_CHECKING
 import logging
 
 from wa_typechecker import typechecked
@@ -18,26 +18,58 @@ if TYPE_CHECKING:
     from .Language import Language
 
 
+# marks a literal interpolation of a value
+_LITERAL = object()
+_NO_VARIABLES: FrozenSet[LangVar] = frozenset()
+
+
 class LangValue(str):
+    """A value of a language
+
+    A value created from a source string parses its interpolation on the first use
+    (binding, spreading, variables and conditions), so values the models never touch are not parsed.
+    Values are slotted, there are tens of thousands of them in spreads of gossip and calendar models.
+    Bound values are cached by the bind cache of the language, so repeated bindings
+    of a value return the same bound value.
+    """
+    __slots__ = ("__interpolation", "__lang", "__key", "__variables", "__conditions")
+
     @typechecked
     def __new__(cls, source: Union[str, Interpolation], lang: "Language", key: LangKey):
+        variables = conditions = None
         if isinstance(source, Interpolation):
             inst = super().__new__(cls, str(source))
-            inst._interpolation = source
+            if not source.raw and (source.items == () or
+                                   len(source.items) == 1 and type(source.items[0]) is str and source.items[0]):
+                # a literal interpolation (a fully bound value) duplicates the text, it's rebuilt on demand
+                inst.__interpolation = _LITERAL
+                variables = conditions = _NO_VARIABLES
+            else:
+                inst.__interpolation = source
         else:
             inst = super().__new__(cls, source)
-            try:
-                inst._interpolation = Interpolation(source)
-            except LangSyntaxError as error:
-                logging.getLogger(__name__).warning(
-                    f"Syntax error. Use raw mode with value: '{key}|{source}' Error: {error}")
-                inst._interpolation = Interpolation(source, raw=True)
+            inst.__interpolation = None
         inst.__lang = lang
         inst.__key = key
-        inst.__variables = None
-        inst.__conditions = None
+        inst.__variables = variables
+        inst.__conditions = conditions
         return inst
 
+    @property
+    def _interpolation(self) -> Interpolation:
+        if self.__interpolation is _LITERAL:
+            source = str.__str__(self)
+            return Interpolation((source,) if source else ())
+        if self.__interpolation is None:
+            source = str.__str__(self)
+            try:
+                self.__interpolation = Interpolation(source)
+            except LangSyntaxError as error:
+                logging.getLogger(__name__).warning(
+                    f"Syntax error. Use raw mode with value: '{self.__key}|{source}' Error: {error}")
+                self.__interpolation = Interpolation(source, raw=True)
+        return self.__interpolation
+
     @property
     def key(self) -> LangKey:
         return self.__key
@@ -74,11 +106,30 @@ class LangValue(str):
         if kwargs:
             raise TypeError("Keyword arguments are not supported")
         if len(args) == 2:
-            return self._bind_with_pair(*args)
+            bind = self._bind_with_pair
+            binding_items = (args,)
         elif len(args) == 1:
-            return self._bind_with_binding(args[0])
+            bind = self._bind_with_binding
+            if not isinstance(args[0], Binding):
+                return bind(*args)
+            binding_items = args[0].items()
         else:
             raise TypeError(f"bind got insufficient args: {', '.join(repr(arg) for arg in args)}")
+        # values are keyed with their types: True and 1 or "" and TRUE_EMPTY_STR are bound differently
+        cache_key = (self._bind_key(), tuple((var, type(val), val) for var, val in binding_items))
+        try:
+            bound_value = self.__lang.bind_cache.get(cache_key)
+        except TypeError:
+            # unhashable values are not cached
+            return bind(*args)
+        if bound_value is None:
+            bound_value = bind(*args)
+            self.__lang.bind_cache.put(cache_key, bound_value)
+        return bound_value
+
+    def _bind_key(self) -> Tuple:
+        """Key of the value within the bind cache of the language"""
+        return self, self.__key
 
     @overload
     def spread(self, variable: LangVar, value_spread: Spread) -> Iterator["LangValue"]:
@@ -123,7 +174,7 @@ class LangValue(str):
         bound_interpolation = bind_interpolation_with_pair(self._interpolation,
                                                            variable=variable,
                                                            value=value)
-        binding = Binding({variable: value})
+        binding = Binding.pair(variable, value)
         return LangValueBound(interpolation=bound_interpolation,
                               binding=binding,
                               origin=self)
@@ -173,17 +224,26 @@ class LangValue(str):
 
 
 class LangValueBound(LangValue):
+    __slots__ = ("__binding", "__origin", "__bind_key")
+
     @typechecked
     def __new__(cls, interpolation: Interpolation, binding: Binding, origin: LangValue):
         inst = super().__new__(cls, interpolation, origin.lang, origin.key)
         inst.__binding = binding
         inst.__origin = origin
+        inst.__bind_key = None
         return inst
 
     @property
     def binding(self) -> Binding:
         return self.__binding
 
+    def _bind_key(self) -> Tuple:
+        if self.__bind_key is None:
+            self.__bind_key = (self.__origin, self.__origin.key,
+                               tuple((var, type(val), val) for var, val in self.__binding.items()))
+        return self.__bind_key
+
     @typechecked
     def _bind_with_pair(self, variable: LangVar, value: Any) -> "LangValue":
         if variable in self.__binding:
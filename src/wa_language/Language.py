@@ -1,25 +1,40 @@
 from collections.abc import Mapping
+import logging
 from os import path
 from typing import Dict, Iterator, Optional
 
-from wa_types import LanguageCode
+from wa_types import LanguageCode, LRUCache
 from wa_typechecker import typechecked
 from . import loader
+from . import snapshot as lang_snapshot
 from .LangKey import LangKey
 from .LangValue import LangValue
 
 
 class Language(Mapping[LangKey, LangValue]):
+    # bound values cached by a language
+    BIND_CACHE_SIZE = 8192
+
     @typechecked
     def __init__(self, data: Dict[LangKey, LangValue], language_code: LanguageCode):
         self.__data = data
         self.__language_code = language_code
+        self.__bind_cache = LRUCache(self.BIND_CACHE_SIZE)
 
     @property
     @typechecked
     def language_code(self) -> LanguageCode:
         return self.__language_code
 
+    @property
+    def bind_cache(self) -> LRUCache:
+        """Values bound by LangValue.bind keyed by the values and their bindings, with hit/miss counters
+
+        The cache of a root language is used by all the values of the language and their bound values
+        (including values of language models).
+        """
+        return self.__bind_cache
+
     def __getitem__(self, lang_key) -> LangValue:
         return self.__data[lang_key]
 
@@ -47,15 +62,36 @@ class RootLanguage(Language):
 
 
 @typechecked
-def load(language_code: LanguageCode, special_language: Optional[Dict[str, str]] = None) -> Language:
+def load(language_code: LanguageCode,
+         special_language: Optional[Dict[str, str]] = None,
+         snapshot: bool = True) -> Language:
+    """
+    :param language_code: Code of the language, its csv files are loaded from path_conf.language.
+    :param special_language: An additional language that is not present in the files or uses special keys.
+    :param snapshot: Load the language from a snapshot at path_conf.language_snapshots
+                     if the snapshot is up-to-date with the files, otherwise load the files and save the snapshot.
+    """
     import path_conf
     lang_dir_path = path.join(path_conf.language, str(language_code))
     lang_file_paths = loader.find_files(lang_dir_path)
     if len(lang_file_paths) == 0:
         raise ValueError(f"No csv files found at {lang_dir_path}")
-    lang = loader.load_files(*lang_file_paths, special_language=special_language)
-    if len(lang) == (len(special_language) if special_language else 0):
-        raise ValueError(f"Empty lang is loaded by {lang_dir_path}")
+    if snapshot:
+        snapshot_path = path.join(path_conf.language_snapshots,
+                                  lang_snapshot.file_name(str(language_code), special_language))
+        snapshot_key = lang_snapshot.snapshot_key(*lang_file_paths, special_language=special_language)
+        loaded = lang_snapshot.load(snapshot_path, snapshot_key)
+        if loaded is not None:
+            lang, warnings = loaded
+            lang_snapshot.replay(warnings)
+            return RootLanguage(lang, language_code)
+    with lang_snapshot.WarningsRecorder(__package__) as recorder:
+        lang = loader.load_files(*lang_file_paths, special_language=special_language)
+        if len(lang) == (len(special_language) if special_language else 0):
+            raise ValueError(f"Empty lang is loaded by {lang_dir_path}")
+    # warnings are replayed from a snapshot, so it's not saved if they were not recorded
+    if snapshot and logging.getLogger(__package__).isEnabledFor(logging.WARNING):
+        lang_snapshot.save(snapshot_path, snapshot_key, lang, recorder.warnings)
     return RootLanguage(lang, language_code)
 
 
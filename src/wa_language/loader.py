@@ -1,3 +1,5 @@
+from concurrent.futures import ThreadPoolExecutor
+import io
 import logging
 import os
 import re
@@ -10,13 +12,43 @@ from wa_typechecker import typechecked
 
 logger = logging.getLogger(__name__)
 
+# encodings are detected by a prefix of a file, the whole file is used if the prefix is not enough
+DETECTION_PREFIX_SIZE = 64 * 1024
+
+
+def read_lines(file_path: str, encoding: Optional[str] = None) -> List[str]:
+    """
+    Read a file once and decode its lines (with universal newlines as the built-in 'open' does).
+
+    :param file_path: Path to the file.
+    :param encoding: Encoding of the file or None to detect it by chardet.
+    :return: Lines of the file.
+    """
+    with open(file_path, 'rb') as file:
+        raw_data = file.read()
+    detected = encoding is None
+    if detected:
+        encoding = chardet.detect(raw_data[:DETECTION_PREFIX_SIZE])["encoding"]
+    try:
+        return list(io.TextIOWrapper(io.BytesIO(raw_data), encoding=encoding))
+    except UnicodeDecodeError:
+        if not detected or len(raw_data) <= DETECTION_PREFIX_SIZE:
+            raise
+    # the prefix is decoded by a narrower encoding (e.g. ascii for utf-8) than the whole file
+    encoding = chardet.detect(raw_data)["encoding"]
+    return list(io.TextIOWrapper(io.BytesIO(raw_data), encoding=encoding))
+
 
 @typechecked
-def load_files(*args: str, special_language: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+def load_files(*args: str,
+               special_language: Optional[Dict[str, str]] = None,
+               encoding: Optional[str] = None,
+               max_workers: Optional[int] = None) -> Dict[str, str]:
     """
     :param args: Paths to the files to be loaded.
     :param special_language: An additional language that is not present in the files or uses special keys.
-    :param encoding: Encoding value passed to the built-in 'open' function.
+    :param encoding: Encoding of all the files or None to detect encodings of the files.
+    :param max_workers: The number of threads reading and decoding the files (default of ThreadPoolExecutor).
     :return: A dictionary loaded from the files and optionally extended with the additional language if provided.
     """
     language = special_language.copy() if special_language else {}
@@ -28,14 +60,12 @@ def load_files(*args: str, special_language: Optional[Dict[str, str]] = None) ->
         del language['']
     dup_keys = set()
     source_str = lambda file_path, number: f"{file_path}:{number}"
-    for file_path in args:
-        encoding = None
-        # TODO: prevent twice opening a *.csv file
-        with open(file_path, 'rb') as file:
-            raw_data = file.read()
-            encoding = chardet.detect(raw_data)["encoding"]
-        with open(file_path, encoding=encoding) as file:
-            for number, line in enumerate(file, start=1):
+    # files are read and decoded concurrently, but merged in the order of the paths,
+    # so the first of duplicated keys wins and warnings are logged in the same order
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="LangLoader") as executor:
+        files_lines = executor.map(lambda file_path: read_lines(file_path, encoding), args)
+        for file_path, lines in zip(args, files_lines):
+            for number, line in enumerate(lines, start=1):
                 line = line.rstrip()  # remove "\n" at the end of each line
                 pos = line.find("|")
                 if pos < 0:
@@ -76,7 +106,7 @@ def find_files(*args: str) -> List[str]:
     return file_paths
 
 
-__all__ = ["load_files", "find_files"]
+__all__ = ["read_lines", "load_files", "find_files"]
 
 
 if __name__ == "__main__":
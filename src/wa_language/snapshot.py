@@ -0,0 +1,185 @@
+"""
+Snapshots of loaded languages.
+
+Loading of a language detects encodings of all its csv files, decodes and splits their lines.
+A snapshot keeps the loaded values and the warnings logged by the loading,
+so later loads of the same files are a single read of the snapshot
+(the warnings are logged again). Values are parsed lazily by LangValue anyway.
+
+A snapshot is keyed by the paths, sizes and modification times of the csv files,
+the special language and the version of the code that loads languages,
+so a snapshot of changed files or code is just rebuilt.
+
+A snapshot is a json file (no code is executed by loading it): a header line of the key
+and a digest of the rest of the file, then the values and the warnings.
+A snapshot that is truncated, altered or not of the expected structure is rebuilt too.
+
+Tests:
+>>> import tempfile
+>>> from os import path
+>>> with tempfile.TemporaryDirectory() as dir_path:
+...     csv_path = path.join(dir_path, "test.csv")
+...     with open(csv_path, "w") as file:
+...         _ = file.write("hello|Hello {sir/madam}\\n")
+...     key = snapshot_key(csv_path, special_language=None)
+...     snapshot_path = path.join(dir_path, "en.json")
+...     save(snapshot_path, key, {"hello": "Hello {sir/madam}"}, warnings=[("wa_language", 30, "odd")])
+...     data, warnings = load(snapshot_path, key)
+...     missed = load(snapshot_path, snapshot_key(csv_path, special_language={"wa_player": "Snow"}))
+...     with open(snapshot_path, "r+b") as file:
+...         _ = file.seek(-3, 2)
+...         _ = file.write(b"Bye")
+...     altered = load(snapshot_path, key)
+>>> data
+{'hello': 'Hello {sir/madam}'}
+>>> warnings
+[('wa_language', 30, 'odd')]
+>>> missed is None and altered is None
+True
+"""
+import hashlib
+import json
+import logging
+import os
+from os import path
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from wa_typechecker import typechecked
+
+# bump it when the format of snapshots changes
+SNAPSHOT_VERSION = 3
+
+logger = logging.getLogger(__name__)
+
+Warnings = List[Tuple[str, int, str]]
+
+_code_version = None
+
+
+def code_version() -> str:
+    """Digest of the sources that load languages"""
+    global _code_version
+    if _code_version is None:
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{SNAPSHOT_VERSION}|{sys.version_info[:2]}|".encode())
+        package_path = path.dirname(path.abspath(__file__))
+        for dir_path in (package_path, path.join(package_path, "syntax")):
+            for file_name in sorted(os.listdir(dir_path)):
+                if file_name.endswith(".py"):
+                    with open(path.join(dir_path, file_name), "rb") as file:
+                        digest.update(file.read())
+        _code_version = digest.hexdigest()
+    return _code_version
+
+
+@typechecked
+def snapshot_key(*file_paths: str, special_language: Optional[Dict[str, str]]) -> str:
+    """
+    :param file_paths: Paths to the csv files of a language.
+    :param special_language: An additional language passed to the loading.
+    :return: A key of a snapshot of the language.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(code_version().encode())
+    for file_path in file_paths:
+        stat = os.stat(file_path)
+        digest.update(f"|{file_path}|{stat.st_size}|{stat.st_mtime_ns}".encode())
+    if special_language:
+        for key, val in special_language.items():
+            digest.update(f"|{key}|{val}".encode())
+    return digest.hexdigest()
+
+
+@typechecked
+def file_name(language_code: str, special_language: Optional[Dict[str, str]]) -> str:
+    """Name of the snapshot file of a language, languages with different special languages don't overwrite each other
+
+    Tests:
+    >>> file_name("en", None)
+    'en.json'
+    >>> file_name("en", {"wa_player": "Snow"}) == file_name("en", {"wa_player": "Snow"}) != file_name("en", None)
+    True
+    >>> file_name("en", {"wa_player": "Snow"}) != file_name("en", {"wa_player": "Sid"})
+    True
+    """
+    if not special_language:
+        return f"{language_code}.json"
+    digest = hashlib.blake2b(digest_size=4)
+    for key, val in special_language.items():
+        digest.update(f"|{key}|{val}".encode())
+    return f"{language_code}_{digest.hexdigest()}.json"
+
+
+@typechecked
+def load(file_path: str, key: str) -> Optional[Tuple[Dict[str, str], Warnings]]:
+    """
+    :return: Values by keys and the warnings of the loading
+             or None if there is no valid snapshot with the key.
+    """
+    if not path.isfile(file_path):
+        return None
+    try:
+        with open(file_path, "rb") as file:
+            # the header is read first, so data of a stale snapshot is not read
+            header = json.loads(file.readline())
+            if header["key"] != key:
+                return None
+            payload = file.read()
+        if hashlib.blake2b(payload, digest_size=16).hexdigest() != header["digest"]:
+            raise ValueError("digest mismatch")
+        data, warnings = json.loads(payload)
+        if not isinstance(data, dict) or not all(isinstance(lang_key, str) and isinstance(val, str)
+                                                 for lang_key, val in data.items()):
+            raise ValueError("values are not strings by strings")
+        warnings = [(logger_name, level, message) for logger_name, level, message in warnings]
+        if not all(isinstance(logger_name, str) and isinstance(level, int) and isinstance(message, str)
+                   for logger_name, level, message in warnings):
+            raise ValueError("malformed warnings")
+        return data, warnings
+    except Exception as error:
+        logger.warning(f"Could not load language snapshot {file_path}: {error}")
+        return None
+
+
+@typechecked
+def save(file_path: str, key: str, data: Dict[str, str], warnings: Warnings):
+    try:
+        os.makedirs(path.dirname(file_path), exist_ok=True)
+        # languages could be loaded by several processes at once (like BatchAnalyzer workers)
+        tmp_file_path = f"{file_path}.{os.getpid()}.tmp"
+        payload = json.dumps((data, warnings), ensure_ascii=False, separators=(",", ":")).encode()
+        header = json.dumps({"key": key, "digest": hashlib.blake2b(payload, digest_size=16).hexdigest()})
+        with open(tmp_file_path, "wb") as file:
+            file.write(header.encode() + b"\n")
+            file.write(payload)
+        os.replace(tmp_file_path, file_path)
+    except OSError as error:
+        logger.warning(f"Could not save language snapshot {file_path}: {error}")
+
+
+class WarningsRecorder(logging.Handler):
+    """Records warnings logged within a logger tree to replay them on loading of a snapshot"""
+    def __init__(self, logger_name: str):
+        super().__init__(level=logging.WARNING)
+        self.__logger = logging.getLogger(logger_name)
+        self.warnings: Warnings = []
+
+    def emit(self, record: logging.LogRecord):
+        self.warnings.append((record.name, record.levelno, record.getMessage()))
+
+    def __enter__(self):
+        self.__logger.addHandler(self)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.__logger.removeHandler(self)
+
+
+@typechecked
+def replay(warnings: Warnings):
+    for logger_name, level, message in warnings:
+        logging.getLogger(logger_name).log(level, message)
+
+
+__all__ = ["SNAPSHOT_VERSION", "code_version", "snapshot_key", "file_name", "load", "save", "WarningsRecorder", "replay"]
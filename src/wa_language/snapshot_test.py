@@ -0,0 +1,86 @@
+import logging
+import os
+from os import path
+
+import pytest
+
+import path_conf
+from wa_language import Language
+from wa_language import snapshot
+from wa_types import LanguageCode
+
+
+@pytest.fixture
+def language_dir(tmp_path, monkeypatch):
+    """A language of one csv file and an empty snapshots directory"""
+    language_path = tmp_path / "languages"
+    (language_path / str(LanguageCode.EN)).mkdir(parents=True)
+    monkeypatch.setattr(path_conf, "language", str(language_path))
+    monkeypatch.setattr(path_conf, "language_snapshots", str(tmp_path / "snapshots"))
+    # snapshots are saved only if the warnings of loading are recorded
+    monkeypatch.setattr(logging.getLogger("wa_language"), "level", logging.WARNING)
+    csv_path = language_path / str(LanguageCode.EN) / "test.csv"
+    write_csv(csv_path, "Hello")
+    return csv_path
+
+
+def write_csv(csv_path, hello: str, mtime_ns: int = 1_000_000_000_000_000_000):
+    csv_path.write_text(f"hello|{hello} {{sir/madam}}\n")
+    os.utime(csv_path, ns=(mtime_ns, mtime_ns))
+
+
+def snapshot_files():
+    return sorted(os.listdir(path_conf.language_snapshots))
+
+
+def test_snapshot_is_loaded(language_dir, monkeypatch):
+    assert str(Language.load(LanguageCode.EN)["hello"]) == "Hello {sir/madam}"
+    assert snapshot_files() == ["en.json"]
+    # csv files are not loaded again
+    monkeypatch.setattr(Language.loader, "load_files", None)
+    assert str(Language.load(LanguageCode.EN)["hello"]) == "Hello {sir/madam}"
+
+
+def test_snapshot_is_invalidated_by_files(language_dir):
+    Language.load(LanguageCode.EN)
+    # the same size, another modification time
+    write_csv(language_dir, "Howdy", mtime_ns=2_000_000_000_000_000_000)
+    assert str(Language.load(LanguageCode.EN)["hello"]) == "Howdy {sir/madam}"
+    # another size, the same modification time
+    write_csv(language_dir, "Good day", mtime_ns=2_000_000_000_000_000_000)
+    assert str(Language.load(LanguageCode.EN)["hello"]) == "Good day {sir/madam}"
+    # another file
+    (language_dir.parent / "more.csv").write_text("bye|Bye\n")
+    assert str(Language.load(LanguageCode.EN)["bye"]) == "Bye"
+    assert snapshot_files() == ["en.json"]
+
+
+def test_snapshot_is_invalidated_by_code_version(language_dir, monkeypatch):
+    Language.load(LanguageCode.EN)
+    snapshot_path = path.join(path_conf.language_snapshots, "en.json")
+    key = snapshot.snapshot_key(str(language_dir), special_language=None)
+    assert snapshot.load(snapshot_path, key) is not None
+    monkeypatch.setattr(snapshot, "_code_version", "another code version")
+    assert snapshot.load(snapshot_path, snapshot.snapshot_key(str(language_dir), special_language=None)) is None
+
+
+def test_snapshots_by_special_language(language_dir):
+    Language.load(LanguageCode.EN)
+    snow = Language.load(LanguageCode.EN, {"wa_player": "Snow"})
+    sid = Language.load(LanguageCode.EN, {"wa_player": "Sid"})
+    assert (str(snow["wa_player"]), str(sid["wa_player"])) == ("Snow", "Sid")
+    # snapshots of different special languages don't overwrite each other
+    assert len(snapshot_files()) == 3
+    assert "wa_player" not in Language.load(LanguageCode.EN)
+    assert str(Language.load(LanguageCode.EN, {"wa_player": "Snow"})["wa_player"]) == "Snow"
+    assert len(snapshot_files()) == 3
+
+
+def test_broken_snapshot_is_rebuilt(language_dir):
+    Language.load(LanguageCode.EN)
+    snapshot_path = path.join(path_conf.language_snapshots, "en.json")
+    with open(snapshot_path, "r+b") as file:
+        file.truncate(os.path.getsize(snapshot_path) // 2)
+    assert str(Language.load(LanguageCode.EN)["hello"]) == "Hello {sir/madam}"
+    key = snapshot.snapshot_key(str(language_dir), special_language=None)
+    assert snapshot.load(snapshot_path, key) is not None
@@ -4,6 +4,8 @@ from .Expression import Expression
 
 class BinaryExpression(Expression):
     """A binary expression. See details in module description."""
+    __slots__ = ()
+
     @typechecked
     def __init__(self, left: str, right: str):
         super().__init__((left, right))
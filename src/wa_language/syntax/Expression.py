@@ -5,6 +5,8 @@ from wa_typechecker import typechecked
 
 
 class Expression(ABC):
+    __slots__ = ("__items",)
+
     @typechecked
     def __init__(self, items: Tuple[Hashable, ...]):
         self.__items = items
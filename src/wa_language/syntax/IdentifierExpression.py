@@ -4,6 +4,8 @@ from .Expression import Expression
 
 class IdentifierExpression(Expression):
     """An identifier expression. See details in module description."""
+    __slots__ = ()
+
     @typechecked
     def __init__(self, identifier: str):
         super().__init__((identifier,))
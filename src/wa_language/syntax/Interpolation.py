@@ -77,6 +77,7 @@ True
  and welcome
 """
 
+import sys
 from typing import Tuple, Union
 
 from wa_typechecker import typechecked
@@ -84,6 +85,8 @@ from .Expression import Expression
 
 
 class Interpolation:
+    __slots__ = ("__items", "__raw")
+
     @typechecked
     def __init__(self, source: Union[str, Tuple[Union[Expression, str], ...]], raw: bool = False):
         """
@@ -92,7 +95,9 @@ class Interpolation:
         """
         if not raw:
             if isinstance(source, str):
-                items = parse_interpolation(source)
+                # literal segments are interned, the same ones are shared by values and their bound values
+                items = tuple(sys.intern(item) if type(item) is str else item
+                              for item in parse_interpolation(source))
             else:
                 items = source
         else:
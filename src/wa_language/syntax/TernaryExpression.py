@@ -8,6 +8,8 @@ if TYPE_CHECKING:
 
 class TernaryExpression(Expression):
     """A ternary expression. See details in module description."""
+    __slots__ = ()
+
     @typechecked
     def __init__(self, condition: str, true_part: "Interpolation", false_part: "Interpolation"):
         super().__init__((condition, true_part, false_part))
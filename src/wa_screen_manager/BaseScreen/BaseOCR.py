@@ -1,13 +1,18 @@
 from abc import ABC, abstractmethod
 from enum import Enum
+import hashlib
+import inspect
 import logging
-from typing import Union
+from typing import Optional, Union
 
 import numpy as np
-import pytesseract
 from wa_typechecker import typechecked
 
 from wa_types import Box, Resolution, is_screenshot, LanguageCode
+from .TesseractEngine import TesseractEngine, tesseract_engine
+from .OCRCache import ocr_cache
+from .GlyphAtlas import GlyphAtlas
+from .StabilityTracker import StabilityTracker
 
 
 class NonStableType(Enum):
@@ -17,15 +22,49 @@ class NonStableType(Enum):
 NonStable = NonStableType.NonStable
 
 
+@typechecked
+def diff_extent(diff: np.ndarray, margin: int = 0) -> Optional[Box]:
+    """Bounding box of non-zero pixels of a diff image extended by the margin (within the image)
+
+    Row and column projections are used to find the extent.
+    Returns None if the diff image has no non-zero pixels.
+
+    Tests:
+    >>> diff = np.zeros((10, 20), dtype=np.uint8)
+    >>> diff_extent(diff) is None
+    True
+    >>> diff[3:5, 6:9] = 1
+    >>> diff_extent(diff)
+    Box(l=6, t=3, r=9, b=5)
+    >>> diff_extent(diff, margin=4)
+    Box(l=2, t=0, r=13, b=9)
+    """
+    rows = np.flatnonzero(diff.any(axis=1))
+    if rows.size == 0:
+        return None
+    cols = np.flatnonzero(diff.any(axis=0))
+    height, width = diff.shape[:2]
+    return Box(l=max(int(cols[0]) - margin, 0),
+               t=max(int(rows[0]) - margin, 0),
+               r=min(int(cols[-1]) + 1 + margin, width),
+               b=min(int(rows[-1]) + 1 + margin, height))
+
+
 class BaseOCR(ABC):
     @typechecked
     def __init__(self,
                  resolution: Resolution,
                  crop_box: Box,
                  language_code: LanguageCode,
-                 whitelist: str):
+                 whitelist: str,
+                 stable_frames: int = 2):
+        """
+        :param stable_frames: A number of consecutive screenshots the crop must stay the same within
+               to be recognized.
+        """
         self._logger = logging.getLogger(f"{type(self).__module__}.{type(self).__name__}")
         self.__resolution = resolution
+        self.__crop_box = crop_box
         self.__crop_slice = crop_box.slice
         self.__whitelist = whitelist
         match language_code:
@@ -35,29 +74,99 @@ class BaseOCR(ABC):
                 self.__language_code = "rus"
             case _:
                 raise ValueError(f"Unknown language code: {language_code}")
-        self.__prev_crop_img = None
+        self.__engine = None
+        self.__glyph_atlas = None
+        # subclasses set up their preprocessing after the base initialization, so digests are got lazily
+        self.__preprocessing_digest = None
+        self.__cache_config = None
+        self.__stability_tracker = StabilityTracker(stable_frames)
         self.__prev_text_ocr = None
 
+    @property
+    def crop_box(self) -> Box:
+        return self.__crop_box
+
+    @property
+    def stable_frames(self) -> int:
+        """A number of consecutive screenshots the crop must stay the same within to be recognized"""
+        return self.__stability_tracker.stable_frames
+
     @typechecked
     def ocr(self, img: np.ndarray) -> Union[str, NonStableType]:
         assert is_screenshot(img, self.__resolution)
         crop_img = img[self.__crop_slice]
-        if not np.array_equal(crop_img, self.__prev_crop_img):
+        if not self.__stability_tracker.update(crop_img):
             self.__prev_text_ocr = NonStable
         elif self.__prev_text_ocr is NonStable:
-            preprocessed_img = self._preprocess(crop_img)
-            text_ocr = self._tesseract_ocr(preprocessed_img)
+            cache_key = ocr_cache.key(crop_img, self.cache_config)
+            text_ocr = ocr_cache.get(cache_key)
+            if text_ocr is None:
+                preprocessed_img = self._preprocess(crop_img)
+                text_ocr = self._recognize(preprocessed_img)
+                ocr_cache.put(cache_key, text_ocr)
             self.__prev_text_ocr = text_ocr
-        self.__prev_crop_img = crop_img
         return self.__prev_text_ocr
 
+    @property
+    def preprocessing_digest(self) -> str:
+        """Digest of the source of the preprocessing and of its result on a fixed pseudo-random crop
+
+        The result covers the data the preprocessing uses (like blank images).
+        """
+        if self.__preprocessing_digest is None:
+            digest = hashlib.blake2b(digest_size=8)
+            try:
+                digest.update(inspect.getsource(type(self)._preprocess).encode())
+            except OSError:
+                digest.update(type(self).__qualname__.encode())
+            crop_box = self.__crop_box
+            crop_img = np.random.default_rng(0).integers(0, 256,
+                                                         size=(crop_box.b - crop_box.t, crop_box.r - crop_box.l, 3),
+                                                         dtype=np.uint8)
+            digest.update(np.ascontiguousarray(self._preprocess(crop_img)).tobytes())
+            self.__preprocessing_digest = digest.hexdigest()
+        return self.__preprocessing_digest
+
+    @property
+    def cache_config(self) -> str:
+        """OCR results depend on the preprocessing, the language, the whitelist and the glyph atlas"""
+        if self.__cache_config is None:
+            self.__cache_config = (f"{type(self).__module__}.{type(self).__qualname__}|{self.preprocessing_digest}|"
+                                   f"{self.__language_code}|{self.__whitelist}")
+            if self.__glyph_atlas is not None:
+                self.__cache_config += f"|glyphs:{self.__glyph_atlas.digest}"
+        return self.__cache_config
+
+    @property
+    def engine(self) -> TesseractEngine:
+        # the engine is got lazily to load tesseract models within the process that uses them
+        if self.__engine is None:
+            self.__engine = tesseract_engine(language=self.__language_code,
+                                             whitelist=self.__whitelist)
+        return self.__engine
+
+    @property
+    def glyph_atlas(self) -> Optional[GlyphAtlas]:
+        """Bitmap-font OCR tried before Tesseract"""
+        return self.__glyph_atlas
+
+    @glyph_atlas.setter
+    @typechecked
+    def glyph_atlas(self, glyph_atlas: Optional[GlyphAtlas]):
+        self.__glyph_atlas = glyph_atlas
+        self.__cache_config = None
+
+    @typechecked
+    def _recognize(self, img: np.ndarray) -> str:
+        if self.__glyph_atlas is not None:
+            text = self.__glyph_atlas.ocr(img)
+            if text is not None:
+                return text
+        return self._tesseract_ocr(img)
+
     @typechecked
     def _tesseract_ocr(self, img: np.ndarray) -> str:
-        whitelist = self.__whitelist
-        oem = 1
-        pcm = 6
-        config = f'--oem {oem} --psm {pcm} -c tessedit_char_whitelist="{whitelist}"'
-        result = pytesseract.image_to_string(img, lang=self.__language_code, config=config)
+        result = self.engine.ocr(img)
         result = result.strip()
         return result
 
@@ -34,11 +34,28 @@ class BaseSampler:
         assert all(len(group) > 0 for group in sample_boxes)
         self._logger = logging.getLogger(f"{type(self).__module__}.{type(self).__name__}")
         self.__resolution = resolution
+        self.__sample_boxes = sample_boxes
+        self.__boxes = tuple(box for group in sample_boxes for box in group)
         sample_slices = [[box.slice for box in group] for group in sample_boxes]
         self.__samples = [[Sample(slice=slice_, image=sample_img[slice_])
                            for slice_ in group]
                           for group in sample_slices]
 
+    @property
+    def boxes(self) -> Tuple[Box, ...]:
+        """All the sample boxes of all the groups"""
+        return self.__boxes
+
+    @property
+    def sample_groups(self) -> Tuple[Tuple[Tuple[Box, np.ndarray], ...], ...]:
+        """Groups of sample boxes with their sample images"""
+        return tuple(tuple((box, sample.image) for box, sample in zip(box_group, group))
+                     for box_group, group in zip(self.__sample_boxes, self.__samples))
+
+    @property
+    def resolution(self) -> Resolution:
+        return self.__resolution
+
     @typechecked
     def check(self, image: np.ndarray) -> SampleMatch:
         assert is_screenshot(image, self.__resolution)
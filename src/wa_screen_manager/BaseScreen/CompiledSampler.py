@@ -0,0 +1,78 @@
+from typing import Sequence, Tuple
+
+import numpy as np
+from wa_typechecker import typechecked
+
+from wa_types import Resolution, is_screenshot
+from wa_screen_manager.SampleMatch import SampleMatch
+from .BaseSampler import BaseSampler
+
+
+class CompiledSampler:
+    """Several samplers checked at once
+
+    Boxes shared by samplers (the same box and the same sample pixels) are compared once per screenshot,
+    then the box matches are reduced to decisions of every sampler.
+    A box is compared exactly as bytes with the sample bytes prepared once
+    (bytes comparison is cheaper than numpy element-wise comparison of such small boxes).
+
+    Decisions are the same as BaseSampler.check ones:
+    MATCH if all boxes of some group match, DOUBT if some box matches, FAIL otherwise.
+
+    Tests:
+    >>> from wa_types import Box
+    >>> resolution = Resolution(8, 6)
+    >>> sample = np.zeros((6, 8, 3), dtype=np.uint8)
+    >>> a = BaseSampler(sample, resolution, ((Box(0, 0, 2, 2), Box(6, 4, 8, 6)),))
+    >>> b = BaseSampler(sample, resolution, ((Box(0, 0, 2, 2),), (Box(3, 3, 4, 4),)))
+    >>> compiled = CompiledSampler((a, b))
+    >>> compiled.check(sample)
+    (<SampleMatch.MATCH: 'match'>, <SampleMatch.MATCH: 'match'>)
+    >>> image = sample.copy(); image[5, 7] = 1
+    >>> compiled.check(image) == (a.check(image), b.check(image)) == (SampleMatch.DOUBT, SampleMatch.MATCH)
+    True
+    >>> image[0, 0] = 1
+    >>> compiled.check(image) == (a.check(image), b.check(image)) == (SampleMatch.FAIL, SampleMatch.MATCH)
+    True
+    """
+    @typechecked
+    def __init__(self, samplers: Sequence[BaseSampler]):
+        assert len(samplers) > 0
+        resolutions = {sampler.resolution for sampler in samplers}
+        assert len(resolutions) == 1
+        self.__resolution: Resolution = resolutions.pop()
+        box_idx_by_key = dict()
+        box_samples = []
+        sampler_groups = []
+        for sampler in samplers:
+            groups = []
+            for group in sampler.sample_groups:
+                group_box_idxes = []
+                for box, sample_image in group:
+                    key = (box, sample_image.tobytes())
+                    if key not in box_idx_by_key:
+                        box_idx_by_key[key] = len(box_samples)
+                        box_samples.append(key)
+                    group_box_idxes.append(box_idx_by_key[key])
+                groups.append(tuple(group_box_idxes))
+            sampler_groups.append(tuple(groups))
+        self.__box_samples = tuple((box.slice, sample_bytes) for box, sample_bytes in box_samples)
+        self.__sampler_groups = tuple(sampler_groups)
+        self.__sampler_boxes = tuple(tuple(sorted({idx for group in groups for idx in group}))
+                                     for groups in sampler_groups)
+
+    @property
+    def boxes_count(self) -> int:
+        """Count of distinct boxes compared per screenshot"""
+        return len(self.__box_samples)
+
+    @typechecked
+    def check(self, image: np.ndarray) -> Tuple[SampleMatch, ...]:
+        """Decisions of all the samplers in the order of their registration"""
+        assert is_screenshot(image, self.__resolution)
+        box_matches = [image[box_slice].tobytes() == sample_bytes
+                       for box_slice, sample_bytes in self.__box_samples]
+        return tuple(SampleMatch.MATCH if any(all(box_matches[idx] for idx in group) for group in groups)
+                     else SampleMatch.DOUBT if any(box_matches[idx] for idx in box_idxes)
+                     else SampleMatch.FAIL
+                     for groups, box_idxes in zip(self.__sampler_groups, self.__sampler_boxes))
@@ -0,0 +1,143 @@
+import math
+from typing import Callable, Dict, Hashable, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import rapidfuzz as fz
+from wa_typechecker import typechecked
+from .NGramIndex import NGramIndex
+
+
+TOLERANCE = 1e-5
+
+# scorers bounded by NGramIndex and whether the index is built by tokens for them
+INDEXED_SCORERS = {fz.fuzz.ratio: False,
+                   fz.fuzz.token_set_ratio: True}
+
+
+def isclose(score_1, score_2):
+    return math.isclose(score_1, score_2, abs_tol=TOLERANCE)
+
+
+class FuzzyChoices:
+    """Choices prepared once for scoring many queries
+
+    Keys and plain strings of the choices are kept in tuples,
+    so rapidfuzz.process.cdist scores all of them by one call into a numpy row
+    and the best ones are selected without sorting all the choices (like process.extract does).
+    Indexed choices are shortlisted by NGramIndex bounds (built on the first use by a scorer),
+    so only the choices which may reach the cutoff or the best score are scored.
+
+    Tests:
+    >>> choices = FuzzyChoices({"a": "noon", "b": "moon", "c": "dawn", "d": "noon"})
+    >>> choices.keys
+    ('a', 'b', 'c', 'd')
+    >>> score, idxes = choices.best("noon")
+    >>> score, idxes.tolist(), [choices.keys[idx] for idx in idxes]
+    (100.0, [0, 3], ['a', 'd'])
+    >>> choices.best("zzzz", score_cutoff=50)
+    (None, array([], dtype=int64))
+    >>> indexed = FuzzyChoices({"a": "noon", "b": "moon", "c": "dawn", "d": "noon"}, indexed=True)
+    >>> indexed.scores("noom", score_cutoff=70).tolist() == choices.scores("noom", score_cutoff=70).tolist()
+    True
+    >>> indexed.best("noom")[1].tolist() == choices.best("noom")[1].tolist()
+    True
+    """
+    @typechecked
+    def __init__(self,
+                 choices: Union[Mapping[Hashable, str], Sequence[str]],
+                 workers: int = 1,
+                 indexed: bool = False):
+        """
+        :param choices: A mapping of keys to strings or a sequence of strings (keys are their indexes).
+        :param workers: rapidfuzz workers. Note that cdist parallelizes queries, not choices.
+        :param indexed: Shortlist choices by NGramIndex for INDEXED_SCORERS.
+            Pays off for hundreds of choices scored with a cutoff.
+        """
+        if isinstance(choices, Mapping):
+            self.__keys = tuple(choices)
+            self.__choices = tuple(choices.values())
+        else:
+            self.__keys = tuple(range(len(choices)))
+            self.__choices = tuple(choices)
+        self.__strings = tuple(str(choice) for choice in self.__choices)
+        self.__workers = workers
+        self.__indexed = indexed
+        self.__indexes: Dict[bool, NGramIndex] = {}
+
+    @property
+    def keys(self) -> tuple:
+        return self.__keys
+
+    @property
+    def choices(self) -> tuple:
+        """The original choices (like LangValues)"""
+        return self.__choices
+
+    def __len__(self) -> int:
+        return len(self.__strings)
+
+    @typechecked
+    def scores(self,
+               query: str,
+               scorer: Callable = fz.fuzz.ratio,
+               score_cutoff: Union[int, float] = 0) -> np.ndarray:
+        """Scores of all the choices. Scores below the cutoff are 0."""
+        index = self.__index(scorer)
+        if index is None or score_cutoff <= 0:
+            return self.__cdist(query, self.__strings, scorer, score_cutoff)
+        return self.__candidates_scores(query, index.candidates(query, score_cutoff), scorer, score_cutoff)
+
+    @typechecked
+    def best(self,
+             query: str,
+             scorer: Callable = fz.fuzz.ratio,
+             score_cutoff: Union[int, float] = 0,
+             tolerance: Union[int, float] = TOLERANCE) -> Tuple[Optional[float], np.ndarray]:
+        """The best score (None if no choice reaches the cutoff) and indexes of all the choices scored so
+
+        Scores within the tolerance are the same. Indexes are in the order of the choices.
+        """
+        if not self.__strings:
+            return None, np.empty(0, dtype=np.int64)
+        index = self.__index(scorer)
+        if index is None:
+            scores = self.scores(query, scorer, score_cutoff)
+        else:
+            # the score of the best bounded choice raises the cutoff for the rest of them
+            bounds = index.bounds(query)
+            top_idx = int(bounds.argmax())
+            top_score = self.__cdist(query, (self.__strings[top_idx],), scorer, score_cutoff)[0]
+            cutoff = max(score_cutoff, top_score - tolerance)
+            candidates = np.flatnonzero(bounds >= cutoff - NGramIndex.EPSILON)
+            scores = self.__candidates_scores(query, candidates, scorer, score_cutoff)
+        best_score = float(scores.max())
+        # cdist zeroes scores below the cutoff
+        if score_cutoff > 0 and best_score == 0:
+            return None, np.empty(0, dtype=np.int64)
+        return best_score, np.flatnonzero(scores >= best_score - tolerance)
+
+    def __index(self, scorer: Callable) -> Optional[NGramIndex]:
+        tokens = INDEXED_SCORERS.get(scorer)
+        if not self.__indexed or tokens is None:
+            return None
+        index = self.__indexes.get(tokens)
+        if index is None:
+            index = NGramIndex(self.__strings, tokens=tokens)
+            self.__indexes[tokens] = index
+        return index
+
+    def __candidates_scores(self, query: str, candidates: np.ndarray, scorer: Callable, score_cutoff) -> np.ndarray:
+        scores = np.zeros(len(self.__strings), dtype=np.float64)
+        if len(candidates) > 0:
+            scores[candidates] = self.__cdist(query,
+                                              [self.__strings[idx] for idx in candidates],
+                                              scorer,
+                                              score_cutoff)
+        return scores
+
+    def __cdist(self, query: str, strings: Sequence[str], scorer: Callable, score_cutoff) -> np.ndarray:
+        return fz.process.cdist([query], strings,
+                                scorer=scorer,
+                                score_cutoff=score_cutoff,
+                                dtype=np.float64,
+                                workers=self.__workers)[0]
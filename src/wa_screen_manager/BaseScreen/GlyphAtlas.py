@@ -0,0 +1,246 @@
+import hashlib
+import logging
+import os
+from os import path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+from wa_typechecker import typechecked
+
+from wa_types import LanguageCode
+
+
+# a line of glyphs: tight glyph images and flags of a space before every glyph
+GlyphLine = Tuple[List[np.ndarray], List[bool]]
+
+
+class GlyphAtlas:
+    """Bitmap-font OCR by matching glyphs with templates
+
+    Text of a fixed font on a known background is segmented into lines by row projection
+    and into glyphs by column projection. A wide gap between glyphs is a space.
+    Every glyph is cropped to its ink, scaled to the template size and matched with all the templates at once
+    by normalized correlation, penalized by the difference of glyph and template sizes
+    (the font has a fixed size, so the sizes distinguish glyphs like "o" and "O").
+    ocr returns None if any glyph doesn't match well, so the caller falls back to Tesseract.
+
+    Tests:
+    >>> def render(text):
+    ...     lines = text.split("\\n")
+    ...     img = np.full((30 * len(lines) + 10, 300), 255, dtype=np.uint8)
+    ...     for idx, line in enumerate(lines):
+    ...         cv2.putText(img, line, (5, 30 * idx + 25), cv2.FONT_HERSHEY_PLAIN, 1.5, 0, 1)
+    ...     return img
+    >>> samples = [(render(text), text) for text in ("0123 456", "789 -10", "Morning\\nNoon")]
+    >>> atlas = GlyphAtlas.build(samples)
+    >>> atlas.chars
+    '-0123456789MNginor'
+    >>> atlas.ocr(render("-95 1870"))
+    '-95 1870'
+    >>> atlas.ocr(render("Noon\\n42")).split("\\n")
+    ['Noon', '42']
+    >>> atlas.ocr(render("X")) is None
+    True
+    """
+    HEIGHT = 24
+    WIDTH = 16
+    # a gap wider than the ratio of a line height is a space
+    SPACE_GAP = 0.3
+    MIN_SCORE = 0.75
+    SIZE_PENALTY = 0.5
+    # rows of a line could be split by a gap (like dots above letters)
+    MAX_LINE_GAP = 2
+
+    @typechecked
+    def __init__(self, chars: str, templates: np.ndarray, sizes: np.ndarray):
+        """
+        :param chars: A character of every template.
+        :param templates: Templates as (N, HEIGHT * WIDTH) rows of zero-mean unit vectors.
+        :param sizes: (N, 2) widths and heights of glyphs in pixels.
+        """
+        assert len(chars) == len(templates) == len(sizes)
+        self.__chars = chars
+        self.__templates = templates
+        self.__log_sizes = np.log(sizes)
+        self.__digest = None
+
+    @property
+    def chars(self) -> str:
+        return self.__chars
+
+    @property
+    def digest(self) -> str:
+        """Digest of the templates to key OCR results got with the atlas"""
+        if self.__digest is None:
+            digest = hashlib.blake2b(digest_size=8)
+            digest.update(self.__chars.encode())
+            digest.update(np.ascontiguousarray(self.__templates).tobytes())
+            digest.update(np.ascontiguousarray(self.__log_sizes).tobytes())
+            self.__digest = digest.hexdigest()
+        return self.__digest
+
+    @classmethod
+    @typechecked
+    def build(cls, samples: Iterable[Tuple[np.ndarray, str]]) -> Optional["GlyphAtlas"]:
+        """Build an atlas from images and their texts
+
+        Samples, which segmentation doesn't agree with their texts, are skipped.
+        Returns None if there are no suitable samples.
+        """
+        sums: Dict[str, np.ndarray] = {}
+        sizes: Dict[str, List[Tuple[int, int]]] = {}
+        for img, text in samples:
+            lines = cls.__segment(img)
+            text_lines = text.split("\n")
+            if len(lines) != len(text_lines):
+                continue
+            text_lines = [line.replace(" ", "") for line in text_lines]
+            if any(len(glyphs) != len(text_line) for (glyphs, _), text_line in zip(lines, text_lines)):
+                continue
+            for (glyphs, _), text_line in zip(lines, text_lines):
+                for glyph, char in zip(glyphs, text_line):
+                    vector = cls.__vector(glyph)
+                    if char in sums:
+                        sums[char] += vector
+                    else:
+                        sums[char] = vector.copy()
+                    sizes.setdefault(char, []).append(glyph.shape[::-1])
+        if not sums:
+            return None
+        chars = "".join(sorted(sums))
+        templates = np.stack([cls.__normalize(sums[char]) for char in chars])
+        return cls(chars, templates, np.array([np.mean(sizes[char], axis=0) for char in chars]))
+
+    @typechecked
+    def ocr(self, img: np.ndarray) -> Optional[str]:
+        lines = self.__segment(img)
+        if not lines:
+            return None
+        glyphs = [glyph for line_glyphs, _ in lines for glyph in line_glyphs]
+        vectors = np.stack([self.__normalize(self.__vector(glyph)) for glyph in glyphs])
+        log_sizes = np.log([glyph.shape[::-1] for glyph in glyphs])
+        scores = vectors @ self.__templates.T
+        scores -= self.SIZE_PENALTY * np.abs(log_sizes[:, None, :] - self.__log_sizes[None, :, :]).sum(axis=2)
+        best = scores.argmax(axis=1)
+        if scores[np.arange(len(glyphs)), best].min() < self.MIN_SCORE:
+            return None
+        chars = iter(self.__chars[idx] for idx in best)
+        return "\n".join("".join((" " if space else "") + next(chars) for space in spaces)
+                         for _, spaces in lines)
+
+    @typechecked
+    def save(self, file_path: str):
+        os.makedirs(path.dirname(file_path), exist_ok=True)
+        # atlases could be built by several processes at once, so replace the file atomically
+        tmp_file_path = f"{file_path}.{os.getpid()}.tmp"
+        with open(tmp_file_path, "wb") as file:
+            np.savez(file,
+                     chars=np.array(list(self.__chars)),
+                     templates=self.__templates,
+                     sizes=np.exp(self.__log_sizes))
+        os.replace(tmp_file_path, file_path)
+
+    @classmethod
+    @typechecked
+    def load(cls, file_path: str) -> "GlyphAtlas":
+        with np.load(file_path) as data:
+            return cls("".join(data["chars"]), data["templates"], data["sizes"])
+
+    @classmethod
+    def __segment(cls, img: np.ndarray) -> List[GlyphLine]:
+        if img.ndim == 3:
+            img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        _, binary = cv2.threshold(img, 0, 1, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        # ink is the minority of pixels
+        ink = binary.astype(bool)
+        if ink.mean() > 0.5:
+            ink = ~ink
+        rows = []
+        for top, bottom in cls.__runs(ink.any(axis=1)):
+            if rows and top - rows[-1][1] <= cls.MAX_LINE_GAP:
+                rows[-1] = (rows[-1][0], bottom)
+            else:
+                rows.append((top, bottom))
+        lines = []
+        for top, bottom in rows:
+            line = ink[top:bottom]
+            height = bottom - top
+            if height < 3:
+                continue
+            glyphs, spaces = [], []
+            prev_right = None
+            for left, right in cls.__runs(line.any(axis=0)):
+                glyph = line[:, left:right]
+                glyph_rows = np.flatnonzero(glyph.any(axis=1))
+                glyphs.append(glyph[glyph_rows[0]:glyph_rows[-1] + 1])
+                spaces.append(prev_right is not None and left - prev_right > height * cls.SPACE_GAP)
+                prev_right = right
+            lines.append((glyphs, spaces))
+        return lines
+
+    @staticmethod
+    def __runs(mask: np.ndarray) -> List[Tuple[int, int]]:
+        """(start, end) of runs of True values"""
+        edges = np.flatnonzero(np.diff(np.concatenate(([False], mask, [False])).astype(np.int8)))
+        return list(zip(edges[::2].tolist(), edges[1::2].tolist()))
+
+    @classmethod
+    def __vector(cls, glyph: np.ndarray) -> np.ndarray:
+        # a background border keeps solid glyphs (like "-") distinguishable by correlation
+        glyph = np.pad(glyph, 1)
+        glyph = cv2.resize(glyph.astype(np.float32), (cls.WIDTH, cls.HEIGHT), interpolation=cv2.INTER_AREA)
+        return glyph.ravel()
+
+    @staticmethod
+    def __normalize(vector: np.ndarray) -> np.ndarray:
+        vector = vector - vector.mean()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+# every HELD_OUT_MODULO-th dataset item (by a hash of its name) is not used to build atlases
+HELD_OUT_MODULO = 5
+
+
+@typechecked
+def is_held_out(item_name: str) -> bool:
+    """Whether a dataset item is held out of building atlases to evaluate them
+
+    Tests:
+    >>> sum(is_held_out(f"{idx:08}") for idx in range(1000))
+    197
+    """
+    return hashlib.blake2b(item_name.encode(), digest_size=8).digest()[0] % HELD_OUT_MODULO == 0
+
+
+@typechecked
+def dataset_glyph_atlas_path(dataset_name: str,
+                             language_code: LanguageCode,
+                             preprocessing_digest: str) -> Optional[str]:
+    """Path of the glyph atlas of a dataset built for the preprocessing of an OCR
+
+    An atlas of another preprocessing or template size is just not found.
+    Returns None if there is no datasets path.
+    """
+    import path_conf
+    if not path_conf.datasets:
+        return None
+    return path.join(path_conf.datasets, "glyph_atlas",
+                     f"{dataset_name}_{language_code}_{GlyphAtlas.WIDTH}x{GlyphAtlas.HEIGHT}_{preprocessing_digest}.npz")
+
+
+@typechecked
+def load_dataset_glyph_atlas(dataset_name: str,
+                             language_code: LanguageCode,
+                             preprocessing_digest: str) -> Optional[GlyphAtlas]:
+    """Load the glyph atlas of a dataset built by utils/build_glyph_atlas.py
+
+    Returns None if there is no atlas built for the preprocessing.
+    """
+    file_path = dataset_glyph_atlas_path(dataset_name, language_code, preprocessing_digest)
+    if file_path is None or not path.isfile(file_path):
+        logging.getLogger(__name__).warning(f"No glyph atlas of {dataset_name} dataset for {language_code} "
+                                            f"and the current preprocessing, build it by utils/build_glyph_atlas.py")
+        return None
+    return GlyphAtlas.load(file_path)
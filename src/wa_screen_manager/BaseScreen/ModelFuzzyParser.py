@@ -1,14 +1,19 @@
 import itertools
 import logging
-import math
-from typing import NamedTuple
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
 
+import numpy as np
 import rapidfuzz as fz
 
 from wa_language.LangVar import PlayerSexVar
 from wa_typechecker import typechecked
 from wa_language.LangValue import LangValue
 from wa_language.LanguageModel import LanguageModel
+from wa_language.LangKey import LangKey
+from wa_language.LangTemplate import LangTemplate
+from wa_language.Spreading import Spread, Spreading
+from wa_types import LRUCache
+from .FuzzyChoices import FuzzyChoices, TOLERANCE, isclose
 
 
 class BoundsAndScore(NamedTuple):
@@ -22,50 +27,132 @@ VALUE = 0
 SCORE = 1
 KEY = 2
 
-TOLERANCE = 1e-5
-
-
-def isclose(score_1, score_2):
-    return math.isclose(score_1, score_2, abs_tol=TOLERANCE)
-
 
 class ModelFuzzyParser:
     @typechecked
-    def __init__(self, score_cutoff):
+    def __init__(self, score_cutoff, memo_size: int = 1024, branch_and_bound: bool = True):
+        """
+        :param memo_size: Count of the latest (model, OCR result) pairs kept with their bounds.
+        :param branch_and_bound: Prune spreading of values which can't reach the cutoff
+            or the best score of other values, and pass the cutoff to scoring of final texts.
+        """
         self.__score_cutoff = score_cutoff
+        self.__branch_and_bound = branch_and_bound
+        # spread values scored and branches of purge values pruned
+        self.__expanded_nodes = 0
+        self.__pruned_branches = 0
+        # max text lengths of spreads by spread id, a spread is kept with its length to keep the id unique
+        # (key checkers of a model could spread the same variable differently)
+        self.__spread_max_lengths: Dict[int, Tuple[Spread, int]] = {}
+        # purge spread choices, indexes of exact purge texts and templates of values by model id,
+        # a model is kept with them to keep the id unique
+        self.__purge_choices: Dict[int, Tuple[LanguageModel, FuzzyChoices]] = {}
+        self.__exact_purge_idxes: Dict[int, Dict[str, np.ndarray]] = {}
+        self.__templates: Dict[int, Dict[LangKey, Optional[LangTemplate]]] = {}
+        self.__memo = LRUCache(memo_size)
+
+    @property
+    def expanded_nodes(self) -> int:
+        """Count of spread values scored"""
+        return self.__expanded_nodes
+
+    @property
+    def pruned_branches(self) -> int:
+        """Count of purge values which spreading is pruned"""
+        return self.__pruned_branches
+
+    @property
+    def memo(self) -> LRUCache:
+        """Bounds and scores of the latest OCR results by (model id, OCR result)"""
+        return self.__memo
 
     @typechecked
     def bounds(self, model: LanguageModel, ocr: str) -> BoundsAndScore:
-        choices = model.purge_spread
-        if len(choices) == 0:
+        purge_choices = self.__model_purge_choices(model)
+        if len(purge_choices) == 0:
             return EMPTY_BOUND_AND_SCORE
-        matches = fz.process.extract(query=ocr,
-                                     scorer=fz.fuzz.ratio,
-                                     choices=choices,
-                                     limit=len(choices))
-        purge_best_score = matches[0][SCORE]
-        purge_values = (match[VALUE] for match in matches
-                        if isclose(match[SCORE], purge_best_score))
-        result_matches = []
-        for purge_value in purge_values:
-            best_score = purge_best_score
-            spreading = model[purge_value.key]
+        bounds_and_score = self.__memo.get((id(model), ocr))
+        if bounds_and_score is None:
+            bounds_and_score = self.__bounds(model, purge_choices, ocr)
+            self.__memo.put((id(model), ocr), bounds_and_score)
+        return bounds_and_score
+
+    def __bounds(self, model: LanguageModel, purge_choices: FuzzyChoices, ocr: str) -> BoundsAndScore:
+        purge_idxes = self.__exact_purge_idxes[id(model)].get(ocr)
+        if purge_idxes is not None:
+            # an exact purge text is the only best purge match with itself, values are still spread
+            purge_best_score = 100.0
+        else:
+            purge_best_score, purge_idxes = purge_choices.best(ocr)
+        # branches of purge values are spread in order of their upper bounds,
+        # so the best score of the first branches prunes the rest of them,
+        # matches are kept in order of the purge values
+        branches = []
+        for purge_idx in purge_idxes:
+            purge_value = purge_choices.choices[purge_idx]
             value = model.language[purge_value.key]
             if PlayerSexVar in purge_value.binding and PlayerSexVar not in value.binding:
                 value.bind(PlayerSexVar, purge_value.binding[PlayerSexVar])
-            values = value,
-            for var, spread in spreading.items():
-                choices = list(itertools.chain.from_iterable(value.spread(var, spread)
-                                                             for value in values))
-                matches = fz.process.extract(query=ocr,
-                                             scorer=fz.fuzz.ratio,
-                                             choices=choices,
-                                             limit=len(choices))
-                best_score = matches[0][SCORE]
-                values = (match[VALUE] for match in matches
-                          if isclose(match[SCORE], best_score))
+            template = self.__template(model, value)
+            spreading = model[purge_value.key]
+            if not self.__branch_and_bound:
+                upper_bound = 100.0
+            elif not spreading:
+                # the purge score is the final one
+                upper_bound = purge_best_score
+            elif template is not None:
+                upper_bound = self.__upper_bound(model, ocr, template, {}, spreading)
+            else:
+                upper_bound = 100.0
+            branches.append((upper_bound, value, template, spreading))
+        branches_matches = [[] for _ in branches]
+        running_best_score = None
+        for branch_idx in sorted(range(len(branches)), key=lambda idx: -branches[idx][0]):
+            upper_bound, value, template, spreading = branches[branch_idx]
+            # a branch has to reach the cutoff and the running best score (within the tolerance)
+            score_cutoff = (self.__score_cutoff if running_best_score is None
+                            else max(self.__score_cutoff, running_best_score - TOLERANCE))
+            if upper_bound < score_cutoff:
+                self.__pruned_branches += 1
+                continue
+            best_score = purge_best_score
+            if template is not None:
+                # spread texts are rendered by the template, only the best ones are bound
+                bindings = [{}]
+                for level, (var, spread) in enumerate(spreading.items()):
+                    if (self.__branch_and_bound and level > 0
+                            and self.__upper_bound(model, ocr, template, bindings, spreading) < score_cutoff):
+                        best_score = None
+                        break
+                    bindings = template.spread(bindings, var, spread)
+                    self.__expanded_nodes += len(bindings)
+                    # scores of the last level are final ones, other levels choose bindings by any scores
+                    last_level = level == len(spreading) - 1
+                    best_score, idxes = FuzzyChoices([template.render(binding) for binding in bindings]).best(
+                        ocr,
+                        score_cutoff=(score_cutoff - TOLERANCE
+                                      if self.__branch_and_bound and last_level and score_cutoff > TOLERANCE
+                                      else 0))
+                    if best_score is None:
+                        break
+                    bindings = [bindings[idx] for idx in idxes]
+                if best_score is None:
+                    self.__pruned_branches += 1
+                    continue
+                values = [template.bind(binding) for binding in bindings]
+            else:
+                values = value,
+                for var, spread in spreading.items():
+                    choices = FuzzyChoices(list(itertools.chain.from_iterable(value.spread(var, spread)
+                                                                              for value in values)))
+                    self.__expanded_nodes += len(choices)
+                    best_score, idxes = choices.best(ocr)
+                    values = [choices.choices[idx] for idx in idxes]
             if best_score >= self.__score_cutoff:
-                result_matches.extend((value, best_score) for value in values)
+                branches_matches[branch_idx] = [(value, best_score) for value in values]
+                if running_best_score is None or best_score > running_best_score:
+                    running_best_score = best_score
+        result_matches = list(itertools.chain.from_iterable(branches_matches))
         if result_matches:
             best_score = max(result[SCORE] for result in result_matches)
             bounds = tuple(result[VALUE] for result in result_matches
@@ -79,3 +166,56 @@ class ModelFuzzyParser:
             return BoundsAndScore(bounds=bounds, score=best_score)
         else:
             return EMPTY_BOUND_AND_SCORE
+
+    def __upper_bound(self,
+                      model: LanguageModel,
+                      ocr: str,
+                      template: LangTemplate,
+                      bindings: Union[Dict, List[Dict]],
+                      spreading: Spreading) -> float:
+        """Upper bound of ratio scores of the template texts bound with the bindings and any values of the rest slots
+
+        A text is the fixed text (with the bound slots) with the values of the rest slots inserted,
+        an inserted char increases the longest common subsequence with the OCR result by at most one,
+        so ratio = 200 * LCS / (len(ocr) + len(text)) is bounded by the fixed text LCS
+        and the max lengths of the rest slots values.
+        """
+        upper_bound = 0.0
+        for binding in (bindings if isinstance(bindings, list) else (bindings,)):
+            rest = {variable: "" for variable in template.variables if variable not in binding}
+            fixed_text = template.render(binding | rest)
+            rest_length = sum(self.__spread_max_length(spreading[variable])
+                              for variable in template.slots_variables if variable in rest)
+            length = len(ocr) + len(fixed_text) + rest_length
+            if length == 0:
+                return 100.0
+            lcs = fz.distance.LCSseq.similarity(ocr, fixed_text)
+            upper_bound = max(upper_bound, min(100.0, 200 * (lcs + rest_length) / length))
+        return upper_bound
+
+    def __spread_max_length(self, spread: Spread) -> int:
+        spread_and_max_length = self.__spread_max_lengths.get(id(spread))
+        if spread_and_max_length is None:
+            spread_and_max_length = spread, max((len(str(spread_value)) for spread_value in spread), default=0)
+            self.__spread_max_lengths[id(spread)] = spread_and_max_length
+        return spread_and_max_length[1]
+
+    def __model_purge_choices(self, model: LanguageModel) -> FuzzyChoices:
+        model_and_choices = self.__purge_choices.get(id(model))
+        if model_and_choices is None:
+            model_and_choices = model, FuzzyChoices(model.purge_spread)
+            self.__purge_choices[id(model)] = model_and_choices
+            exact_purge_idxes = {}
+            for idx, purge_value in enumerate(model.purge_spread):
+                # empty OCR results are left to scoring
+                if str(purge_value):
+                    exact_purge_idxes.setdefault(str(purge_value), []).append(idx)
+            self.__exact_purge_idxes[id(model)] = {text: np.array(idxes, dtype=np.int64)
+                                                   for text, idxes in exact_purge_idxes.items()}
+        return model_and_choices[1]
+
+    def __template(self, model: LanguageModel, value: LangValue) -> Optional[LangTemplate]:
+        templates = self.__templates.setdefault(id(model), {})
+        if value.key not in templates:
+            templates[value.key] = LangTemplate.compile(value, model[value.key])
+        return templates[value.key]
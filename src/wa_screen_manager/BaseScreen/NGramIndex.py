@@ -0,0 +1,159 @@
+from collections import Counter
+import itertools
+from typing import Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+from wa_typechecker import typechecked
+
+
+def ngrams(text: str, size: int) -> Counter:
+    """Multiset of character n-grams of the text (without padding)"""
+    return Counter(text[idx:idx + size] for idx in range(len(text) - size + 1))
+
+
+class NGramIndex:
+    """Character n-gram inverted index of choices with lossless upper bounds of fuzzy scores
+
+    Bounds rely on the q-gram lemma. Indel alignment of strings A and B
+    leaves d_a chars of A and d_b chars of B unmatched, d_a - d_b = len(A) - len(B).
+    An unmatched char of A breaks at most q q-grams of A,
+    an unmatched char of B breaks at most q - 1 q-grams of A (by splitting a matched run of A),
+    other q-grams of A are shared with B, so shared >= count(A) - q * d_a - (q - 1) * d_b
+    (and the same for B). The least d_a + d_b meeting the inequalities of all the n-gram sizes
+    bounds the Indel distance from below and normalized Indel similarity (rapidfuzz.fuzz.ratio) from above.
+    Unigrams give the bound of character counts (it's tight for short strings),
+    trigrams catch the order of the characters.
+
+    With tokens=True the index bounds rapidfuzz.fuzz.token_set_ratio:
+    - choices sharing a token with a query are bounded by 100,
+    - other ones are scored as the ratio of sorted joined token sets,
+      n-grams within tokens don't depend on the order of the tokens
+      and never match n-grams with the spaces between tokens.
+
+    Tests:
+    >>> import rapidfuzz as fz
+    >>> choices = ["Swadian Knight", "Vaegir Horseman", "Sea Raider", "Knight Commander"]
+    >>> index = NGramIndex(choices)
+    >>> bounds = index.bounds("Swadain Kniqht")
+    >>> all(bound >= fz.fuzz.ratio("Swadain Kniqht", choice) for bound, choice in zip(bounds, choices))
+    True
+    >>> [round(bound) for bound in bounds]
+    [86, 34, 50, 60]
+    >>> index.candidates("Swadain Kniqht", score_cutoff=75).tolist()
+    [0]
+    >>> index = NGramIndex(choices, tokens=True)
+    >>> [round(bound) for bound in index.bounds("Knight")]
+    [100, 29, 12, 100]
+    """
+    # bounds are computed with floats, scores reaching a bound within the epsilon are not pruned
+    EPSILON = 1e-9
+
+    @typechecked
+    def __init__(self, choices: Sequence[str], tokens: bool = False, sizes: Tuple[int, ...] = (1, 3)):
+        """
+        :param choices: Strings of the choices.
+        :param tokens: Index token sets for token_set_ratio instead of the strings for ratio.
+        :param sizes: Sizes of the indexed n-grams.
+        """
+        self.__tokens = tokens
+        self.__sizes = sizes
+        # a posting of an n-gram lists a choice once per occurrence of the n-gram in the choice,
+        # ordered by the occurrence rank, so a prefix of the posting (by rank offsets)
+        # lists choices sharing up to the count of the n-gram in a query
+        ranked_postings: List[Dict[str, Dict[int, list]]] = [{} for _ in sizes]
+        token_postings: Dict[str, list] = {}
+        lengths = []
+        counts = []
+        for idx, choice in enumerate(choices):
+            length, size_grams, choice_tokens = self.__profile(choice)
+            lengths.append(length)
+            counts.append([sum(grams.values()) for grams in size_grams])
+            for size_number, grams in enumerate(size_grams):
+                for gram, count in grams.items():
+                    ranks = ranked_postings[size_number].setdefault(gram, {})
+                    for rank in range(count):
+                        # choice indexes of all the sizes are shifted by size number * choices count,
+                        # so shared n-grams of all the sizes are counted by one bincount
+                        ranks.setdefault(rank, []).append(idx + size_number * len(choices))
+            for token in choice_tokens:
+                token_postings.setdefault(token, []).append(idx)
+        self.__postings: List[Dict[str, Tuple[np.ndarray, Tuple[int, ...]]]] = []
+        for ranked_size_postings in ranked_postings:
+            size_postings = {}
+            for gram, ranks in ranked_size_postings.items():
+                posting = [ranks[rank] for rank in range(len(ranks))]
+                offsets = tuple(itertools.accumulate(len(rank_idxes) for rank_idxes in posting))
+                size_postings[gram] = np.array(list(itertools.chain.from_iterable(posting)), dtype=np.intp), offsets
+            self.__postings.append(size_postings)
+        self.__token_postings = {token: np.array(token_idxes, dtype=np.intp)
+                                 for token, token_idxes in token_postings.items()}
+        self.__lengths = np.array(lengths, dtype=np.float64)
+        # terms of the inequalities which don't depend on a query, by sizes (see bounds)
+        counts = np.array(counts, dtype=np.float64).reshape(len(choices), len(sizes)).T
+        self.__size_column = np.array(sizes, dtype=np.float64).reshape(-1, 1)
+        self.__query_terms = self.__size_column * self.__lengths
+        self.__choice_terms = counts + (self.__size_column - 1) * self.__lengths
+        self.__denominators = 2 * self.__size_column - 1
+
+    @property
+    def tokens(self) -> bool:
+        return self.__tokens
+
+    @property
+    def sizes(self) -> Tuple[int, ...]:
+        return self.__sizes
+
+    def __len__(self) -> int:
+        return len(self.__lengths)
+
+    def __profile(self, text: str) -> Tuple[int, Tuple[Counter, ...], Tuple[str, ...]]:
+        """Length of the scored string, its n-grams by sizes and tokens"""
+        if not self.__tokens:
+            return len(text), tuple(ngrams(text, size) for size in self.__sizes), tuple()
+        # rapidfuzz token ratios join a set of tokens split by whitespaces
+        text_tokens = tuple(set(text.split()))
+        size_grams = tuple(Counter(token[idx:idx + size]
+                                   for token in text_tokens
+                                   for idx in range(len(token) - size + 1))
+                           for size in self.__sizes)
+        length = sum(len(token) for token in text_tokens) + max(len(text_tokens) - 1, 0)
+        return length, size_grams, text_tokens
+
+    @typechecked
+    def bounds(self, query: str) -> np.ndarray:
+        """Upper bounds of the scores of all the choices with the query"""
+        length, size_grams, query_tokens = self.__profile(query)
+        shared_postings = []
+        for size_postings, grams in zip(self.__postings, size_grams):
+            for gram, count in grams.items():
+                posting = size_postings.get(gram)
+                if posting is not None:
+                    idxes, offsets = posting
+                    shared_postings.append(idxes[:offsets[min(count, len(offsets)) - 1]])
+        shared = np.bincount(np.concatenate(shared_postings) if shared_postings else np.empty(0, dtype=np.intp),
+                             minlength=self.__query_terms.size).reshape(self.__query_terms.shape)
+        # unmatched chars of the query are unmatched chars of a choice plus delta = len(query) - len(choice),
+        # the least unmatched chars of a choice by n-grams of a size are
+        # (count(query) - shared - size * delta) / (2 * size - 1) and
+        # (count(choice) - shared - (size - 1) * delta) / (2 * size - 1)
+        query_counts = np.array([[sum(grams.values())] for grams in size_grams], dtype=np.float64)
+        sizes_unmatched = np.maximum(self.__query_terms + (query_counts - self.__size_column * length),
+                                     self.__choice_terms - (self.__size_column - 1) * length)
+        sizes_unmatched -= shared
+        sizes_unmatched /= self.__denominators
+        unmatched = np.maximum(np.ceil(sizes_unmatched.max(axis=0)), np.maximum(self.__lengths - length, 0))
+        distances = 2 * unmatched + (length - self.__lengths)
+        lengths = self.__lengths + length
+        # empty query and choice have no distance
+        bounds = 100 * (1 - distances / np.maximum(lengths, 1))
+        if self.__tokens:
+            for token in query_tokens:
+                token_idxes = self.__token_postings.get(token)
+                if token_idxes is not None:
+                    bounds[token_idxes] = 100.0
+        return bounds
+
+    @typechecked
+    def candidates(self, query: str, score_cutoff: Union[int, float]) -> np.ndarray:
+        """Indexes of the choices which scores with the query may reach the cutoff"""
+        return np.flatnonzero(self.bounds(query) >= score_cutoff - self.EPSILON)
@@ -0,0 +1,87 @@
+import hashlib
+import json
+import logging
+import os
+from os import path
+from typing import Optional
+
+import numpy as np
+from wa_typechecker import typechecked
+
+from wa_types import LRUCache
+
+
+class OCRCache:
+    """Cache of OCR results keyed by a hash of a crop image and an OCR configuration
+
+    The same dialog titles, relations and calendars are shown many times,
+    so a repeated crop skips preprocessing and Tesseract.
+    The cache could be persisted as a JSON file to start a new session warm.
+
+    Tests:
+    >>> cache = OCRCache(maxsize=10)
+    >>> key = cache.key(np.zeros((2, 3, 3), dtype=np.uint8), "config")
+    >>> key == cache.key(np.zeros((2, 3, 3), dtype=np.uint8), "config")
+    True
+    >>> key == cache.key(np.zeros((3, 2, 3), dtype=np.uint8), "config")
+    False
+    >>> cache.get(key) is None
+    True
+    >>> cache.put(key, "text")
+    >>> cache.get(key)
+    'text'
+    """
+    DIGEST_SIZE = 16
+
+    @typechecked
+    def __init__(self, maxsize: int = 4096):
+        self.__logger = logging.getLogger(__name__)
+        self.__cache = LRUCache(maxsize)
+
+    @property
+    def cache(self) -> LRUCache:
+        return self.__cache
+
+    @staticmethod
+    @typechecked
+    def key(crop_img: np.ndarray, config: str) -> str:
+        digest = hashlib.blake2b(digest_size=OCRCache.DIGEST_SIZE)
+        digest.update(f"{config}|{crop_img.shape}|{crop_img.dtype}|".encode())
+        digest.update(np.ascontiguousarray(crop_img))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        return self.__cache.get(key)
+
+    def put(self, key: str, text: str):
+        self.__cache.put(key, text)
+
+    @typechecked
+    def load(self, file_path: str):
+        if not path.isfile(file_path):
+            return
+        try:
+            with open(file_path, encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError) as error:
+            self.__logger.warning(f"Could not load OCR cache {file_path}: {error}")
+            return
+        for key, text in data.items():
+            self.__cache.put(key, text)
+        self.__logger.info(f"Loaded OCR cache: {len(data)} items from {file_path}")
+
+    @typechecked
+    def save(self, file_path: str):
+        os.makedirs(path.dirname(file_path), exist_ok=True)
+        tmp_file_path = file_path + ".tmp"
+        with open(tmp_file_path, "w", encoding="utf-8") as file:
+            json.dump(dict(self.__cache.items()), file, ensure_ascii=False)
+        os.replace(tmp_file_path, file_path)
+        self.__logger.info(f"Saved OCR cache: {len(self.__cache)} items to {file_path}")
+
+    def __str__(self):
+        return str(self.__cache)
+
+
+# process-wide cache shared by all the OCRs
+ocr_cache = OCRCache()
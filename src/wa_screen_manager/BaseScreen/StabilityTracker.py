@@ -0,0 +1,104 @@
+from typing import Optional
+
+import cv2
+import numpy as np
+from wa_typechecker import typechecked
+
+
+class StabilityTracker:
+    """Tracks whether an image region stays unchanged for several consecutive frames
+
+    A copy of the previous region is kept, not the region itself:
+    a region is a view of a screenshot buffer that is reused for next screenshots once it's released.
+    The copy buffer is allocated once per region shape.
+    Comparison is cheaper than np.array_equal of the regions:
+    - a changing region is usually told by every SUBSAMPLE_STEP-th row of it (a strided subsample),
+      then the whole region is copied
+    - otherwise the region is compared by blocks of BLOCK_ROWS rows with cv2.norm
+      (it doesn't allocate a temporary array of element comparisons), only the changed blocks are copied
+    See utils/stability_tracker_benchmark.py
+
+    Tests:
+    >>> tracker = StabilityTracker(stable_frames=2)
+    >>> img = np.zeros((72, 6, 3), dtype=np.uint8)
+    >>> region = img[1:71, 1:5]  # the subsample is the rows 0, 8, ..., 64, the blocks are the rows 0-63 and 64-69
+    >>> tracker.update(region), tracker.update(region)
+    (False, True)
+    >>> region[66, 3] = 1  # out of the subsample, in the second block
+    >>> tracker.update(region), tracker.update(region), tracker.update(region)
+    (False, True, True)
+    >>> region[8, 3] = 1  # in the subsample
+    >>> tracker.update(region), tracker.update(region)
+    (False, True)
+    >>> img[0, 0] = 1  # out of the region
+    >>> tracker.update(region), tracker.frames
+    (True, 3)
+    >>> region[:] = 0  # the region is not kept as a view
+    >>> tracker.update(region)
+    False
+    >>> tracker.update(region[1:])  # another shape
+    False
+    >>> tracker = StabilityTracker(stable_frames=1)
+    >>> tracker.update(img)
+    True
+    """
+    SUBSAMPLE_STEP = 8
+    BLOCK_ROWS = 64
+
+    @typechecked
+    def __init__(self, stable_frames: int = 2):
+        """
+        :param stable_frames: A number of consecutive frames (the current one included)
+               the region must stay the same within to be stable.
+        """
+        assert stable_frames > 0
+        self.__stable_frames = stable_frames
+        self.__prev_img: Optional[np.ndarray] = None
+        self.__frames = 0
+
+    @property
+    def stable_frames(self) -> int:
+        return self.__stable_frames
+
+    @property
+    def frames(self) -> int:
+        """A number of consecutive frames the region stays the same within"""
+        return self.__frames
+
+    @typechecked
+    def update(self, img: np.ndarray) -> bool:
+        """Track the region of the next frame. Returns whether the region is stable."""
+        prev_img = self.__prev_img
+        if prev_img is None or prev_img.shape != img.shape or prev_img.dtype != img.dtype:
+            self.__prev_img = img.copy(order="C")
+            self.__frames = 1
+        elif not np.array_equal(img[::self.SUBSAMPLE_STEP], prev_img[::self.SUBSAMPLE_STEP]):
+            np.copyto(prev_img, img)
+            self.__frames = 1
+        elif self.__copy_changed_blocks(img, prev_img):
+            self.__frames = 1
+        else:
+            self.__frames += 1
+        return self.__frames >= self.__stable_frames
+
+    def reset(self):
+        self.__prev_img = None
+        self.__frames = 0
+
+    @classmethod
+    def __copy_changed_blocks(cls, img: np.ndarray, prev_img: np.ndarray) -> bool:
+        """Copy the blocks of rows that differ from the previous image. Returns whether any is copied."""
+        if img.ndim < 2 or img.ndim == 3 and img.shape[2] > 4:
+            # not an image of cv2
+            if np.array_equal(img, prev_img):
+                return False
+            np.copyto(prev_img, img)
+            return True
+        changed = False
+        for row in range(0, img.shape[0], cls.BLOCK_ROWS):
+            block = img[row:row + cls.BLOCK_ROWS]
+            prev_block = prev_img[row:row + cls.BLOCK_ROWS]
+            if cv2.norm(block, prev_block, cv2.NORM_L1) != 0:
+                np.copyto(prev_block, block)
+                changed = True
+        return changed
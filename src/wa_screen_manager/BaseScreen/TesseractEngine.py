@@ -0,0 +1,167 @@
+from abc import ABC, abstractmethod
+import atexit
+import ctypes
+import ctypes.util
+import logging
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+import pytesseract
+from wa_typechecker import typechecked
+
+
+# tesseract OcrEngineMode and PageSegMode values
+OEM_LSTM_ONLY = 1
+PSM_SINGLE_BLOCK = 6
+# tesseract uses 70 dpi for images without resolution (like pytesseract's temp images)
+DEFAULT_DPI = 70
+
+
+class TesseractEngine(ABC):
+    """Tesseract OCR engine configured with a language, a whitelist and a page segmentation mode"""
+    @typechecked
+    def __init__(self, language: str, whitelist: str, psm: int = PSM_SINGLE_BLOCK, oem: int = OEM_LSTM_ONLY):
+        self._language = language
+        self._whitelist = whitelist
+        self._psm = psm
+        self._oem = oem
+
+    @abstractmethod
+    def ocr(self, img: np.ndarray) -> str:
+        """Recognize a grayscale or BGR image. Returns not stripped text."""
+        raise NotImplemented
+
+
+class PyTesseractEngine(TesseractEngine):
+    """pytesseract engine: runs the tesseract binary (which loads the model) for every image"""
+    def ocr(self, img: np.ndarray) -> str:
+        config = f'--oem {self._oem} --psm {self._psm} -c tessedit_char_whitelist="{self._whitelist}"'
+        return pytesseract.image_to_string(img, lang=self._language, config=config)
+
+
+class CAPITesseractEngine(TesseractEngine):
+    """Persistent engine over the libtesseract C API
+
+    The model is loaded once, when the engine is created.
+    ctypes releases the GIL within libtesseract calls,
+    so engines of different configurations could recognize images concurrently.
+    An engine itself is not thread-safe, so it serializes its calls with a lock.
+    """
+    __lib = None
+
+    @classmethod
+    def library(cls) -> Optional[ctypes.CDLL]:
+        """Load libtesseract (once). Returns None if it's absent."""
+        if cls.__lib is None:
+            lib_path = os.environ.get("LIBTESSERACT") or ctypes.util.find_library("tesseract")
+            if lib_path is None:
+                cls.__lib = False
+            else:
+                try:
+                    lib = ctypes.CDLL(lib_path)
+                except OSError:
+                    cls.__lib = False
+                else:
+                    lib.TessBaseAPICreate.restype = ctypes.c_void_p
+                    lib.TessBaseAPIDelete.argtypes = [ctypes.c_void_p]
+                    lib.TessBaseAPIEnd.argtypes = [ctypes.c_void_p]
+                    lib.TessBaseAPIInit2.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_char_p,
+                                                     ctypes.c_int]
+                    lib.TessBaseAPIInit2.restype = ctypes.c_int
+                    lib.TessBaseAPISetVariable.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_char_p]
+                    lib.TessBaseAPISetVariable.restype = ctypes.c_int
+                    lib.TessBaseAPISetPageSegMode.argtypes = [ctypes.c_void_p, ctypes.c_int]
+                    lib.TessBaseAPISetImage.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_int,
+                                                        ctypes.c_int, ctypes.c_int, ctypes.c_int]
+                    lib.TessBaseAPISetSourceResolution.argtypes = [ctypes.c_void_p, ctypes.c_int]
+                    lib.TessBaseAPIGetUTF8Text.argtypes = [ctypes.c_void_p]
+                    lib.TessBaseAPIGetUTF8Text.restype = ctypes.POINTER(ctypes.c_char)
+                    lib.TessBaseAPIClear.argtypes = [ctypes.c_void_p]
+                    lib.TessDeleteText.argtypes = [ctypes.POINTER(ctypes.c_char)]
+                    cls.__lib = lib
+        return cls.__lib or None
+
+    @typechecked
+    def __init__(self, language: str, whitelist: str, psm: int = PSM_SINGLE_BLOCK, oem: int = OEM_LSTM_ONLY):
+        super().__init__(language, whitelist, psm, oem)
+        lib = self.library()
+        if lib is None:
+            raise OSError("libtesseract is not found")
+        self.__lib = lib
+        self.__lock = threading.Lock()
+        self.__handle = lib.TessBaseAPICreate()
+        if lib.TessBaseAPIInit2(self.__handle, None, language.encode(), oem) != 0:
+            lib.TessBaseAPIDelete(self.__handle)
+            self.__handle = None
+            raise OSError(f"Could not initialize tesseract with language {language}")
+        lib.TessBaseAPISetVariable(self.__handle, b"tessedit_char_whitelist", whitelist.encode())
+        lib.TessBaseAPISetPageSegMode(self.__handle, psm)
+
+    def ocr(self, img: np.ndarray) -> str:
+        if img.ndim == 3:
+            img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        img = np.ascontiguousarray(img, dtype=np.uint8)
+        height, width = img.shape[:2]
+        bytes_per_pixel = 1 if img.ndim == 2 else img.shape[2]
+        lib = self.__lib
+        with self.__lock:
+            lib.TessBaseAPISetImage(self.__handle, img.ctypes.data, width, height, bytes_per_pixel, img.strides[0])
+            lib.TessBaseAPISetSourceResolution(self.__handle, DEFAULT_DPI)
+            text_ptr = lib.TessBaseAPIGetUTF8Text(self.__handle)
+            try:
+                text = ctypes.string_at(text_ptr).decode("utf-8") if text_ptr else ""
+            finally:
+                if text_ptr:
+                    lib.TessDeleteText(text_ptr)
+                lib.TessBaseAPIClear(self.__handle)
+        return text
+
+    def __del__(self):
+        handle = getattr(self, "_CAPITesseractEngine__handle", None)
+        if handle is not None:
+            self.__lib.TessBaseAPIEnd(handle)
+            self.__lib.TessBaseAPIDelete(handle)
+            self.__handle = None
+
+
+__engines: Dict[Tuple[str, str, int, int, str], TesseractEngine] = {}
+__engines_pid = None
+__engines_lock = threading.Lock()
+# end engines before libtesseract's own cleanup at exit
+atexit.register(__engines.clear)
+
+
+@typechecked
+def tesseract_engine(language: str,
+                     whitelist: str,
+                     psm: int = PSM_SINGLE_BLOCK,
+                     oem: int = OEM_LSTM_ONLY,
+                     backend: Optional[str] = None) -> TesseractEngine:
+    """Get the engine of the configuration. Engines live for the life of the process.
+
+    :param backend: "capi", "pytesseract" or None to prefer the C API and fall back to pytesseract
+    """
+    global __engines_pid
+    assert backend in (None, "capi", "pytesseract")
+    with __engines_lock:
+        # engines are not inherited by forked processes
+        if __engines_pid != os.getpid():
+            __engines.clear()
+            __engines_pid = os.getpid()
+        key = (language, whitelist, psm, oem, backend)
+        engine = __engines.get(key)
+        if engine is None:
+            if backend in (None, "capi"):
+                try:
+                    engine = CAPITesseractEngine(language, whitelist, psm, oem)
+                except OSError as error:
+                    if backend == "capi":
+                        raise
+                    logging.getLogger(__name__).info(f"Fall back to pytesseract: {error}")
+            if engine is None:
+                engine = PyTesseractEngine(language, whitelist, psm, oem)
+            __engines[key] = engine
+        return engine
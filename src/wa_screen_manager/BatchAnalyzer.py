@@ -0,0 +1,141 @@
+from concurrent.futures import ProcessPoolExecutor
+import logging
+import os
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import cv2
+import numpy as np
+from wa_typechecker import typechecked
+
+from wa_config import game_conf
+from wa_types import LanguageCode
+from wa_language import Language
+from wa_language.LangVar import PlayerSex
+from .GameScreenEvent import GameScreenEvent
+from .DialogScreen.DialogScreenEvent import DialogScreenEvent
+from .DialogScreen.DialogScreenManager import DialogScreenManager
+from .MapScreen.MapScreenEvent import MapScreenEvent
+from .MapScreen.MapScreenManager import MapScreenManager
+
+
+@typechecked
+def event_record(event: GameScreenEvent) -> Dict[str, Any]:
+    """JSON-serializable data of a screen event (without the image)"""
+    if isinstance(event, DialogScreenEvent):
+        return {"screen": "dialog",
+                "title_ocr": event.title_ocr,
+                "title_keys": [str(key) for key in event.title_keys],
+                "body_ocr": event.body_ocr,
+                "body_bounds": [{"key": str(bound.key), "value": str(bound)} for bound in event.body_bounds],
+                "relation_ocr": event.relation_ocr,
+                "relation": event.relation}
+    if isinstance(event, MapScreenEvent):
+        date_timeofday = event.date_timeofday
+        if date_timeofday is not None:
+            date_timeofday = {"date_key": str(date_timeofday.date_key),
+                              "year": date_timeofday.year,
+                              "day": date_timeofday.day,
+                              "timeofday_key": str(date_timeofday.timeofday_key)}
+        return {"screen": "map",
+                "calendar_ocr": event.calendar_ocr,
+                "calendar_overlapped": event.calendar_overlapped,
+                "date_timeofday": date_timeofday}
+    return {"screen": "unknown"}
+
+
+class _Worker:
+    """Screen managers owned by a worker process
+
+    Worker processes already load all the cores, so OCRs of a dialog screen run sequentially.
+    """
+    def __init__(self,
+                 language_code: LanguageCode,
+                 player_name: Optional[str],
+                 player_sex: Optional[PlayerSex]):
+        special_language = None
+        if player_name is not None:
+            special_language = {"wa_player": player_name}
+        lang = Language.load(language_code, special_language)
+        self.__screen_managers = (MapScreenManager(lang),
+                                  DialogScreenManager(lang, player_sex, parallel_ocr=False))
+        self.__stable_screenshots = max(screen_manager.stable_screenshots
+                                        for screen_manager in self.__screen_managers)
+        self.__events: List[GameScreenEvent] = []
+        for screen_manager in self.__screen_managers:
+            screen_manager.append_handler(self.__events.append)
+        self.__blank = None
+
+    def analyze(self, file_path: str) -> Dict[str, Any]:
+        img = cv2.imread(file_path, cv2.IMREAD_COLOR)
+        if img is None:
+            return {"file": file_path, "error": "Could not read an image"}
+        if self.__blank is None or self.__blank.shape != img.shape:
+            self.__blank = np.zeros_like(img)
+        self.__events.clear()
+        try:
+            # the blank screenshot resets the previous event of screen managers,
+            # so an event is dispatched for every screenshot, even if it repeats the previous one,
+            # then the screenshot is processed several times to be stable for OCRs
+            for screenshot in (self.__blank, *(img,) * self.__stable_screenshots):
+                for screen_manager in self.__screen_managers:
+                    screen_manager.process(screenshot)
+        except Exception as error:
+            return {"file": file_path, "error": repr(error)}
+        record = event_record(self.__events[-1]) if self.__events else event_record(GameScreenEvent())
+        return {"file": file_path, **record}
+
+
+_worker: Optional[_Worker] = None
+
+
+def _init_worker(language_code: LanguageCode,
+                 player_name: Optional[str],
+                 player_sex: Optional[PlayerSex]):
+    global _worker
+    _worker = _Worker(language_code, player_name, player_sex)
+
+
+def _analyze(file_path: str) -> Dict[str, Any]:
+    return _worker.analyze(file_path)
+
+
+class BatchAnalyzer:
+    """Offline analysis of screenshot files across a process pool
+
+    Every worker process owns its own MapScreenManager and DialogScreenManager.
+    Screenshots are independent of each other:
+    every screenshot gets a record with its screen event data or "unknown" screen.
+    Records are yielded in the input order.
+    """
+    @typechecked
+    def __init__(self,
+                 language_code: Optional[str] = None,
+                 player_name: Optional[str] = None,
+                 player_sex: Optional[PlayerSex] = None,
+                 jobs: Optional[int] = None):
+        self.__logger = logging.getLogger(__name__)
+        try:
+            language_code = LanguageCode(language_code)
+        except ValueError:
+            language_code = None
+        if language_code is None:
+            language_code = game_conf.language_code
+        self.__language_code = language_code
+        self.__player_name = player_name
+        self.__player_sex = player_sex
+        self.__jobs = jobs if jobs else os.cpu_count()
+
+    @typechecked
+    def analyze(self, file_paths: Sequence[str]) -> Iterator[Dict[str, Any]]:
+        if not file_paths:
+            return
+        jobs = min(self.__jobs, len(file_paths))
+        # contiguous chunks keep the order cheap and make consecutive screenshots share a worker
+        chunksize = max(1, len(file_paths) // (jobs * 4))
+        self.__logger.info(f"Analyze {len(file_paths)} screenshots by {jobs} workers")
+        with ProcessPoolExecutor(max_workers=jobs,
+                                 initializer=_init_worker,
+                                 initargs=(self.__language_code,
+                                           self.__player_name,
+                                           self.__player_sex)) as executor:
+            yield from executor.map(_analyze, file_paths, chunksize=chunksize)
@@ -0,0 +1,102 @@
+import threading
+import time
+from typing import Iterable, Iterator
+
+import numpy as np
+from wa_typechecker import typechecked
+
+
+class CaptureScheduler:
+    """Adaptive pacing of screen capturing
+
+    While screenshots are recognized (some screen sampler returns DOUBT or MATCH)
+    the screen is captured with the steady cadence of min_interval.
+    While nothing is recognized the interval grows exponentially up to max_interval.
+    The first recognized screenshot resets the interval to min_interval
+    and wakes up a pending wait.
+
+    Tests:
+    >>> scheduler = CaptureScheduler(min_interval=0.0, max_interval=0.1)
+    >>> scheduler.interval
+    0.0
+    >>> for _ in range(3): scheduler.update(False)
+    >>> scheduler.interval
+    0.04
+    >>> for _ in range(3): scheduler.update(False)
+    >>> scheduler.interval
+    0.1
+    >>> scheduler.update(True)
+    >>> scheduler.interval
+    0.0
+    """
+    # the first step of the backoff from the zero min_interval
+    IDLE_STEP = 0.01
+    BACKOFF = 2.0
+    # default intervals (of GameScreenManager.run and the command line too)
+    MIN_INTERVAL = 0.0
+    MAX_INTERVAL = 0.5
+
+    @typechecked
+    def __init__(self, min_interval: float = MIN_INTERVAL, max_interval: float = MAX_INTERVAL):
+        assert 0 <= min_interval <= max_interval
+        self.__min_interval = min_interval
+        self.__max_interval = max_interval
+        self.__interval = min_interval
+        self.__condition = threading.Condition()
+        self.__last_capture = None
+        self.__idle_time = 0.0
+
+    @property
+    def interval(self) -> float:
+        """Current interval between screen captures in seconds"""
+        return self.__interval
+
+    @property
+    def idle_time(self) -> float:
+        """Total time spent waiting in seconds"""
+        return self.__idle_time
+
+    @typechecked
+    def update(self, match: bool):
+        """Report whether the last screenshot is recognized"""
+        with self.__condition:
+            if match:
+                if self.__interval != self.__min_interval:
+                    self.__interval = self.__min_interval
+                    self.__condition.notify_all()
+            else:
+                self.__interval = min(self.__max_interval,
+                                      max(self.__interval * self.BACKOFF, self.IDLE_STEP))
+
+    def wait(self):
+        """Wait until the next capture is due
+
+        The interval is counted from the previous capture (not from the end of the previous wait),
+        so processing time doesn't add up to the interval.
+        """
+        with self.__condition:
+            start = time.perf_counter()
+            if self.__last_capture is not None:
+                while (remaining := self.__last_capture + self.__interval - time.perf_counter()) > 0:
+                    self.__condition.wait(remaining)
+            self.__last_capture = time.perf_counter()
+            self.__idle_time += self.__last_capture - start
+
+    def pace(self, frames: Iterable[np.ndarray]) -> Iterator[np.ndarray]:
+        """Iterate frames waiting before capturing each of them"""
+        iterator = iter(frames)
+        try:
+            while True:
+                self.wait()
+                try:
+                    frame = next(iterator)
+                except StopIteration:
+                    return
+                yield frame
+        finally:
+            if hasattr(iterator, "close"):
+                iterator.close()
+
+    def __str__(self):
+        return (f"interval {self.__interval * 1000:.0f} ms, "
+                f"idle {self.__idle_time:.1f} s")
@@ -1,18 +1,24 @@
+from concurrent.futures import ThreadPoolExecutor
 import logging
-from typing import Optional
+import time
+from typing import Dict, Optional, Tuple, Union
 
 import numpy as np
 
 from wa_typechecker import typechecked
+from wa_types import Box
 from wa_config import screen_conf
 from wa_language.Language import Language
 from wa_language.LangVar import PlayerSex
 from wa_model.dialog_model.DialogBodyModel import DialogBodyModel
 from ..SampleMatch import SampleMatch
+from ..LatencyStats import LatencyStats
 from ..BaseScreen.GameScreenEventDispatcher import GameScreenEventDispatcher
+from ..BaseScreen.BaseSampler import BaseSampler
 from .DialogScreenEvent import DialogScreenEvent
 from .DialogScreenSamplers import DialogScreenScreenSampler, DialogScreenRelationSampler
-from .DialogScreenOCRs import DialogScreenTitleOCR, DialogScreenRelationOCR, DialogBodyOCR, NonStable
+from .DialogScreenOCRs import DialogScreenTitleOCR, DialogScreenRelationOCR, DialogBodyOCR, NonStable, NonStableType
+from ..BaseScreen.BaseOCR import BaseOCR
 from .DialogScreenTitleFuzzyParser import DialogScreenTitleFuzzyParser
 from .DialogScreenRelationParser import DialogScreenRelationParser
 from .DialogBodyFuzzyParser import DialogBodyFuzzyParser
@@ -29,7 +35,17 @@ class DialogScreenManager(GameScreenEventDispatcher):
     @typechecked
     def __init__(self,
                  lang: Language,
-                 player_sex: Optional[PlayerSex] = None):
+                 player_sex: Optional[PlayerSex] = None,
+                 parallel_ocr: bool = False,
+                 glyphs: bool = False):
+        """
+        :param parallel_ocr: Recognize title, body and relation crops concurrently.
+               All the crops are tracked for stability on every screenshot of a dialog screen,
+               so they become stable together and a new dialog is dispatched once with its body.
+               Otherwise the title is recognized first, the body and the relation only if the title is stable,
+               so a new dialog is dispatched without a body first.
+        :param glyphs: Match glyphs of the built glyph atlas before Tesseract.
+        """
         super().__init__()
         self.__logger = logging.getLogger(__name__)
         self.__lang = lang
@@ -40,7 +56,8 @@ class DialogScreenManager(GameScreenEventDispatcher):
                                                           screen_conf.DIGITS)
         self.__title_parser = DialogScreenTitleFuzzyParser(lang)
         self.__relation_sampler = DialogScreenRelationSampler()
-        self.__relation_ocr = DialogScreenRelationOCR(language_code=lang.language_code)
+        self.__relation_ocr = DialogScreenRelationOCR(language_code=lang.language_code,
+                                                      glyphs=glyphs)
         self.__relation_parser = DialogScreenRelationParser()
         self.__body_model = DialogBodyModel(language=lang,
                                             player_name=None,
@@ -48,29 +65,96 @@ class DialogScreenManager(GameScreenEventDispatcher):
         self.__body_ocr = DialogBodyOCR(language_code=lang.language_code,
                                         whitelist=self.__body_model.symbols)
         self.__body_parser = DialogBodyFuzzyParser(self.__body_model)
+        self.__parallel_ocr = parallel_ocr
+        # the executor is created on the first use, so the manager could be used again after close
+        self.__ocr_executor = None
+        self.__stable_to_dispatch = LatencyStats()
+        # OCRs run on the previous screenshot and processing start of the screenshot the dialog became stable on
+        self.__prev_ocrs = tuple()
+        self.__stable_start = None
         self.__prev__event = None
 
+    @property
+    def stable_to_dispatch(self) -> LatencyStats:
+        """Latency from processing start of the screenshot a dialog became stable on to dispatching its events
+
+        A dialog becomes stable on the first screenshot with a stable title
+        and with no changes of the crops recognized on the previous screenshot,
+        so events dispatched on later screenshots (like a body recognized later) include the intervals.
+        """
+        return self.__stable_to_dispatch
+
+    def close(self):
+        """Shut down the OCR executor"""
+        if self.__ocr_executor is not None:
+            self.__ocr_executor.shutdown()
+            self.__ocr_executor = None
+
+    @property
+    def screen_sampler(self) -> BaseSampler:
+        return self.__screen_sample
+
+    @property
+    def sample_boxes(self) -> Tuple[Box, ...]:
+        """Boxes checked by the screen sampler"""
+        return self.__screen_sample.boxes
+
+    @property
+    def crop_boxes(self) -> Tuple[Box, ...]:
+        """Boxes required to process a screenshot matched by the screen sampler"""
+        return (self.__title_ocr.crop_box,
+                self.__body_ocr.crop_box,
+                self.__relation_ocr.crop_box,
+                *self.__relation_sampler.boxes)
+
+    @property
+    def stable_screenshots(self) -> int:
+        """A number of times a still screenshot has to be processed in a row to be recognized with its body
+
+        Sequentially the body and the relation start being tracked on the screenshot the title is stable on.
+        """
+        rest_stable_frames = max(self.__body_ocr.stable_frames, self.__relation_ocr.stable_frames)
+        if self.__parallel_ocr:
+            return max(self.__title_ocr.stable_frames, rest_stable_frames)
+        return self.__title_ocr.stable_frames + rest_stable_frames - 1
+
+    @typechecked
+    def check(self, img: np.ndarray) -> SampleMatch:
+        """Check the screen sampler only"""
+        return self.__screen_sample.check(img)
+
     @typechecked
-    def process(self, img: np.ndarray) -> SampleMatch:
-        screen_sample_matches = self.__screen_sample.check(img)
+    def process(self, img: np.ndarray, screen_sample_matches: Optional[SampleMatch] = None) -> SampleMatch:
+        """
+        :param screen_sample_matches: The screen sampler decision if it's already checked (by a CompiledSampler).
+        """
+        if screen_sample_matches is None:
+            screen_sample_matches = self.__screen_sample.check(img)
         if not screen_sample_matches:
+            self.__prev_ocrs = tuple()
+            self.__stable_start = None
             self.__prev__event = None
         else:
-            title_ocr = self.__title_ocr.ocr(img)
+            start = time.perf_counter()
+            results = self.__ocr(img)
+            title_ocr = results[self.__title_ocr]
+            if title_ocr is NonStable or any(result is NonStable and ocr in self.__prev_ocrs
+                                             for ocr, result in results.items()):
+                self.__stable_start = None
+            elif self.__stable_start is None:
+                self.__stable_start = start
+            self.__prev_ocrs = tuple(results)
             if title_ocr is NonStable:
                 self.__prev__event = None
             else:
                 title_ocr_prep = self.__title_parser.prep(title_ocr)
                 title_keys = self.__title_parser.keys(title_ocr_prep)
-                relation_sampler_matches = self.__relation_sampler.check(img)
-                relation_ocr, relation = None, None
-                if relation_sampler_matches:
-                    relation_ocr = self.__relation_ocr.ocr(img)
-                    if relation_ocr is NonStable:
-                        relation_ocr = None
-                    else:
-                        relation = self.__relation_parser.relation(relation_ocr)
-                body_ocr = self.__body_ocr.ocr(img)
+                relation_ocr, relation = results.get(self.__relation_ocr), None
+                if relation_ocr is NonStable:
+                    relation_ocr = None
+                elif relation_ocr is not None:
+                    relation = self.__relation_parser.relation(relation_ocr)
+                body_ocr = results[self.__body_ocr]
                 if body_ocr is NonStable:
                     body_ocr = None
                 if body_ocr is not None:
@@ -87,5 +171,28 @@ class DialogScreenManager(GameScreenEventDispatcher):
                                           relation=relation)
                 if event != self.__prev__event:
                     self.__prev__event = event
+                    if self.__stable_start is not None:
+                        self.__stable_to_dispatch.add(time.perf_counter() - self.__stable_start)
                     self._dispatch(event)
         return screen_sample_matches
+
+    def __ocr(self, img: np.ndarray) -> Dict[BaseOCR, Union[str, NonStableType]]:
+        """OCR results of the crops recognized on the screenshot
+
+        The relation crop is recognized only if the relation sampler matches.
+        Sequentially the title is recognized first and the rest only if it's stable.
+        """
+        if not self.__parallel_ocr:
+            results = {self.__title_ocr: self.__title_ocr.ocr(img)}
+            if results[self.__title_ocr] is not NonStable:
+                if self.__relation_sampler.check(img):
+                    results[self.__relation_ocr] = self.__relation_ocr.ocr(img)
+                results[self.__body_ocr] = self.__body_ocr.ocr(img)
+            return results
+        ocrs = [self.__title_ocr, self.__body_ocr]
+        if self.__relation_sampler.check(img):
+            ocrs.append(self.__relation_ocr)
+        if self.__ocr_executor is None:
+            self.__ocr_executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="DialogScreenOCR")
+        futures = [self.__ocr_executor.submit(ocr.ocr, img) for ocr in ocrs]
+        return {ocr: future.result() for ocr, future in zip(ocrs, futures)}
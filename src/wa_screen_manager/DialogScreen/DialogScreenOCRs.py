@@ -5,11 +5,19 @@ import numpy as np
 
 from wa_typechecker import typechecked
 from wa_types import LanguageCode
-from wa_screen_manager.BaseScreen.BaseOCR import BaseOCR, NonStableType, NonStable
+from wa_screen_manager.BaseScreen.BaseOCR import BaseOCR, NonStableType, NonStable, diff_extent
+from wa_screen_manager.BaseScreen.GlyphAtlas import load_dataset_glyph_atlas
+
+# a white margin around the text extent keeps Tesseract layout analysis reliable
+TEXT_EXTENT_MARGIN = 10
 
 
 class DialogScreenTitleOCR(BaseOCR):
-    def __init__(self, language_code: LanguageCode, whitelist: str):
+    def __init__(self, language_code: LanguageCode, whitelist: str, tight_crop: bool = False):
+        """
+        :param tight_crop: Recognize only the extent of the text (the difference with the blank screen).
+               Off by default till its accuracy is compared on datasets (see utils/dialog_body_ocr_benchmark.py).
+        """
         from wa_screen_manager import config
         from . import dialog_screen_config
         crop_box = dialog_screen_config.title_box
@@ -21,6 +29,7 @@ class DialogScreenTitleOCR(BaseOCR):
         blank_image = blank_image[crop_box.slice]
         blank_image = cv2.cvtColor(blank_image, cv2.COLOR_BGR2GRAY)
         self.__blank_img_gray = blank_image
+        self.__tight_crop = tight_crop
 
     def ocr(self, img: np.ndarray) -> Union[str, NonStableType]:
         title_ocr = super().ocr(img)
@@ -34,16 +43,24 @@ class DialogScreenTitleOCR(BaseOCR):
         img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
         # diff with blank
         img = cv2.absdiff(self.__blank_img_gray, img)
+        extent = diff_extent(img, margin=TEXT_EXTENT_MARGIN) if self.__tight_crop else None
         img = cv2.normalize(img, None, 0, 255, cv2.NORM_MINMAX)
         img = 255 - img
         clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
         img = clahe.apply(img)
         img = cv2.GaussianBlur(img, (13, 13), 0.7)
+        # crop after the preprocessing to keep it the same as for the whole image
+        if extent is not None:
+            img = img[extent.slice]
         return img
 
 
 class DialogScreenRelationOCR(BaseOCR):
-    def __init__(self, language_code: LanguageCode):
+    def __init__(self, language_code: LanguageCode, glyphs: bool = False):
+        """
+        :param glyphs: Match glyphs of the atlas built from the dialog_relations dataset before Tesseract
+               (if the atlas is built for the current preprocessing).
+        """
         from wa_config import screen_conf
         from wa_screen_manager import config
         from . import dialog_screen_config
@@ -56,6 +73,10 @@ class DialogScreenRelationOCR(BaseOCR):
         blank_image = blank_image[crop_box.slice]
         blank_image = cv2.cvtColor(blank_image, cv2.COLOR_BGR2GRAY)
         self.__blank_img_gray = blank_image
+        if glyphs:
+            self.glyph_atlas = load_dataset_glyph_atlas(dataset_name="dialog_relations",
+                                                        language_code=language_code,
+                                                        preprocessing_digest=self.preprocessing_digest)
 
     @typechecked
     def _preprocess(self, img: np.ndarray) -> np.ndarray:
@@ -72,7 +93,11 @@ class DialogScreenRelationOCR(BaseOCR):
 
 
 class DialogBodyOCR(BaseOCR):
-    def __init__(self, language_code: LanguageCode, whitelist: str):
+    def __init__(self, language_code: LanguageCode, whitelist: str, tight_crop: bool = False):
+        """
+        :param tight_crop: Recognize only the extent of the text (the difference with the blank screen).
+               Off by default till its accuracy is compared on datasets (see utils/dialog_body_ocr_benchmark.py).
+        """
         from wa_screen_manager import config
         from . import dialog_screen_config
         crop_box = dialog_screen_config.body_box
@@ -84,6 +109,7 @@ class DialogBodyOCR(BaseOCR):
         blank_image = blank_image[crop_box.slice]
         blank_image = cv2.cvtColor(blank_image, cv2.COLOR_BGR2GRAY)
         self.__blank_img_gray = blank_image
+        self.__tight_crop = tight_crop
 
     @typechecked
     def _preprocess(self, img: np.ndarray) -> np.ndarray:
@@ -91,9 +117,13 @@ class DialogBodyOCR(BaseOCR):
         img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
         # diff with blank
         img = cv2.absdiff(self.__blank_img_gray, img)
+        extent = diff_extent(img, margin=TEXT_EXTENT_MARGIN) if self.__tight_crop else None
         img = cv2.normalize(img, None, 0, 255, cv2.NORM_MINMAX)
         img = 255 - img
         clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
         img = clahe.apply(img)
         img = cv2.GaussianBlur(img, (13, 13), 0.7)
+        # crop after the preprocessing to keep it the same as for the whole image
+        if extent is not None:
+            img = img[extent.slice]
         return img
@@ -1,30 +1,43 @@
 from collections import namedtuple
 import logging
-from typing import Tuple
+from typing import Dict, Tuple
 
+import numpy as np
 import rapidfuzz as fz
 from wa_typechecker import typechecked
 
 from wa_language.Language import Language
 from wa_language.LangKey import LangKey
 from wa_model.troop_keys import is_troop_key
-
-
-TEXT = 0
-SCORE = 1
-KEY = 2
+from wa_types import LRUCache
+from ..BaseScreen.FuzzyChoices import FuzzyChoices
 
 
 class DialogScreenTitleFuzzyParser:
     @typechecked
-    def __init__(self, lang: Language):
+    def __init__(self, lang: Language, memo_size: int = 1024):
+        """
+        :param memo_size: Count of the latest title OCR results kept with their keys.
+        """
         from . import dialog_screen_config
         self.__logger = logging.getLogger(__name__)
         self.__title_score_cutoff = dialog_screen_config.fuzzy_title_score_cutoff
         self.__logger.info(f"title_score_cutoff = {self.__title_score_cutoff}")
-        self.__titles = is_troop_key.lang(lang)
-        self.__prev_title_ocr = None
-        self.__prev_title_keys = None
+        # hundreds of titles are shortlisted by n-grams before token set scoring
+        self.__titles = FuzzyChoices(is_troop_key.lang(lang), indexed=True)
+        # an exact title text is the only best match with itself, so it's bound to keys
+        # of all the titles with the same text (in the titles order) without scoring
+        self.__exact_titles: Dict[str, Tuple[LangKey, ...]] = {}
+        for key, title in zip(self.__titles.keys, self.__titles.choices):
+            # rapidfuzz scores empty strings by 0
+            if str(title):
+                self.__exact_titles[str(title)] = self.__exact_titles.get(str(title), tuple()) + (key,)
+        self.__memo = LRUCache(memo_size)
+
+    @property
+    def memo(self) -> LRUCache:
+        """Keys of the latest title OCR results"""
+        return self.__memo
 
     @typechecked
     def prep(self, title_ocr: str) -> str:
@@ -36,39 +49,37 @@ class DialogScreenTitleFuzzyParser:
 
     @typechecked
     def keys(self, title_ocr: str) -> Tuple[LangKey, ...]:
-        if title_ocr != self.__prev_title_ocr:
-            self.__prev_title_ocr = title_ocr
+        title_keys = self.__memo.get(title_ocr)
+        if title_keys is None:
             prepped_title_ocr = self.prep(title_ocr)
-            self.__prev_title_keys = self.__fuzzy_title(prepped_title_ocr)
-        return self.__prev_title_keys
+            title_keys = self.__exact_titles.get(prepped_title_ocr)
+            if title_keys is None:
+                title_keys = self.__fuzzy_title(prepped_title_ocr)
+            self.__memo.put(title_ocr, title_keys)
+        return title_keys
 
     @typechecked
     def __fuzzy_title(self, title_ocr: str) -> Tuple[LangKey, ...]:
-        choices = self.__titles
+        titles = self.__titles
         # token set ratio with score cutoff
-        matches = fz.process.extract(query=title_ocr,
-                                     scorer=fz.fuzz.token_set_ratio,
-                                     score_cutoff=self.__title_score_cutoff,
-                                     choices=choices,
-                                     limit=len(choices))
-        if not matches:
+        token_set_scores = titles.scores(title_ocr,
+                                         scorer=fz.fuzz.token_set_ratio,
+                                         score_cutoff=self.__title_score_cutoff)
+        idxes = np.flatnonzero(token_set_scores)
+        if len(idxes) == 0:
             return tuple()
-        # build choices from matches
-        choices = {key: choices[key] for _, _, key in matches}
-        # sort matches by ratio
-        matches = fz.process.extract(query=title_ocr,
-                                     scorer=fz.fuzz.ratio,
-                                     choices=choices,
-                                     limit=len(choices))
-        # filter best matches
-        best_score = matches[0][SCORE]
-        matches = [match for match in matches if match[SCORE] == best_score]
+        # best ratio among the matches
+        ratio_scores = FuzzyChoices([titles.choices[idx] for idx in idxes]).scores(title_ocr)
+        best_idxes = np.flatnonzero(ratio_scores == ratio_scores.max())
+        # order best matches by token set ratio, then by titles order
+        best_idxes = best_idxes[np.argsort(-token_set_scores[idxes[best_idxes]], kind="stable")]
+        matches = [idxes[idx] for idx in best_idxes]
         # check that all best matches have the same text
-        best_text = matches[0][TEXT]
-        for match in matches:
-            if match[TEXT] != best_text:
-                self.__logger.warning(f"best matches have different texts: '{best_text}' and 'match[TEXT]'")
+        best_text = titles.choices[matches[0]]
+        for idx in matches:
+            if titles.choices[idx] != best_text:
+                self.__logger.warning(f"best matches have different texts: '{best_text}' and '{titles.choices[idx]}'")
                 break
         # Note: use Tuple instead of FrozenSen due to it should be faster
-        keys = tuple(key for _, _, key in matches)
+        keys = tuple(titles.keys[idx] for idx in matches)
         return keys
@@ -0,0 +1,115 @@
+from collections import deque
+import logging
+import threading
+from typing import Optional, Tuple, Union
+
+import numpy as np
+from wa_typechecker import typechecked
+
+
+class FrameBufferRing:
+    """Fixed number of preallocated frame buffers leased to screen captures
+
+    A capture acquires a free buffer for every screenshot and the consumer releases the screenshot
+    (the buffer or any view of it) once it's processed, then the buffer is reused for a next screenshot.
+    A screenshot must not be used after its release: event handlers copy the image if they keep it longer
+    (dispatching is synchronous, so the image stays valid within handlers).
+    The number of buffers is a hard cap: if all of them are leased, acquire waits for a release.
+    Released buffers are reused in the order of releasing.
+
+    Tests:
+    >>> ring = FrameBufferRing((2, 3, 3), size=2)
+    >>> first = ring.acquire()
+    >>> second = ring.acquire()
+    >>> second is first
+    False
+    >>> ring.acquire(timeout=0.01)
+    Traceback (most recent call last):
+    ...
+    TimeoutError: All 2 frame buffers are leased
+    >>> ring.release(first[:, 1:])  # a view of the buffer
+    >>> ring.acquire() is first
+    True
+    >>> ring.release(second)
+    >>> ring.release(second)
+    Traceback (most recent call last):
+    ...
+    ValueError: The frame buffer is not leased
+    >>> ring.release(np.zeros((2, 3, 3), dtype=np.uint8))
+    Traceback (most recent call last):
+    ...
+    ValueError: The frame is not a buffer of the ring
+    >>> ring.leased, ring.acquired, ring.waits
+    (1, 3, 1)
+    """
+    @typechecked
+    def __init__(self, shape: Tuple[int, ...], size: int = 4, dtype: type = np.uint8):
+        """
+        :param size: The number of buffers, i.e. the number of screenshots leased at once.
+        """
+        assert size > 0
+        self.__logger = logging.getLogger(__name__)
+        self.__shape = shape
+        self.__dtype = dtype
+        self.__buffers = tuple(np.empty(shape, dtype=dtype) for _ in range(size))
+        self.__idxes = {id(buffer): idx for idx, buffer in enumerate(self.__buffers)}
+        self.__free = deque(range(size))
+        self.__condition = threading.Condition()
+        self.__acquired = 0
+        self.__waits = 0
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return self.__shape
+
+    @property
+    def allocated(self) -> int:
+        """Number of buffers allocated by the ring"""
+        return len(self.__buffers)
+
+    @property
+    def leased(self) -> int:
+        """Number of buffers acquired and not released yet"""
+        return len(self.__buffers) - len(self.__free)
+
+    @property
+    def acquired(self) -> int:
+        return self.__acquired
+
+    @property
+    def waits(self) -> int:
+        """Number of acquisitions that waited for a release"""
+        return self.__waits
+
+    @typechecked
+    def acquire(self, timeout: Optional[Union[int, float]] = None) -> np.ndarray:
+        """Lease a free buffer, wait for a release if all the buffers are leased
+
+        The buffer keeps the content of the frame it held before.
+        Raises TimeoutError if no buffer is released within the timeout (in seconds).
+        """
+        with self.__condition:
+            if not self.__free:
+                self.__waits += 1
+                self.__logger.debug(f"All {len(self.__buffers)} frame buffers are leased, wait for a release")
+                if not self.__condition.wait_for(lambda: self.__free, timeout):
+                    raise TimeoutError(f"All {len(self.__buffers)} frame buffers are leased")
+            self.__acquired += 1
+            return self.__buffers[self.__free.popleft()]
+
+    @typechecked
+    def release(self, frame: np.ndarray):
+        """Return the leased buffer of the frame (the buffer or its view) to the ring"""
+        buffer = frame if frame.base is None else frame.base
+        idx = self.__idxes.get(id(buffer))
+        if idx is None or self.__buffers[idx] is not buffer:
+            raise ValueError("The frame is not a buffer of the ring")
+        with self.__condition:
+            if idx in self.__free:
+                raise ValueError("The frame buffer is not leased")
+            self.__free.append(idx)
+            self.__condition.notify()
+
+    def __str__(self):
+        return (f"{self.allocated} buffers of {np.prod(self.__shape) * np.dtype(self.__dtype).itemsize} bytes, "
+                f"{self.__acquired} acquired, {self.__waits} waited for a release")
@@ -0,0 +1,227 @@
+from collections import deque
+import logging
+import threading
+import time
+from typing import Callable, Iterable, NamedTuple, Optional
+
+import numpy as np
+from wa_typechecker import typechecked
+
+from .LatencyStats import LatencyStats
+
+
+class TimedFrame(NamedTuple):
+    # time.perf_counter() value at the moment the frame was captured
+    timestamp: float
+    frame: np.ndarray
+
+
+class FrameRing:
+    """Bounded ring of captured frames with the "latest frame wins" policy
+
+    - put never blocks: if the ring is full, the oldest frame is dropped.
+    - get blocks until a frame is available, returns the latest one
+      and drops all the older (stale) frames.
+    Dropped frames (and frames put into the closed ring) are released.
+
+    A lossless ring is a bounded FIFO queue instead: put blocks while the ring is full,
+    get returns the oldest frame, no frame is dropped.
+
+    Tests:
+    >>> released = []
+    >>> ring = FrameRing(size=2, release=lambda frame: released.append(int(frame[0])))
+    >>> for idx in range(3): ring.put(TimedFrame(float(idx), np.full(1, idx)))
+    >>> ring.dropped, released  # the frame 0 is overwritten by the frame 2
+    (1, [0])
+    >>> ring.get().timestamp  # the frame 1 is stale
+    2.0
+    >>> ring.dropped, released
+    (2, [0, 1])
+    >>> ring.put(TimedFrame(3.0, np.full(1, 3)))
+    >>> ring.close()
+    >>> ring.discard()
+    >>> ring.get() is None, released
+    (True, [0, 1, 3])
+    >>> ring = FrameRing(size=2, lossless=True)
+    >>> for idx in range(2): ring.put(TimedFrame(float(idx), np.full(1, idx)))
+    >>> ring.get().timestamp, ring.get().timestamp, ring.dropped
+    (0.0, 1.0, 0)
+    """
+    @typechecked
+    def __init__(self,
+                 size: int,
+                 release: Optional[Callable[[np.ndarray], None]] = None,
+                 lossless: bool = False):
+        """
+        :param release: Releases a frame that is not got by the consumer (see FrameSource.release).
+        :param lossless: Block the producer while the ring is full instead of dropping frames.
+        """
+        assert size > 0
+        self.__release = release
+        self.__lossless = lossless
+        self.__frames = deque(maxlen=size)
+        self.__condition = threading.Condition()
+        self.__closed = False
+        self.__error = None
+        self.__dropped = 0
+
+    @property
+    def dropped(self) -> int:
+        return self.__dropped
+
+    @property
+    def closed(self) -> bool:
+        return self.__closed
+
+    @property
+    def lossless(self) -> bool:
+        return self.__lossless
+
+    @typechecked
+    def put(self, timed_frame: TimedFrame):
+        with self.__condition:
+            if self.__lossless:
+                while len(self.__frames) == self.__frames.maxlen and not self.__closed:
+                    self.__condition.wait()
+            if self.__closed:
+                self.__release_frames((timed_frame,))
+                return
+            if len(self.__frames) == self.__frames.maxlen:
+                self.__dropped += 1
+                self.__release_frames((self.__frames.popleft(),))
+            self.__frames.append(timed_frame)
+            self.__condition.notify()
+
+    @typechecked
+    def get(self) -> Optional[TimedFrame]:
+        """Return the latest frame (the oldest one if lossless) or None if the ring is closed"""
+        with self.__condition:
+            while not self.__frames and not self.__closed:
+                self.__condition.wait()
+            if self.__error is not None:
+                raise self.__error
+            if not self.__frames:
+                return None
+            if self.__lossless:
+                timed_frame = self.__frames.popleft()
+                self.__condition.notify()
+                return timed_frame
+            timed_frame = self.__frames.pop()
+            self.__dropped += len(self.__frames)
+            self.__release_frames(self.__frames)
+            self.__frames.clear()
+            return timed_frame
+
+    @typechecked
+    def close(self, error: Optional[BaseException] = None):
+        """Close the ring. The error (if any) is re-raised by the consumer's get call"""
+        with self.__condition:
+            self.__closed = True
+            self.__error = error
+            self.__condition.notify_all()
+
+    def discard(self):
+        """Release the frames left in the ring (by the consumer that doesn't get them any longer)"""
+        with self.__condition:
+            self.__release_frames(self.__frames)
+            self.__frames.clear()
+
+    def __release_frames(self, timed_frames):
+        if self.__release is not None:
+            for timed_frame in timed_frames:
+                self.__release(timed_frame.frame)
+
+
+class FramePipeline:
+    """Pipelined capture/analysis loop
+
+    A capture thread iterates frames and feeds them into a bounded FrameRing.
+    The analysis runs in the caller's thread: it takes the latest frame from the ring and processes it.
+    Frames that become stale while the previous frame is being analysed are dropped,
+    unless the pipeline is lossless: then capturing waits for the analysis and every frame is processed
+    (replay sources need it, e.g. a still screenshot repeated for OCRs to tell its texts are stable).
+
+    Note that the frames iterable is iterated by the capture thread only,
+    so it's the right place to create thread-bound capture objects (like mss.mss()).
+    Every frame is released once it's processed or dropped.
+    """
+    @typechecked
+    def __init__(self,
+                 frames: Iterable[np.ndarray],
+                 process: Callable[[np.ndarray], None],
+                 ring_size: int = 2,
+                 release: Optional[Callable[[np.ndarray], None]] = None,
+                 lossless: bool = False):
+        """
+        :param release: Releases a frame (see FrameSource.release).
+        :param lossless: Don't drop frames, capturing waits while the ring is full.
+        """
+        self.__logger = logging.getLogger(__name__)
+        self.__frames = frames
+        self.__process = process
+        self.__release = release
+        self.__ring = FrameRing(ring_size, release, lossless)
+        self.__captured = 0
+        self.__processed = 0
+        self.__latency = LatencyStats()
+
+    @property
+    def captured(self) -> int:
+        return self.__captured
+
+    @property
+    def processed(self) -> int:
+        return self.__processed
+
+    @property
+    def dropped(self) -> int:
+        return self.__ring.dropped
+
+    @property
+    def latency(self) -> LatencyStats:
+        """End-to-end latency: from capturing a frame to the end of its processing"""
+        return self.__latency
+
+    def run(self):
+        """Run the pipeline until the frames are exhausted or an exception is raised"""
+        capture_thread = threading.Thread(target=self.__capture,
+                                          name="FramePipeline.capture",
+                                          daemon=True)
+        capture_thread.start()
+        try:
+            while (timed_frame := self.__ring.get()) is not None:
+                try:
+                    self.__process(timed_frame.frame)
+                finally:
+                    if self.__release is not None:
+                        self.__release(timed_frame.frame)
+                self.__processed += 1
+                self.__latency.add(time.perf_counter() - timed_frame.timestamp)
+        finally:
+            self.__ring.close()
+            # the capture thread could wait for a frame buffer held by the ring
+            self.__ring.discard()
+            capture_thread.join()
+
+    def __capture(self):
+        error = None
+        try:
+            for frame in self.__frames:
+                # the closed ring releases the frame
+                self.__ring.put(TimedFrame(time.perf_counter(), frame))
+                if self.__ring.closed:
+                    break
+                self.__captured += 1
+        except BaseException as exception:
+            error = exception
+        finally:
+            # close a generator within the thread it's iterated by
+            if hasattr(self.__frames, "close"):
+                self.__frames.close()
+            self.__ring.close(error)
+
+    def __str__(self):
+        return (f"captured {self.__captured}, "
+                f"processed {self.__processed}, "
+                f"dropped {self.dropped}, "
+                f"latency: {self.__latency}")
@@ -0,0 +1,116 @@
+from abc import ABC, abstractmethod
+import logging
+import os
+from os import path
+from typing import Iterator, Sequence, Tuple
+
+import cv2
+import numpy as np
+from wa_typechecker import typechecked
+
+
+class FrameSource(ABC):
+    """Iterable source of BGR frames (screenshots)
+
+    Live sources capture the screen in the real time,
+    so GameScreenManager.run paces them with the capture scheduler.
+    Replay sources are iterated as fast as the frames are processed.
+    """
+    live: bool = False
+
+    @abstractmethod
+    def __iter__(self) -> Iterator[np.ndarray]:
+        pass
+
+    def release(self, frame: np.ndarray):
+        """Release a processed frame, so the source could reuse its memory for a next frame
+
+        The consumer calls it once per frame (dropped frames included) and doesn't use the frame after that.
+        """
+        pass
+
+
+class ArrayFrameSource(FrameSource):
+    """In-memory frames
+
+    Each frame is yielded repeat times in a row.
+    Note that OCRs recognize a text only after it is stable for several frames in a row
+    and a dialog body is tracked only once the dialog title is stable,
+    so still screenshots need repeat=GameScreenManager.stable_screenshots (3 by default) to be recognized.
+
+    Tests:
+    >>> frames = [np.full((2, 2, 3), idx, dtype=np.uint8) for idx in range(2)]
+    >>> [int(frame[0, 0, 0]) for frame in ArrayFrameSource(frames, repeat=2)]
+    [0, 0, 1, 1]
+    """
+    @typechecked
+    def __init__(self, frames: Sequence[np.ndarray], repeat: int = 1):
+        assert repeat > 0
+        self.__frames = frames
+        self.__repeat = repeat
+
+    def __len__(self):
+        return len(self.__frames) * self.__repeat
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        for frame in self.__frames:
+            for _ in range(self.__repeat):
+                yield frame
+
+
+class DirectoryFrameSource(FrameSource):
+    """Image files of a directory in the sorted order of their names
+
+    Each frame is yielded repeat times in a row (see ArrayFrameSource).
+    Files that could not be read as images are skipped with a warning.
+    """
+    EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+    @typechecked
+    def __init__(self, dir_path: str, repeat: int = 1):
+        assert repeat > 0
+        if not path.isdir(dir_path):
+            raise NotADirectoryError(dir_path)
+        self.__logger = logging.getLogger(__name__)
+        self.__paths = tuple(path.join(dir_path, file_name)
+                             for file_name in sorted(os.listdir(dir_path))
+                             if path.splitext(file_name)[1].lower() in self.EXTENSIONS)
+        self.__repeat = repeat
+
+    @property
+    def paths(self) -> Tuple[str, ...]:
+        return self.__paths
+
+    def __len__(self):
+        return len(self.__paths) * self.__repeat
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        for file_path in self.__paths:
+            frame = cv2.imread(file_path, cv2.IMREAD_COLOR)
+            if frame is None:
+                self.__logger.warning(f"Could not read an image: {file_path}")
+                continue
+            for _ in range(self.__repeat):
+                yield frame
+
+
+class VideoFrameSource(FrameSource):
+    """Frames of a video file (a recorded session) read by cv2.VideoCapture"""
+    @typechecked
+    def __init__(self, file_path: str):
+        if not path.isfile(file_path):
+            raise FileNotFoundError(file_path)
+        self.__file_path = file_path
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        capture = cv2.VideoCapture(self.__file_path)
+        if not capture.isOpened():
+            raise ValueError(f"Could not open a video: {self.__file_path}")
+        try:
+            while True:
+                got_frame, frame = capture.read()
+                if not got_frame:
+                    break
+                yield frame
+        finally:
+            capture.release()
@@ -1,8 +1,7 @@
-import itertools
 import logging
-from typing import List, Optional
+import time
+from typing import List, Optional, Tuple
 
-import mss
 import numpy as np
 
 from wa_typechecker import typechecked
@@ -10,13 +9,20 @@ from wa_config import game_conf
 from wa_types import LanguageCode
 from wa_language import Language
 from wa_language.LangVar import PlayerSex
-from .SampleMatch import SampleMatch
 from .DialogScreen.DialogScreenManager import DialogScreenManager
 from .MapScreen.MapScreenManager import MapScreenManager
 from .BaseScreen.GameScreenEventDispatcher import GameScreenEventDispatcher
 from .GameUserFriendlyLogger import DialogScreenLogger
 from .DatasetProcessors import MasterDatasetsProcessor
 from .GameScreenEvent import UnknownScreenEvent
+from .FramePipeline import FramePipeline
+from .ScreenRegistry import ScreenRegistry
+from .FrameSource import FrameSource
+from .ScreenCapture import ScreenCapture, RegionScreenCapture
+from .CaptureScheduler import CaptureScheduler
+from .BaseScreen.OCRCache import ocr_cache
+from .SampleMatch import SampleMatch
+from . import config
 
 
 class GameScreenManager(GameScreenEventDispatcher):
@@ -25,7 +31,13 @@ class GameScreenManager(GameScreenEventDispatcher):
                  player_name: str | None,
                  player_sex: PlayerSex | None,
                  datasets: List[str] | None,
-                 language_code: str | None):
+                 language_code: str | None,
+                 glyphs: bool = False,
+                 parallel_ocr: bool = False):
+        """
+        :param glyphs: Match glyphs of the atlases built by utils/build_glyph_atlas.py before Tesseract.
+        :param parallel_ocr: Recognize title, body and relation crops of dialog screens concurrently.
+        """
         super().__init__()
         self.__logger = logging.getLogger(__name__)
         # TODO: someone need to warn if playername is blank string like '  '
@@ -44,15 +56,19 @@ class GameScreenManager(GameScreenEventDispatcher):
         if player_name is not None:
             special_language = {"wa_player": player_name}
         lang = Language.load(language_code, special_language)
+        self.__lang = lang
         # create screen managers, collect event dispatchers
-        self.__map_screen_manager = MapScreenManager(lang)
-        self.__dialog_screen_manger = DialogScreenManager(lang, player_sex)
+        self.__map_screen_manager = MapScreenManager(lang, glyphs=glyphs)
+        self.__dialog_screen_manger = DialogScreenManager(lang, player_sex,
+                                                          parallel_ocr=parallel_ocr,
+                                                          glyphs=glyphs)
         self.__game_screen_event_dispatchers = [
             self.__map_screen_manager,
             self.__dialog_screen_manger,
             self
         ]
         # create datasets processor and register it's game screen event handler
+        self.__datasets = bool(datasets)
         if datasets:
             datasets_processor = MasterDatasetsProcessor(datasets=datasets,
                                                          language_code=language_code,
@@ -67,48 +83,132 @@ class GameScreenManager(GameScreenEventDispatcher):
         self.__logger.info("Player: name {}, sex {}"
                            .format("NOT defined" if player_name is None else f"= {repr(player_name)}",
                                    "NOT defined" if player_sex is None else f"= {player_sex.value}"))
+        # register screen managers to route screenshots and initialize got_match
+        self.__screen_registry = ScreenRegistry((self.__map_screen_manager,
+                                                 self.__dialog_screen_manger))
+        self.__got_match = True
+        self.__pipeline = None
+        self.__scheduler = None
 
     def append_game_screen_event_handler(self, handler):
         for dispatcher in self.__game_screen_event_dispatchers:
             dispatcher.append_handler(handler)
 
-    @staticmethod
-    def screen_manager_match(*screen_managers):
-        screen_managers_cycle_iter = itertools.cycle(screen_managers)
-        screenshot = yield None
-        # infinite loop
-        while screenshot is not None:
-            # start processing from the last used screen manager
-            # that is strictly needed if it matched the previous screenshot
-            slice_start = len(screen_managers) - 1
-            # end processing after trying all the screen managers
-            slice_end = slice_start + len(screen_managers)
-            # process screenshot
-            for screen_manager in itertools.islice(screen_managers_cycle_iter,
-                                                   slice_start,
-                                                   slice_end):
-                if screen_manager.process(screenshot) is not SampleMatch.FAIL:
-                    screenshot = yield True
-                    break
-            else:
-                screenshot = yield False
+    @property
+    def screen_registry(self) -> ScreenRegistry:
+        return self.__screen_registry
+
+    @property
+    def stable_screenshots(self) -> int:
+        """A number of times a still screenshot has to be processed in a row to be recognized by any screen manager
+
+        Replays of still screenshots repeat them (see DirectoryFrameSource).
+        """
+        return max(screen_manager.stable_screenshots for screen_manager in (self.__map_screen_manager,
+                                                                            self.__dialog_screen_manger))
+
+    @property
+    def pipeline(self) -> Optional[FramePipeline]:
+        """The pipeline of the pipelined run mode. Provides frames counters and latency stats."""
+        return self.__pipeline
+
+    @property
+    def scheduler(self) -> Optional[CaptureScheduler]:
+        """The capture scheduler of the run mode"""
+        return self.__scheduler
+
+    @typechecked
+    def process(self, screenshot: np.ndarray, screen_sample_matches: Optional[Tuple[SampleMatch, ...]] = None):
+        """
+        :param screen_sample_matches: The screen sampler decisions of the screen managers
+               (in the order of the screen registry) if they are already checked.
+        """
+        match = self.__screen_registry.process(screenshot, screen_sample_matches)
+        if self.__got_match and not match:
+            self._dispatch(UnknownScreenEvent())
+        self.__got_match = match
+        if self.__scheduler is not None:
+            self.__scheduler.update(match)
 
     @typechecked
-    def run(self, monitor_idx: int):
-        # prepare screen_manager_match generator and initialize got_match
-        screen_manager_match = self.screen_manager_match(self.__map_screen_manager,
-                                                         self.__dialog_screen_manger)
-        next(screen_manager_match)
-        got_match = True
-        # got sct and use it as a context object
-        with mss.mss() as sct:
-            monitor = sct.monitors[monitor_idx]
-            while got_match is not None:
-                # make screenshot
-                screenshot = sct.grab(monitor)
-                screenshot = np.array(screenshot)[:, :, :3]  # BGRA -> BGR
-                # process screenshot
-                match = screen_manager_match.send(screenshot)
-                if got_match and not match:
-                    self._dispatch(UnknownScreenEvent())
-                got_match = match
+    def run(self,
+            source: int | FrameSource,
+            pipelined: bool = False,
+            ring_size: int = 2,
+            regions: bool = False,
+            min_interval: float = CaptureScheduler.MIN_INTERVAL,
+            max_interval: float = CaptureScheduler.MAX_INTERVAL):
+        """
+        :param source: A source of screenshots or the number of the monitor to be captured.
+        :param pipelined: Capture screenshots within a separate thread while the previous one is being processed.
+               Stale screenshots of live sources are dropped, so the latest screenshot is always processed.
+               Replay sources are not dropped: capturing waits for processing.
+        :param ring_size: A number of captured screenshots the pipelined mode could keep in memory
+               (besides the processed one and the one being captured).
+        :param regions: Capture the screen samplers' regions first
+               and capture the regions to be recognized only if a screen sampler matches.
+               Applicable only if the source is a monitor number and no dataset is processed
+               (datasets save full screenshots).
+        :param min_interval: The interval between screen captures (in seconds) while a screen is recognized.
+        :param max_interval: The longest interval between screen captures (in seconds).
+               While no screen is recognized the interval grows exponentially from min_interval up to max_interval.
+               Intervals are applicable to live sources only, replay sources are processed as fast as possible.
+        """
+        # frame buffers of captures: the queued screenshots, the processed one and the one being captured
+        buffers = ring_size + 2 if pipelined else 2
+        if regions and self.__datasets and not isinstance(source, FrameSource):
+            self.__logger.warning("Datasets save full screenshots, the regions capture is off")
+            regions = False
+        process = self.process
+        if isinstance(source, FrameSource):
+            screenshots = source
+        elif regions:
+            screenshots = RegionScreenCapture(monitor_idx=source,
+                                              resolution=config.resolution,
+                                              screen_managers=self.__screen_registry.screen_managers,
+                                              buffers=buffers,
+                                              classify=self.__screen_registry.classify)
+
+            def process(screenshot: np.ndarray):
+                self.process(screenshot, screenshots.sample_matches(screenshot))
+        else:
+            screenshots = ScreenCapture(source, buffers=buffers)
+        if screenshots.live:
+            self.__scheduler = CaptureScheduler(min_interval, max_interval)
+            frames = self.__scheduler.pace(screenshots)
+        else:
+            self.__scheduler = None
+            frames = screenshots
+        processed = 0
+        start = time.perf_counter()
+        try:
+            if pipelined:
+                self.__pipeline = FramePipeline(frames, process, ring_size,
+                                                release=screenshots.release,
+                                                lossless=not screenshots.live)
+                self.__pipeline.run()
+            else:
+                for screenshot in frames:
+                    try:
+                        process(screenshot)
+                    finally:
+                        screenshots.release(screenshot)
+                    processed += 1
+        finally:
+            self.__dialog_screen_manger.close()
+            self.__logger.info(f"OCR cache: {ocr_cache}")
+            self.__logger.info(f"Bind cache: {self.__lang.bind_cache}")
+            self.__logger.info(f"Dialog stable to dispatch: {self.__dialog_screen_manger.stable_to_dispatch}")
+            if self.__scheduler is not None:
+                self.__logger.info(f"Capture scheduler: {self.__scheduler}")
+            if not pipelined and processed:
+                duration = time.perf_counter() - start
+                self.__logger.info(f"Processed {processed} screenshots in {duration:.1f} s, "
+                                   f"{processed / duration:.1f} screenshots per second")
+            if pipelined:
+                self.__logger.info(f"Pipeline: {self.__pipeline}")
+            if isinstance(screenshots, (ScreenCapture, RegionScreenCapture)) and screenshots.ring is not None:
+                self.__logger.info(f"Frame buffers: {screenshots.ring}")
+            if isinstance(screenshots, RegionScreenCapture) and screenshots.frames:
+                self.__logger.info(f"Regions capture: {screenshots.frames} screenshots, "
+                                   f"{screenshots.grabbed_bytes // screenshots.frames} bytes per screenshot")
@@ -0,0 +1,58 @@
+import threading
+
+from wa_typechecker import typechecked
+
+
+class LatencyStats:
+    """Thread-safe accumulator of latency samples (in seconds)
+
+    Tests:
+    >>> stats = LatencyStats()
+    >>> print(stats)
+    0 samples
+    >>> stats.add(0.010)
+    >>> stats.add(0.030)
+    >>> stats.count, round(stats.mean, 3), stats.max, stats.last
+    (2, 0.02, 0.03, 0.03)
+    >>> print(stats)
+    2 samples, avg 20.0 ms, max 30.0 ms, last 30.0 ms
+    """
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__count = 0
+        self.__total = 0.0
+        self.__max = 0.0
+        self.__last = 0.0
+
+    @typechecked
+    def add(self, latency: float):
+        with self.__lock:
+            self.__count += 1
+            self.__total += latency
+            self.__last = latency
+            if latency > self.__max:
+                self.__max = latency
+
+    @property
+    def count(self) -> int:
+        return self.__count
+
+    @property
+    def mean(self) -> float:
+        return self.__total / self.__count if self.__count else 0.0
+
+    @property
+    def max(self) -> float:
+        return self.__max
+
+    @property
+    def last(self) -> float:
+        return self.__last
+
+    def __str__(self):
+        if self.__count == 0:
+            return "0 samples"
+        return (f"{self.__count} samples, "
+                f"avg {self.mean * 1000:.1f} ms, "
+                f"max {self.__max * 1000:.1f} ms, "
+                f"last {self.__last * 1000:.1f} ms")
@@ -0,0 +1,130 @@
+import re
+from typing import Optional, Tuple
+
+from wa_typechecker import typechecked
+from wa_language.LangKey import LangKey
+from wa_language.LangTemplate import LangTemplate
+from wa_language.LangVar import LangVar
+from wa_language.LanguageModel import LanguageModel
+from wa_model.calendar_model import YEAR_VAR, DAY_VAR
+from ..BaseScreen.FuzzyChoices import FuzzyChoices
+
+DIGITS = re.compile(r"[0-9]+")
+
+
+class MapScreenCalendarDecoder:
+    """Decoder of calendar OCR results by the structure of calendar values
+
+    Date values are compiled into templates of a month text with day and year slots.
+    Day and year are parsed from digits of a date OCR result directly,
+    so only texts of the best months with these day and year are scored
+    instead of the spreads of years and days.
+    Time of day words are scored as they are.
+
+    A date is not decoded (it's up to fuzzy parsing of the date model) if its digits
+    don't fit the slots of the templates (by count, values and literal chars around them),
+    or the best month is ambiguous or below the cutoff.
+
+    Tests:
+    >>> from wa_language.Language import RootLanguage
+    >>> from wa_model import calendar_model
+    >>> from wa_types import LanguageCode
+    >>> lang = RootLanguage({"str_march_reg1_reg2": "March {reg1}, {reg2}",
+    ...                      "str_may_reg1_reg2": "May {reg1}, {reg2}",
+    ...                      "ui_dawn": "Dawn",
+    ...                      "ui_dusk": "Dusk"},
+    ...                     LanguageCode.EN)
+    >>> decoder = MapScreenCalendarDecoder(LanguageModel(calendar_model.date_model, lang),
+    ...                                    LanguageModel(calendar_model.timeofday_model, lang),
+    ...                                    score_cutoff=60)
+    >>> decoder.date("Marcb 7, 1260")
+    (LangKey('str_march_reg1_reg2'), 1260, 7)
+    >>> decoder.date("Marcb 7, 126O") is None  # the year is not parsed
+    True
+    >>> decoder.date("Mar 7, 1250") is None  # the year is out of the spread
+    True
+    >>> decoder.date("Ma3ch l, 1260") is None  # the day is not between the literal chars
+    True
+    >>> decoder.timeofday("Dusx")
+    LangKey('ui_dusk')
+    """
+    @typechecked
+    def __init__(self, date_model: LanguageModel, timeofday_model: LanguageModel, score_cutoff: int | float):
+        self.__score_cutoff = score_cutoff
+        self.__date_keys = tuple(date_model.language)
+        self.__templates = tuple(LangTemplate.compile(value, (DAY_VAR, YEAR_VAR))
+                                 for value in date_model.language.values())
+        # slots of digits runs of a date text, the same for all the dates of a language
+        # (None when dates could not be decoded by digits)
+        self.__date_slots = self.__slots()
+        # months are chosen by literal texts of the dates first, as by fuzzy parsing of the date model
+        # (purge spread of the dates model is their literal texts)
+        self.__literal_dates = FuzzyChoices([template.render({DAY_VAR: "", YEAR_VAR: ""})
+                                             for template in self.__templates
+                                             if template is not None])
+        # all the dates are spread by the same days and years
+        spreading = date_model[self.__date_keys[0]] if self.__date_keys else {}
+        self.__days = frozenset(spreading.get(DAY_VAR, ()))
+        self.__years = frozenset(spreading.get(YEAR_VAR, ()))
+        self.__timeofdays = FuzzyChoices(timeofday_model.language)
+
+    def __slots(self) -> Optional[Tuple[Tuple[LangVar, str, str], ...]]:
+        """Variables of the slots with the literal chars around them (empty at the ends of a text)
+
+        Returns None if some of the dates has other slots or chars around them,
+        digits in literal parts or adjacent slots.
+        """
+        slots = None
+        for template in self.__templates:
+            if template is None or any(DIGITS.search(part) for part in template.parts):
+                return None
+            parts = template.parts
+            if any(part == "" for part in parts[1:-1]):
+                return None
+            template_slots = tuple((variable, parts[idx][-1:], parts[idx + 1][:1])
+                                   for idx, variable in enumerate(template.slots_variables))
+            if slots is not None and template_slots != slots:
+                return None
+            slots = template_slots
+        return slots
+
+    @property
+    def decodes_dates(self) -> bool:
+        """Whether dates of the language are decoded by digits"""
+        return self.__date_slots is not None
+
+    @typechecked
+    def date(self, date_ocr: str) -> Optional[Tuple[LangKey, int, int]]:
+        """Key, year and day of the date or None if the date is not decoded"""
+        if self.__date_slots is None:
+            return None
+        digits = tuple(DIGITS.finditer(date_ocr))
+        if len(digits) != len(self.__date_slots):
+            return None
+        binding = {}
+        for (variable, left, right), match in zip(self.__date_slots, digits):
+            # digits of a slot are parsed only between the same literal chars as in the dates,
+            # so digits within spoiled words are not taken for a day or a year
+            if date_ocr[match.start() - 1:match.start()] != left or date_ocr[match.end():match.end() + 1] != right:
+                return None
+            number = int(match.group())
+            if binding.get(variable, number) != number:
+                return None
+            binding[variable] = number
+        day, year = binding.get(DAY_VAR), binding.get(YEAR_VAR)
+        if day not in self.__days or year not in self.__years:
+            return None
+        _, month_idxes = self.__literal_dates.best(date_ocr)
+        dates = FuzzyChoices([self.__templates[idx].render(binding) for idx in month_idxes])
+        score, idxes = dates.best(date_ocr, score_cutoff=self.__score_cutoff)
+        if score is None or len(idxes) != 1:
+            return None
+        return self.__date_keys[month_idxes[idxes[0]]], year, day
+
+    @typechecked
+    def timeofday(self, timeofday_ocr: str) -> Optional[LangKey]:
+        """Key of the best time of day or None if no time of day reaches the cutoff"""
+        score, idxes = self.__timeofdays.best(timeofday_ocr, score_cutoff=self.__score_cutoff)
+        if score is None:
+            return None
+        return self.__timeofdays.keys[idxes[0]]
@@ -4,15 +4,24 @@ from wa_typechecker import typechecked
 from wa_language.LanguageModel import LanguageModel
 from wa_model.calendar_model import YEAR_VAR, DAY_VAR
 from ..BaseScreen.ModelFuzzyParser import ModelFuzzyParser
+from .MapScreenCalendarDecoder import MapScreenCalendarDecoder
 from .MapScreenEvent import DateTimeofday
 
+SCORE_CUTOFF = 60
+
 
 class MapScreenCalendarFuzzyParser:
     @typechecked
-    def __init__(self, date_model: LanguageModel, timeofday_model: LanguageModel):
+    def __init__(self, date_model: LanguageModel, timeofday_model: LanguageModel, decode: bool = True):
+        """
+        :param decode: Decode calendars by MapScreenCalendarDecoder,
+            dates that are not decoded are parsed by the date model.
+        """
         self.__date_model = date_model
         self.__timeofday_model = timeofday_model
-        self.__model_fuzzy_parser = ModelFuzzyParser(score_cutoff=60)
+        self.__model_fuzzy_parser = ModelFuzzyParser(score_cutoff=SCORE_CUTOFF)
+        self.__decoder = (MapScreenCalendarDecoder(date_model, timeofday_model, score_cutoff=SCORE_CUTOFF)
+                          if decode else None)
         self.__prev_calendar_ocr = None
         self.__pref_date_timeofday = None
 
@@ -29,6 +38,17 @@ class MapScreenCalendarFuzzyParser:
         if len(split) != 2:
             return None
         date_ocr, timeofday_ocr = split
+        if self.__decoder is not None:
+            timeofday_key = self.__decoder.timeofday(timeofday_ocr)
+            if timeofday_key is None:
+                return None
+            decoded_date = self.__decoder.date(date_ocr)
+            if decoded_date is not None:
+                date_key, year, day = decoded_date
+                return DateTimeofday(date_key=date_key,
+                                     year=year,
+                                     day=day,
+                                     timeofday_key=timeofday_key)
         timeofday_bounds = self.__model_fuzzy_parser.bounds(self.__timeofday_model,
                                                             timeofday_ocr).bounds
         if len(timeofday_bounds) == 0:
@@ -4,11 +4,16 @@ import numpy as np
 from wa_typechecker import typechecked
 from wa_types import LanguageCode
 from wa_screen_manager.BaseScreen.BaseOCR import BaseOCR, NonStable
+from wa_screen_manager.BaseScreen.GlyphAtlas import load_dataset_glyph_atlas
 
 
 class MapScreenCalendarOCR(BaseOCR):
     @typechecked
-    def __init__(self, language_code: LanguageCode, whitelist: str):
+    def __init__(self, language_code: LanguageCode, whitelist: str, glyphs: bool = False):
+        """
+        :param glyphs: Match glyphs of the atlas built from the map_calendars dataset before Tesseract
+               (if the atlas is built for the current preprocessing).
+        """
         from wa_screen_manager import config
         from . import map_screen_config
         crop_box = map_screen_config.map_calendar_box
@@ -16,6 +21,10 @@ class MapScreenCalendarOCR(BaseOCR):
                          crop_box=crop_box,
                          language_code=language_code,
                          whitelist=whitelist)
+        if glyphs:
+            self.glyph_atlas = load_dataset_glyph_atlas(dataset_name="map_calendars",
+                                                        language_code=language_code,
+                                                        preprocessing_digest=self.preprocessing_digest)
 
     @typechecked
     def _preprocess(self, crop_img: np.ndarray) -> np.ndarray:
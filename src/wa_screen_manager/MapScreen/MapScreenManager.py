@@ -1,12 +1,14 @@
 import logging
+from typing import Optional, Tuple
 
 import numpy as np
 from wa_typechecker import typechecked
 
+from wa_types import Box
 from wa_language.Language import Language
 from wa_language.LanguageModel import LanguageModel
 from wa_model import calendar_model
-from wa_screen_manager.BaseScreen.BaseSampler import BaseSampleReadingSampler
+from wa_screen_manager.BaseScreen.BaseSampler import BaseSampler, BaseSampleReadingSampler
 from wa_screen_manager.SampleMatch import SampleMatch
 from ..BaseScreen.GameScreenEventDispatcher import GameScreenEventDispatcher
 from .MapScreenEvent import MapScreenEvent
@@ -47,7 +49,11 @@ class MapScreenManager(GameScreenEventDispatcher):
     """
     @typechecked
     def __init__(self,
-                 lang: Language):
+                 lang: Language,
+                 glyphs: bool = False):
+        """
+        :param glyphs: Match glyphs of the built glyph atlas before Tesseract.
+        """
         super().__init__()
         self.__lang = lang
         self.__screen_sample = MapScreenSampler()
@@ -58,14 +64,44 @@ class MapScreenManager(GameScreenEventDispatcher):
                                         language=lang)
         symbols = "".join(set(timeofday_model.symbols + date_model.symbols))
         self.__calendar_ocr = MapScreenCalendarOCR(language_code=lang.language_code,
-                                                   whitelist=symbols)
+                                                   whitelist=symbols,
+                                                   glyphs=glyphs)
         self.__calendar_fuzzy_parser = MapScreenCalendarFuzzyParser(date_model,
                                                                     timeofday_model)
         self.__prev__event = None
 
+    @property
+    def screen_sampler(self) -> BaseSampler:
+        return self.__screen_sample
+
+    @property
+    def sample_boxes(self) -> Tuple[Box, ...]:
+        """Boxes checked by the screen sampler"""
+        return self.__screen_sample.boxes
+
+    @property
+    def crop_boxes(self) -> Tuple[Box, ...]:
+        """Boxes required to process a screenshot matched by the screen sampler"""
+        return (self.__calendar_ocr.crop_box,
+                *self.__calendar_sample.boxes)
+
+    @property
+    def stable_screenshots(self) -> int:
+        """A number of times a still screenshot has to be processed in a row to be recognized"""
+        return self.__calendar_ocr.stable_frames
+
+    @typechecked
+    def check(self, img: np.ndarray) -> SampleMatch:
+        """Check the screen sampler only"""
+        return self.__screen_sample.check(img)
+
     @typechecked
-    def process(self, img: np.ndarray) -> SampleMatch:
-        screen_sample_matches = self.__screen_sample.check(img)
+    def process(self, img: np.ndarray, screen_sample_matches: Optional[SampleMatch] = None) -> SampleMatch:
+        """
+        :param screen_sample_matches: The screen sampler decision if it's already checked (by a CompiledSampler).
+        """
+        if screen_sample_matches is None:
+            screen_sample_matches = self.__screen_sample.check(img)
         if not screen_sample_matches:
             self.__prev__event = None
         else:
@@ -0,0 +1,203 @@
+import logging
+from typing import Callable, Iterable, Iterator, Optional, Protocol, Tuple, runtime_checkable
+
+import cv2
+import mss
+import numpy as np
+from wa_typechecker import typechecked
+
+from wa_types import Box, Resolution
+from .SampleMatch import SampleMatch
+from .FrameSource import FrameSource
+from .FrameBufferRing import FrameBufferRing
+
+
+@runtime_checkable
+class RegionScreenManager(Protocol):
+    """Screen manager interface required by RegionScreenCapture"""
+    @property
+    def sample_boxes(self) -> Tuple[Box, ...]: ...
+
+    @property
+    def crop_boxes(self) -> Tuple[Box, ...]: ...
+
+    def check(self, img: np.ndarray) -> SampleMatch: ...
+
+
+@typechecked
+def distinct_boxes(boxes: Iterable[Box], exclude: Iterable[Box] = ()) -> Tuple[Box, ...]:
+    """Drop duplicated boxes and boxes contained within other boxes (or within the excluded ones)
+
+    Tests:
+    >>> distinct_boxes([Box(0, 0, 10, 10), Box(2, 2, 5, 5), Box(0, 0, 10, 10), Box(20, 0, 30, 10)])
+    (Box(l=0, t=0, r=10, b=10), Box(l=20, t=0, r=30, b=10))
+    >>> distinct_boxes([Box(2, 2, 5, 5), Box(20, 0, 30, 10)], exclude=[Box(0, 0, 10, 10)])
+    (Box(l=20, t=0, r=30, b=10),)
+    """
+    boxes = list(dict.fromkeys(boxes))
+    exclude = tuple(exclude)
+    return tuple(box for idx, box in enumerate(boxes)
+                 if not any(box in other for other in exclude) and
+                 not any(box in other for other_idx, other in enumerate(boxes) if other_idx != idx))
+
+
+class ScreenCapture(FrameSource):
+    """Capture full screenshots of a monitor
+
+    Screenshots are converted from BGRA into BGR buffers of a FrameBufferRing,
+    so no screenshot arrays are allocated in the steady state.
+    A screenshot has to be released (see FrameSource.release) to reuse its buffer.
+    """
+    live = True
+
+    @typechecked
+    def __init__(self, monitor_idx: int, buffers: int = 4):
+        """
+        :param buffers: The number of frame buffers, i.e. the number of screenshots being processed
+               or queued at once. Capturing waits for a release if all of them are leased.
+        """
+        self.__monitor_idx = monitor_idx
+        self.__buffers = buffers
+        self.__ring = None
+
+    @property
+    def ring(self) -> FrameBufferRing | None:
+        """The ring of frame buffers (once capturing is started)"""
+        return self.__ring
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        # got sct and use it as a context object
+        with mss.mss() as sct:
+            monitor = sct.monitors[self.__monitor_idx]
+            self.__ring = FrameBufferRing((monitor["height"], monitor["width"], 3), self.__buffers)
+            while True:
+                yield self.__grab(sct, monitor)
+
+    def release(self, frame: np.ndarray):
+        self.__ring.release(frame)
+
+    def __grab(self, sct, monitor: dict) -> np.ndarray:
+        screenshot = sct.grab(monitor)
+        buffer = self.__ring.acquire()
+        # mss returns a new bytes buffer, it's converted into the frame buffer (as fast as copying it),
+        # so crops of screenshots have contiguous rows
+        bgra = np.frombuffer(screenshot.raw, dtype=np.uint8).reshape(monitor["height"], monitor["width"], 4)
+        cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR, dst=buffer)
+        return buffer
+
+
+class RegionScreenCapture(FrameSource):
+    """Two-phase capture of a monitor regions
+
+    Phase one grabs the screen samplers' boxes only.
+    Phase two grabs the crop boxes of the screen managers their screen samplers report MATCH.
+    The screen sampler decisions of a screenshot are kept till its release (see sample_matches),
+    so the screenshot is not checked by the samplers again.
+    The grabbed regions are pasted into a zeroed screenshot of the full resolution,
+    so samplers and OCRs process it the same way as a full screenshot.
+    Screenshots are buffers of a FrameBufferRing: the regions pasted into a buffer are zeroed before it's reused.
+    A screenshot has to be released (see FrameSource.release) to reuse its buffer.
+    """
+    live = True
+
+    @typechecked
+    def __init__(self,
+                 monitor_idx: int,
+                 resolution: Resolution,
+                 screen_managers: Tuple[RegionScreenManager, ...],
+                 buffers: int = 4,
+                 classify: Optional[Callable[[np.ndarray], Tuple[SampleMatch, ...]]] = None):
+        """
+        :param buffers: The number of frame buffers (see ScreenCapture).
+        :param classify: The screen sampler decisions of the screen managers at once
+               (like ScreenRegistry.classify), the screen managers check a screenshot one by one by default.
+        """
+        self.__logger = logging.getLogger(__name__)
+        self.__monitor_idx = monitor_idx
+        self.__buffers = buffers
+        self.__resolution = resolution
+        self.__screen_managers = screen_managers
+        self.__classify = classify
+        self.__sample_boxes = distinct_boxes(box for screen_manager in screen_managers
+                                             for box in screen_manager.sample_boxes)
+        self.__crop_boxes = tuple(distinct_boxes(screen_manager.crop_boxes,
+                                                 exclude=self.__sample_boxes)
+                                  for screen_manager in screen_managers)
+        self.__ring = None
+        # crop boxes pasted into a buffer and screen sampler decisions of the buffer by the buffer's id
+        self.__pasted_boxes = {}
+        self.__sample_matches = {}
+        self.__frames = 0
+        self.__grabbed_bytes = 0
+
+    @property
+    def ring(self) -> FrameBufferRing | None:
+        """The ring of frame buffers (once capturing is started)"""
+        return self.__ring
+
+    @property
+    def frames(self) -> int:
+        return self.__frames
+
+    @property
+    def grabbed_bytes(self) -> int:
+        """Total number of bytes copied from the grabbed regions"""
+        return self.__grabbed_bytes
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        with mss.mss() as sct:
+            monitor = sct.monitors[self.__monitor_idx]
+            resolution = self.__resolution
+            if (monitor["width"], monitor["height"]) != tuple(resolution):
+                self.__logger.warning(f"Monitor resolution {monitor['width']}x{monitor['height']} "
+                                      f"differs from {resolution.width}x{resolution.height}")
+            self.__ring = FrameBufferRing((resolution.height, resolution.width, 3), self.__buffers)
+            self.__pasted_boxes.clear()
+            self.__sample_matches.clear()
+            while True:
+                yield self.__capture(sct, monitor)
+
+    def release(self, frame: np.ndarray):
+        self.__sample_matches.pop(id(frame if frame.base is None else frame.base), None)
+        self.__ring.release(frame)
+
+    @typechecked
+    def sample_matches(self, screenshot: np.ndarray) -> Optional[Tuple[SampleMatch, ...]]:
+        """The screen sampler decisions of the screen managers (in their order) for the screenshot not released yet"""
+        return self.__sample_matches.get(id(screenshot if screenshot.base is None else screenshot.base))
+
+    def __capture(self, sct, monitor: dict) -> np.ndarray:
+        screenshot = self.__ring.acquire()
+        pasted_boxes = self.__pasted_boxes.get(id(screenshot))
+        if pasted_boxes is None:
+            screenshot.fill(0)
+        else:
+            for box in pasted_boxes:
+                screenshot[box.slice] = 0
+        self.__pasted_boxes[id(screenshot)] = ()
+        # phase one (sample boxes are pasted into every screenshot)
+        self.__grab(sct, monitor, self.__sample_boxes, screenshot)
+        if self.__classify is None:
+            sample_matches = tuple(screen_manager.check(screenshot) for screen_manager in self.__screen_managers)
+        else:
+            sample_matches = self.__classify(screenshot)
+        self.__sample_matches[id(screenshot)] = sample_matches
+        # phase two
+        pasted_boxes = ()
+        for sample_match, crop_boxes in zip(sample_matches, self.__crop_boxes):
+            if sample_match:
+                self.__grab(sct, monitor, crop_boxes, screenshot)
+                pasted_boxes += crop_boxes
+        self.__pasted_boxes[id(screenshot)] = pasted_boxes
+        self.__frames += 1
+        return screenshot
+
+    def __grab(self, sct, monitor: dict, boxes: Tuple[Box, ...], screenshot: np.ndarray):
+        for box in boxes:
+            region = {"left": monitor["left"] + box.l,
+                      "top": monitor["top"] + box.t,
+                      "width": box.r - box.l,
+                      "height": box.b - box.t}
+            image = np.asarray(sct.grab(region))[:, :, :3]  # BGRA -> BGR
+            screenshot[box.slice] = image
+            self.__grabbed_bytes += image.size
@@ -0,0 +1,114 @@
+from typing import Iterator, Optional, Protocol, Sequence, Tuple, runtime_checkable
+
+import numpy as np
+from wa_typechecker import typechecked
+
+from .SampleMatch import SampleMatch
+from .BaseScreen.BaseSampler import BaseSampler
+from .BaseScreen.CompiledSampler import CompiledSampler
+
+
+@runtime_checkable
+class RoutedScreenManager(Protocol):
+    """Screen manager interface required by ScreenRegistry"""
+    @property
+    def screen_sampler(self) -> BaseSampler: ...
+
+    def process(self, img: np.ndarray, screen_sample_matches: Optional[SampleMatch] = None) -> SampleMatch: ...
+
+
+class ScreenRegistry:
+    """Routes screenshots to screen managers by one pass of all the screen samplers
+
+    Screen samplers of all the registered managers are compiled into one CompiledSampler,
+    so a screenshot is classified by a single check whatever the number of screens is.
+    The routing is the one of trying the managers one by one:
+    the managers are tried cyclically starting from the last used one (the last registered one at first),
+    the first one whose decision is not FAIL (MATCH or DOUBT alike) processes the screenshot.
+    The managers tried before it process the screenshot with FAIL (that resets their states),
+    the managers after it don't get the screenshot at all.
+    If all the decisions are FAIL, every manager processes the screenshot
+    and the last tried one becomes the last used one.
+
+    Tests:
+    >>> from wa_types import Box, Resolution
+    >>> class Manager:
+    ...     def __init__(self, name, sampler):
+    ...         self.name = name
+    ...         self.screen_sampler = sampler
+    ...     def process(self, img, screen_sample_matches=None):
+    ...         print(self.name, screen_sample_matches.value)
+    ...         return screen_sample_matches
+    >>> resolution = Resolution(8, 6)
+    >>> sample = np.zeros((6, 8, 3), dtype=np.uint8)
+    >>> registry = ScreenRegistry((Manager("map", BaseSampler(sample, resolution, ((Box(0, 0, 2, 2),),))),
+    ...                            Manager("dialog", BaseSampler(sample + 1, resolution, ((Box(0, 0, 2, 2),),)))))
+    >>> registry.process(sample + 1)  # starting from the last registered manager
+    dialog match
+    True
+    >>> registry.process(sample)  # starting from the last used manager
+    dialog fail
+    map match
+    True
+    >>> registry.route(sample + 2) is None
+    True
+    >>> registry.process(sample + 2)
+    map fail
+    dialog fail
+    False
+    >>> registry.route(sample).name  # the dialog manager was tried last
+    'map'
+    """
+    @typechecked
+    def __init__(self, screen_managers: Sequence[RoutedScreenManager]):
+        assert len(screen_managers) > 0
+        self.__screen_managers = tuple(screen_managers)
+        self.__compiled_sampler = CompiledSampler([screen_manager.screen_sampler
+                                                   for screen_manager in screen_managers])
+        # index of the last used manager
+        self.__last_idx = len(self.__screen_managers) - 1
+
+    @property
+    def screen_managers(self) -> Tuple[RoutedScreenManager, ...]:
+        return self.__screen_managers
+
+    @typechecked
+    def classify(self, screenshot: np.ndarray) -> Tuple[SampleMatch, ...]:
+        """Screen sampler decisions of all the managers in the order of their registration"""
+        return self.__compiled_sampler.check(screenshot)
+
+    @typechecked
+    def route(self, screenshot: np.ndarray) -> Optional[RoutedScreenManager]:
+        """The manager of the screenshot or None if no screen sampler matches even partially"""
+        idx = self.__route(self.classify(screenshot))
+        return None if idx is None else self.__screen_managers[idx]
+
+    @typechecked
+    def process(self, screenshot: np.ndarray,
+                screen_sample_matches: Optional[Tuple[SampleMatch, ...]] = None) -> bool:
+        """Process the screenshot by its manager. Returns False if no screen sampler matches even partially.
+
+        :param screen_sample_matches: The screen sampler decisions if they are already checked
+               (by RegionScreenCapture), the screenshot is classified otherwise.
+        """
+        if screen_sample_matches is None:
+            screen_sample_matches = self.classify(screenshot)
+        assert len(screen_sample_matches) == len(self.__screen_managers)
+        for idx in self.__tried_idxes():
+            self.__last_idx = idx
+            # a manager tried before the routed one doesn't process the screenshot but resets its state
+            self.__screen_managers[idx].process(screenshot, screen_sample_matches[idx])
+            if screen_sample_matches[idx] is not SampleMatch.FAIL:
+                return True
+        return False
+
+    def __tried_idxes(self) -> Iterator[int]:
+        """Indexes of the managers in the order of trying (modulo the number of managers)"""
+        return (idx % len(self.__screen_managers)
+                for idx in range(self.__last_idx, self.__last_idx + len(self.__screen_managers)))
+
+    def __route(self, screen_sample_matches: Tuple[SampleMatch, ...]) -> Optional[int]:
+        for idx in self.__tried_idxes():
+            if screen_sample_matches[idx] is not SampleMatch.FAIL:
+                return idx
+        return None
@@ -0,0 +1,87 @@
+from collections import OrderedDict
+import threading
+from typing import Any, Hashable, Iterator, Tuple
+
+from wa_typechecker import typechecked
+
+
+class LRUCache:
+    """Thread-safe bounded mapping with the least recently used eviction and hit/miss counters
+
+    Tests:
+    >>> cache = LRUCache(maxsize=2)
+    >>> cache.put("a", 1); cache.put("b", 2)
+    >>> cache.get("a")
+    1
+    >>> cache.put("c", 3)  # "b" is the least recently used
+    >>> cache.get("b") is None
+    True
+    >>> "a" in cache, "c" in cache, len(cache)
+    (True, True, 2)
+    >>> cache.hits, cache.misses
+    (1, 1)
+    >>> print(cache)
+    2 items, 1 hits, 1 misses, hit rate 50.0%
+    """
+    @typechecked
+    def __init__(self, maxsize: int):
+        assert maxsize > 0
+        self.__maxsize = maxsize
+        self.__data = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+
+    @property
+    def maxsize(self) -> int:
+        return self.__maxsize
+
+    @property
+    def hits(self) -> int:
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        return self.__misses
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a value and count a hit or a miss"""
+        with self.__lock:
+            try:
+                value = self.__data[key]
+            except KeyError:
+                self.__misses += 1
+                return default
+            self.__data.move_to_end(key)
+            self.__hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        with self.__lock:
+            self.__data[key] = value
+            self.__data.move_to_end(key)
+            if len(self.__data) > self.__maxsize:
+                self.__data.popitem(last=False)
+
+    def clear(self):
+        with self.__lock:
+            self.__data.clear()
+
+    def items(self) -> Iterator[Tuple[Hashable, Any]]:
+        """Items from the least to the most recently used"""
+        with self.__lock:
+            return iter(list(self.__data.items()))
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.__data
+
+    def __len__(self) -> int:
+        return len(self.__data)
+
+    def __str__(self):
+        requests = self.__hits + self.__misses
+        hit_rate = self.__hits / requests * 100 if requests else 0.0
+        return (f"{len(self.__data)} items, "
+                f"{self.__hits} hits, "
+                f"{self.__misses} misses, "
+                f"hit rate {hit_rate:.1f}%")
@@ -1,4 +1,5 @@
 from .Box import Box
 from .Resolution import Resolution
 from .LanguageCode import LanguageCode
-from .Screenshot import is_screenshot
\ No newline at end of file
+from .Screenshot import is_screenshot
+from .LRUCache import LRUCache
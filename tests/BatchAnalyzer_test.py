@@ -0,0 +1,13 @@
+from wa_screen_manager.BatchAnalyzer import BatchAnalyzer
+
+
+def test_dialog_screenshot_is_recognized_with_body_and_relation(dialog_ocr, dialog_screenshot_path):
+    # a worker process is forked with the stubbed OCRs
+    records = list(BatchAnalyzer("en", jobs=1).analyze([dialog_screenshot_path, dialog_screenshot_path]))
+    assert len(records) == 2
+    for record in records:
+        assert record["screen"] == "dialog"
+        assert record["title_ocr"] == dialog_ocr.title
+        assert record["body_ocr"] == dialog_ocr.body
+        assert [bound["key"] for bound in record["body_bounds"]] == [str(dialog_ocr.body_key)]
+        assert record["relation"] == dialog_ocr.relation
@@ -0,0 +1,55 @@
+import threading
+import time
+
+import numpy as np
+
+from wa_screen_manager.FrameBufferRing import FrameBufferRing
+
+# seconds a test thread may take before the test is considered deadlocked
+DEADLOCK_TIMEOUT = 10
+
+
+def test_frame_buffers_are_leased_exclusively():
+    ring = FrameBufferRing((2, 2), size=3, dtype=np.int64)
+    lock = threading.Lock()
+    leased = set()
+    max_leased = [0]
+
+    def lease(worker: int):
+        for idx in range(500):
+            frame = ring.acquire(timeout=DEADLOCK_TIMEOUT)
+            with lock:
+                assert id(frame) not in leased, "a buffer is leased twice"
+                leased.add(id(frame))
+                max_leased[0] = max(max_leased[0], len(leased))
+            frame.fill(worker * 1000 + idx)
+            time.sleep(0)
+            assert (frame == worker * 1000 + idx).all(), "a leased buffer is reused"
+            with lock:
+                leased.remove(id(frame))
+            ring.release(frame)
+
+    threads = [threading.Thread(target=lease, args=(worker,), daemon=True) for worker in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(DEADLOCK_TIMEOUT)
+        assert not thread.is_alive(), "deadlock"
+    assert (ring.leased, ring.acquired) == (0, 3000)
+    assert max_leased[0] <= ring.allocated
+    # six threads share three buffers
+    assert ring.waits > 0
+
+
+def test_acquire_waits_for_release():
+    ring = FrameBufferRing((2, 2), size=1, dtype=np.int64)
+    frame = ring.acquire()
+    acquired = []
+    thread = threading.Thread(target=lambda: acquired.append(ring.acquire(timeout=DEADLOCK_TIMEOUT)), daemon=True)
+    thread.start()
+    time.sleep(0.05)
+    assert not acquired
+    ring.release(frame[1:])  # a view of the buffer
+    thread.join(DEADLOCK_TIMEOUT)
+    assert acquired[0] is frame
+    assert ring.waits == 1
@@ -0,0 +1,112 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from wa_screen_manager.FrameBufferRing import FrameBufferRing
+from wa_screen_manager.FramePipeline import FramePipeline
+from wa_screen_manager.FrameSource import FrameSource
+
+# seconds a test thread may take before the test is considered deadlocked
+DEADLOCK_TIMEOUT = 10
+
+
+class RingFrameSource(FrameSource):
+    """Frames numbered by their indexes within buffers of a FrameBufferRing (the way screen captures do)"""
+    def __init__(self, frames: int, buffers: int, live: bool = True, error_at: int = None):
+        self.live = live
+        self.ring = FrameBufferRing((2, 2), size=buffers, dtype=np.int64)
+        self.__frames = frames
+        self.__error_at = error_at
+
+    def __iter__(self):
+        for idx in range(self.__frames):
+            if idx == self.__error_at:
+                raise RuntimeError("capture failed")
+            frame = self.ring.acquire(timeout=DEADLOCK_TIMEOUT)
+            frame.fill(idx)
+            yield frame
+
+    def release(self, frame: np.ndarray):
+        self.ring.release(frame)
+
+
+def run_within_timeout(target):
+    """Run the target in a thread, return the exception it raised (if any)"""
+    errors = []
+
+    def run():
+        try:
+            target()
+        except BaseException as error:
+            errors.append(error)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(DEADLOCK_TIMEOUT)
+    assert not thread.is_alive(), "deadlock"
+    return errors[0] if errors else None
+
+
+class Consumer:
+    """Slow frame processing that checks a frame is not overwritten while it's processed"""
+    def __init__(self, delay: float = 0.001, error_at: int = None):
+        self.delay = delay
+        self.error_at = error_at
+        self.indexes = []
+
+    def __call__(self, frame: np.ndarray):
+        idx = int(frame[0, 0])
+        time.sleep(self.delay)
+        assert (frame == idx).all(), "a leased buffer is reused"
+        self.indexes.append(idx)
+        if len(self.indexes) == self.error_at:
+            raise ValueError("processing failed")
+
+
+@pytest.mark.parametrize("ring_size", [1, 2, 4])
+def test_live_pipeline_drops_stale_frames_and_releases_them(ring_size):
+    source = RingFrameSource(frames=300, buffers=ring_size + 2)
+    consumer = Consumer()
+    pipeline = FramePipeline(source, consumer, ring_size, release=source.release)
+    assert run_within_timeout(pipeline.run) is None
+    # the latest frames are processed in the order of capturing, the last one included
+    assert consumer.indexes == sorted(set(consumer.indexes))
+    assert consumer.indexes[-1] == 299
+    assert pipeline.processed == len(consumer.indexes)
+    assert pipeline.captured == pipeline.processed + pipeline.dropped == 300
+    assert source.ring.leased == 0
+    # capturing never waits for a buffer: the ring, the processed frame and the captured one
+    assert source.ring.waits == 0
+
+
+def test_lossless_pipeline_processes_all_frames():
+    source = RingFrameSource(frames=300, buffers=4, live=False)
+    consumer = Consumer(delay=0.0005)
+    pipeline = FramePipeline(source, consumer, ring_size=2, release=source.release, lossless=True)
+    assert run_within_timeout(pipeline.run) is None
+    assert consumer.indexes == list(range(300))
+    assert (pipeline.captured, pipeline.processed, pipeline.dropped) == (300, 300, 0)
+    assert source.ring.leased == 0
+
+
+@pytest.mark.parametrize("lossless", [False, True])
+@pytest.mark.parametrize("buffers", [1, 2, 4])
+def test_processing_error_stops_capturing(lossless, buffers):
+    # fewer buffers than the pipeline could hold: capturing waits for a release when the processing fails
+    source = RingFrameSource(frames=10 ** 6, buffers=buffers, live=not lossless)
+    consumer = Consumer(error_at=20)
+    pipeline = FramePipeline(source, consumer, ring_size=2, release=source.release, lossless=lossless)
+    assert isinstance(run_within_timeout(pipeline.run), ValueError)
+    assert len(consumer.indexes) == 20
+    assert source.ring.leased == 0
+
+
+def test_capturing_error_is_raised_by_processing():
+    source = RingFrameSource(frames=100, buffers=4, live=False, error_at=50)
+    consumer = Consumer(delay=0)
+    pipeline = FramePipeline(source, consumer, ring_size=2, release=source.release, lossless=True)
+    error = run_within_timeout(pipeline.run)
+    assert isinstance(error, RuntimeError)
+    assert source.ring.leased == 0
@@ -0,0 +1,80 @@
+import random
+
+import pytest
+
+from wa_language.Language import RootLanguage
+from wa_language.KeyChecker import key_checker
+from wa_language.LanguageModel import LanguageModel
+from wa_language.LangVar import LangVar
+from wa_language.Spreading import Spreading, Spread
+from wa_types import LanguageCode
+from wa_screen_manager.BaseScreen.FuzzyChoices import isclose
+from wa_screen_manager.BaseScreen.ModelFuzzyParser import ModelFuzzyParser
+
+REG_1 = LangVar("reg1")
+REG_2 = LangVar("reg2")
+S_1 = LangVar("s1")
+
+NAMES = Spread("Ada", "Bjorn", "Constantine", "Dmitri", "Eleanor of Aquitaine")
+
+
+def spoil(rnd: random.Random, text: str, typos: int) -> str:
+    for _ in range(typos):
+        idx = rnd.randrange(len(text) + 1)
+        text = text[:idx] + rnd.choice("abcxyz019 ") + text[idx + 1:]
+    return text
+
+
+def test_spread_max_length_by_spread():
+    lang = RootLanguage({"coins": "{reg1} coins",
+                         "denars": "{reg1} denars"},
+                        LanguageCode.EN)
+    # key checkers spread the same variable differently
+    model = LanguageModel({key_checker("coins"): Spreading({REG_1: Spread("1", "2", "3")}),
+                           key_checker("denars"): Spreading({REG_1: Spread("twenty thousand and one hundred",
+                                                                           "ten")})},
+                          lang)
+    parser = ModelFuzzyParser(score_cutoff=80)
+    # the max length of the short spread is got first and must not bound the values of the long spread
+    assert parser.bounds(model, "1 coins").bounds == ("1 coins",)
+    bounds_and_score = parser.bounds(model, "twenty thousand and one hundred denars")
+    assert bounds_and_score.bounds == ("twenty thousand and one hundred denars",)
+    assert bounds_and_score.score == 100.0
+
+
+@pytest.fixture(scope="module")
+def model() -> LanguageModel:
+    lang = RootLanguage({"coins": "{reg1} coins",
+                         "denars": "{reg1} denars",
+                         "pay": "Pay {reg1} denars to {s1} in {reg2} days",
+                         "greet": "Greetings, {s1}!",
+                         "duel": "{s1} challenges {s1} to a duel",
+                         "plain": "Nothing to spread here"},
+                        LanguageCode.EN)
+    return LanguageModel({key_checker("coins"): Spreading({REG_1: Spread("1", "2", "3")}),
+                          key_checker("denars"): Spreading({REG_1: Spread("twenty thousand and one hundred",
+                                                                          "ten")}),
+                          key_checker("pay"): Spreading({REG_1: Spread(range(1, 60)),
+                                                         S_1: NAMES,
+                                                         REG_2: Spread(range(1, 15))}),
+                          key_checker("greet", "duel"): Spreading({S_1: NAMES}),
+                          key_checker("plain"): Spreading({})},
+                         lang)
+
+
+def test_branch_and_bound_matches_exhaustive_spreading(model):
+    rnd = random.Random(0)
+    texts = [str(value) for key, value in model.language.items()
+             for value in value.spread(model[key])]
+    ocrs = [spoil(rnd, rnd.choice(texts), typos) for typos in (0, 1, 2, 4, 8) for _ in range(40)]
+    exhaustive_parser = ModelFuzzyParser(score_cutoff=80, branch_and_bound=False)
+    parser = ModelFuzzyParser(score_cutoff=80)
+    for ocr in ocrs:
+        expected = exhaustive_parser.bounds(model, ocr)
+        actual = parser.bounds(model, ocr)
+        assert [str(value) for value in actual.bounds] == [str(value) for value in expected.bounds], ocr
+        assert (actual.score is None) == (expected.score is None), ocr
+        if expected.score is not None:
+            assert isclose(actual.score, expected.score), ocr
+    assert parser.pruned_branches > exhaustive_parser.pruned_branches
+    assert parser.expanded_nodes < exhaustive_parser.expanded_nodes
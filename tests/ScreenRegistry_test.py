@@ -0,0 +1,62 @@
+import itertools
+import random
+
+import numpy as np
+
+from wa_types import Box, Resolution
+from wa_screen_manager.BaseScreen.BaseSampler import BaseSampler
+from wa_screen_manager.SampleMatch import SampleMatch
+from wa_screen_manager.ScreenRegistry import ScreenRegistry
+
+RESOLUTION = Resolution(8, 6)
+
+
+class Manager:
+    """Screen manager recording the decisions it processes screenshots with"""
+    def __init__(self, name, calls, decisions=None):
+        self.name = name
+        self.calls = calls
+        self.decisions = decisions
+        self.screen_sampler = BaseSampler(np.zeros((6, 8, 3), dtype=np.uint8), RESOLUTION, ((Box(0, 0, 2, 2),),))
+
+    def process(self, img, screen_sample_matches=None):
+        if screen_sample_matches is None:
+            screen_sample_matches = self.decisions[int(img[0, 0, 0])]
+        self.calls.append((self.name, screen_sample_matches))
+        return screen_sample_matches
+
+
+def screen_manager_match(*screen_managers):
+    """Trying the screen managers one by one (the way screens were matched before ScreenRegistry)"""
+    screen_managers_cycle_iter = itertools.cycle(screen_managers)
+    screenshot = yield None
+    while screenshot is not None:
+        slice_start = len(screen_managers) - 1
+        slice_end = slice_start + len(screen_managers)
+        for screen_manager in itertools.islice(screen_managers_cycle_iter, slice_start, slice_end):
+            if screen_manager.process(screenshot) is not SampleMatch.FAIL:
+                screenshot = yield True
+                break
+        else:
+            screenshot = yield False
+
+
+def test_routing_matches_trying_managers_one_by_one():
+    rnd = random.Random(0)
+    names = ("map", "dialog", "menu")
+    screenshots = 200
+    decisions = {name: [rnd.choice((SampleMatch.MATCH, SampleMatch.MATCH, SampleMatch.DOUBT,
+                                    SampleMatch.FAIL, SampleMatch.FAIL, SampleMatch.FAIL))
+                        for _ in range(screenshots)]
+                 for name in names}
+    expected_calls, calls = [], []
+    expected_managers = [Manager(name, expected_calls, decisions[name]) for name in names]
+    registry = ScreenRegistry([Manager(name, calls) for name in names])
+    matching = screen_manager_match(*expected_managers)
+    next(matching)
+    for idx in range(screenshots):
+        screenshot = np.full((6, 8, 3), idx, dtype=np.uint8)
+        expected_match = matching.send(screenshot)
+        match = registry.process(screenshot, tuple(decisions[name][idx] for name in names))
+        assert match == expected_match, idx
+        assert calls == expected_calls, idx
@@ -0,0 +1,64 @@
+import pytest
+
+from wa_language.Binding import Binding
+from wa_language.Language import RootLanguage
+from wa_language.LangKey import LangKey
+from wa_language.LangVar import LangVar, TRUE_EMPTY_STR, FALSE_EMPTY_STR
+from wa_types import LanguageCode
+
+REG_1 = LangVar("reg1")
+S_1 = LangVar("s1")
+
+
+@pytest.fixture
+def lang():
+    return RootLanguage({"amount": "{reg1} denars",
+                         "same_text": "{reg1} denars",
+                         "condition": "{reg1?many:one} of {s1?them:nobody}"},
+                        LanguageCode.EN)
+
+
+def test_bound_value_is_cached(lang):
+    value = lang[LangKey("amount")]
+    bound = value.bind(REG_1, 5)
+    assert value.bind(REG_1, 5) is bound
+    # a binding of one variable is the same as a pair
+    assert value.bind(Binding({REG_1: 5})) is bound
+    assert str(bound) == "5 denars"
+    assert lang.bind_cache.hits == 2
+
+
+def test_bound_values_are_cached_by_keys(lang):
+    # values of different keys with the same text are bound separately
+    amount = lang[LangKey("amount")].bind(REG_1, 5)
+    same_text = lang[LangKey("same_text")].bind(REG_1, 5)
+    assert amount is not same_text
+    assert (amount.key, same_text.key) == (LangKey("amount"), LangKey("same_text"))
+
+
+def test_bound_values_are_cached_by_bound_values(lang):
+    # values bound with different values are bound further separately
+    condition = lang[LangKey("condition")]
+    many = condition.bind(REG_1, 2).bind(S_1, TRUE_EMPTY_STR)
+    one = condition.bind(REG_1, 0).bind(S_1, TRUE_EMPTY_STR)
+    assert (str(many), str(one)) == ("many of them", "one of them")
+    assert many.binding == Binding({REG_1: 2, S_1: TRUE_EMPTY_STR})
+
+
+def test_bound_values_are_cached_by_types(lang):
+    condition = lang[LangKey("condition")]
+    # 1 and True are equal and have the same hash
+    one, true = condition.bind(REG_1, 1), condition.bind(REG_1, True)
+    assert one is not true
+    assert type(one.binding[REG_1]) is int and type(true.binding[REG_1]) is bool
+    # "" and TRUE_EMPTY_STR are equal and have the same hash, but not the same truth
+    assert str(condition.bind(S_1, "")) == "{reg1?many:one} of nobody"
+    assert str(condition.bind(S_1, TRUE_EMPTY_STR)) == "{reg1?many:one} of them"
+    assert str(condition.bind(S_1, FALSE_EMPTY_STR)) == "{reg1?many:one} of nobody"
+    assert str(condition.bind(S_1, TRUE_EMPTY_STR)) == "{reg1?many:one} of them"
+
+
+def test_unhashable_values_are_not_cached(lang):
+    value = lang[LangKey("amount")]
+    assert str(value.bind(REG_1, [5])) == "[5] denars"
+    assert len(lang.bind_cache) == 0
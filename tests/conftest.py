@@ -0,0 +1,43 @@
+from os import path
+from typing import NamedTuple
+
+import pytest
+
+import path_conf
+from wa_language import Language
+from wa_language.LangKey import LangKey
+from wa_types import LanguageCode
+from wa_screen_manager.BaseScreen.BaseOCR import BaseOCR
+from wa_screen_manager.BaseScreen.OCRCache import ocr_cache
+from wa_screen_manager.DialogScreen.DialogScreenOCRs import DialogScreenTitleOCR, DialogBodyOCR, DialogScreenRelationOCR
+
+
+class DialogOCR(NamedTuple):
+    """Texts the dialog OCRs recognize and the body key they are parsed to"""
+    title: str
+    body_key: LangKey
+    body: str
+    relation: int
+
+
+@pytest.fixture
+def dialog_screenshot_path() -> str:
+    """A dialog screenshot (the blank dialog screen matches the dialog screen and relation samplers)"""
+    return path.join(path_conf.samples, "dialog_screen_blank.png")
+
+
+@pytest.fixture
+def dialog_ocr(monkeypatch) -> DialogOCR:
+    """Dialog OCRs recognize the title, the body and the relation of a king without Tesseract"""
+    dialog_ocr = DialogOCR(title="King Harlaus",
+                           body_key=LangKey("str_comment_intro_famous_liege"),
+                           body=str(Language.load(LanguageCode.EN)[LangKey("str_comment_intro_famous_liege")]),
+                           relation=5)
+    texts = {DialogScreenTitleOCR: dialog_ocr.title,
+             DialogBodyOCR: dialog_ocr.body,
+             DialogScreenRelationOCR: str(dialog_ocr.relation)}
+    monkeypatch.setattr(BaseOCR, "_recognize", lambda self, img: texts[type(self)])
+    # recognized texts are not cached, so they don't leak to other tests
+    monkeypatch.setattr(ocr_cache, "get", lambda key: None)
+    monkeypatch.setattr(ocr_cache, "put", lambda key, text: None)
+    return dialog_ocr
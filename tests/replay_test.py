@@ -0,0 +1,25 @@
+import shutil
+from os import path
+
+import pytest
+
+from wa_screen_manager.DialogScreen.DialogScreenEvent import DialogScreenEvent
+from wa_screen_manager.FrameSource import DirectoryFrameSource
+from wa_screen_manager.GameScreenManager import GameScreenManager
+
+
+@pytest.mark.parametrize("pipelined", [False, True])
+def test_replayed_dialog_screenshot_is_recognized_with_body(dialog_ocr, dialog_screenshot_path, tmp_path, pipelined):
+    shutil.copy(dialog_screenshot_path, path.join(tmp_path, "dialog.png"))
+    game_screen_manager = GameScreenManager(None, None, None, "en")
+    events = []
+    game_screen_manager.append_game_screen_event_handler(events.append)
+    source = DirectoryFrameSource(str(tmp_path), repeat=game_screen_manager.stable_screenshots)
+    game_screen_manager.run(source, pipelined=pipelined)
+    dialog_events = [event for event in events
+                     if isinstance(event, DialogScreenEvent) and event.body_ocr is not None]
+    assert dialog_events
+    event = dialog_events[-1]
+    assert event.body_ocr == dialog_ocr.body
+    assert [bound.key for bound in event.body_bounds] == [dialog_ocr.body_key]
+    assert event.relation == dialog_ocr.relation
@@ -0,0 +1,92 @@
+"""Build glyph atlases of MapScreenCalendarOCR and DialogScreenRelationOCR from their datasets
+
+Usage: build_glyph_atlas.py [--dataset map_calendars|dialog_relations]
+Atlases are built from the verified items that are not held out (see GlyphAtlas.is_held_out).
+Glyphs are labeled by the texts of the parsed values (the language values of calendar keys, relations),
+not by the recorded OCR results, so an atlas doesn't learn misreadings of Tesseract.
+The held-out items are recognized by the built atlas to report its accuracy.
+Atlases are saved under the datasets path keyed by a digest of the OCR preprocessing,
+the OCRs load them with glyphs=True (the --glyphs option of waraband_assistant.py).
+"""
+import argparse
+import sys
+from os import path
+
+import cv2
+
+sys.path.append(path.join(path.dirname(path.dirname(path.abspath(__file__))), "tests"))
+
+import path_conf
+from wa_datasets.DialogRelationsDataset import DialogRelationsDataset
+from wa_datasets.MapCalendarsDataset import MapCalendarsDataset
+from wa_language import Language
+from wa_language.LangKey import LangKey
+from wa_language.LanguageModel import LanguageModel
+from wa_model import calendar_model
+from wa_model.calendar_model import YEAR_VAR, DAY_VAR
+from wa_screen_manager.BaseScreen.GlyphAtlas import GlyphAtlas, is_held_out, dataset_glyph_atlas_path
+from wa_screen_manager.DialogScreen.DialogScreenOCRs import DialogScreenRelationOCR
+from wa_screen_manager.MapScreen.MapScreenCalendarOCR import MapScreenCalendarOCR
+from test_parsing_by_datasets.base_dataset_staff import load_idxes_and_metas_by_langcode, load_image
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--dataset", choices=(MapCalendarsDataset.NAME, DialogRelationsDataset.NAME))
+args = parser.parse_args()
+if not path_conf.datasets:
+    sys.exit("No datasets path")
+
+
+def calendar_ocr_and_text(langcode):
+    lang = Language.load(langcode)
+    date_model = LanguageModel(model=calendar_model.date_model, language=lang)
+    timeofday_model = LanguageModel(model=calendar_model.timeofday_model, language=lang)
+    ocr = MapScreenCalendarOCR(langcode, "".join(set(timeofday_model.symbols + date_model.symbols)))
+
+    def text(meta):
+        if meta.verification is not None or meta.calendar_overlapped or meta.date_key in (None, "None"):
+            return None
+        date = lang[LangKey(meta.date_key)].bind(YEAR_VAR, meta.year).bind(DAY_VAR, meta.day)
+        return f"{date}\n{lang[LangKey(meta.timeofday_key)]}"
+
+    return ocr, text
+
+
+def relation_ocr_and_text(langcode):
+    def text(meta):
+        if meta.verification is not None or not meta.screen_sample_matches or meta.relation is None:
+            return None
+        return str(meta.relation)
+
+    return DialogScreenRelationOCR(langcode), text
+
+
+for dataset_cls, ocr_and_text, blank_image_name in ((MapCalendarsDataset, calendar_ocr_and_text, "map_screen_blank.png"),
+                                                    (DialogRelationsDataset, relation_ocr_and_text, "dialog_screen_blank.png")):
+    if args.dataset not in (None, dataset_cls.NAME):
+        continue
+    blank_image = cv2.imread(path.join(path_conf.samples, blank_image_name))
+    dataset = dataset_cls(lazy_load=True)
+    for langcode, idxes_and_metas in load_idxes_and_metas_by_langcode(dataset).items():
+        ocr, text = ocr_and_text(langcode)
+        train_samples, held_out_samples = [], []
+        for idx, meta in idxes_and_metas:
+            sample_text = text(meta)
+            if sample_text is None:
+                continue
+            image = load_image(dataset.img_path(idx), meta, blank_image)
+            sample = ocr._preprocess(image[ocr.crop_box.slice]), sample_text
+            (held_out_samples if is_held_out(dataset.idx_to_stem(idx)) else train_samples).append(sample)
+        atlas = GlyphAtlas.build(train_samples)
+        if atlas is None:
+            print(f"{dataset.NAME} {langcode}: no glyphs in {len(train_samples)} items")
+            continue
+        recognized = matched = 0
+        for img, sample_text in held_out_samples:
+            text_ocr = atlas.ocr(img)
+            recognized += text_ocr is not None
+            matched += text_ocr == sample_text
+        file_path = dataset_glyph_atlas_path(dataset.NAME, langcode, ocr.preprocessing_digest)
+        atlas.save(file_path)
+        print(f"{dataset.NAME} {langcode}: {len(train_samples)} items, chars {repr(atlas.chars)}, "
+              f"held out {len(held_out_samples)} items: recognized {recognized}, matched {matched}. "
+              f"Saved to {file_path}")
@@ -0,0 +1,98 @@
+"""Spread values scored and time of ModelFuzzyParser with and without branch-and-bound pruning of spreading
+
+Usage: dialog_bodies_branch_and_bound_benchmark.py [--samples N] [--typos N]
+Body OCR results and title keys are taken from metas of the dialog_bodies dataset
+(images and Tesseract are not needed). Without the datasets body texts of en and ru languages
+(gossips are bound with random lords) spoiled by random typos are parsed
+with body models of all the titles.
+"""
+import argparse
+from collections import defaultdict
+import logging
+import random
+import time
+
+import path_conf
+from wa_language import Language
+from wa_language.LangKey import LangKey
+from wa_language.LangVar import PlayerSex
+from wa_model.dialog_model.DialogBodyModel import DialogBodyModel
+from wa_types import LanguageCode
+from wa_screen_manager.BaseScreen.ModelFuzzyParser import ModelFuzzyParser
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--samples", type=int, default=300)
+parser.add_argument("--typos", type=int, default=3)
+args = parser.parse_args()
+# best matches with different texts are expected for spoiled OCR results
+logging.disable(logging.WARNING)
+
+rnd = random.Random(0)
+
+
+def spoil(text: str) -> str:
+    chars = list(text)
+    for _ in range(rnd.randint(0, args.typos)):
+        if chars:
+            chars[rnd.randrange(len(chars))] = rnd.choice("abcdefghij ")
+    return "".join(chars)
+
+
+def dataset_samples():
+    from wa_datasets.DialogBodiesDataset import DialogBodiesDataset
+    samples = defaultdict(list)
+    for meta in DialogBodiesDataset(lazy_load=True).meta_dict.values():
+        samples[(LanguageCode(meta.language), PlayerSex(meta.playersex))].append(
+            (meta.body_ocr, tuple(LangKey(key) for key in meta.title_keys)))
+    return samples
+
+
+def synthetic_samples():
+    samples = {}
+    for language_code in (LanguageCode.EN, LanguageCode.RU):
+        body_model = DialogBodyModel(Language.load(language_code), None, PlayerSex.MALE)
+        title_keys = list(body_model)
+        models = list({id(model): model for model in body_model.values()}.values())
+        language_samples = []
+        for _ in range(args.samples):
+            model = rnd.choice(models)
+            key = rnd.choice(model.purge_spread).key
+            value = model.language[key]
+            for var, spread in model[key].items():
+                value = value.bind(var, rnd.choice(list(spread)))
+            language_samples.append((spoil(str(value)), (rnd.choice(title_keys),)))
+        samples[(language_code, PlayerSex.MALE)] = language_samples
+    return samples
+
+
+if path_conf.datasets:
+    print("dialog_bodies dataset")
+    samples_by_language = dataset_samples()
+else:
+    print(f"Synthetic bodies with up to {args.typos} typos")
+    samples_by_language = synthetic_samples()
+
+for (language_code, player_sex), samples in samples_by_language.items():
+    body_model = DialogBodyModel(Language.load(language_code), None, player_sex)
+    results = {}
+    for name, branch_and_bound in (("full", False), ("pruned", True)):
+        # memo is off to parse repeated OCR results again
+        model_fuzzy_parser = ModelFuzzyParser(score_cutoff=80, memo_size=1, branch_and_bound=branch_and_bound)
+        models_and_ocrs = [(model, body_ocr)
+                           for body_ocr, title_keys in samples
+                           for model in {id(model): model
+                                         for model in (body_model.get(key) for key in title_keys)
+                                         if model is not None}.values()]
+        # warm up caches of the models
+        for model in {id(model): model for model, _ in models_and_ocrs}.values():
+            model_fuzzy_parser.bounds(model, "")
+        expanded_nodes = model_fuzzy_parser.expanded_nodes
+        pruned_branches = model_fuzzy_parser.pruned_branches
+        start = time.perf_counter()
+        results[name] = [model_fuzzy_parser.bounds(model, body_ocr) for model, body_ocr in models_and_ocrs]
+        duration = time.perf_counter() - start
+        print(f"{language_code} {player_sex} {name:>6}: "
+              f"{duration / len(models_and_ocrs) * 1000:.3f} ms per body, "
+              f"{model_fuzzy_parser.expanded_nodes - expanded_nodes} spread values scored, "
+              f"{model_fuzzy_parser.pruned_branches - pruned_branches} branches pruned")
+    print("same bounds:", results["full"] == results["pruned"])
@@ -0,0 +1,43 @@
+"""DialogBodyOCR accuracy and time on the dialog_bodies dataset: the tight text crop vs the whole body box
+
+Accuracy is the share of OCR results equal to the dataset's body_ocr values.
+"""
+import sys
+import time
+from os import path
+
+import cv2
+
+sys.path.append(path.join(path.dirname(path.dirname(path.abspath(__file__))), "tests"))
+
+import path_conf
+from wa_datasets.DialogBodiesDataset import DialogBodiesDataset
+from wa_language.LangVar import PlayerSex
+from wa_model.dialog_model.DialogBodyModel import DialogBodyModel
+from wa_language import Language
+from wa_screen_manager.BaseScreen.OCRCache import ocr_cache
+from wa_screen_manager.DialogScreen.DialogScreenOCRs import DialogBodyOCR
+from test_parsing_by_datasets.base_dataset_staff import load_idxes_and_metas_by_langcode_and_playersex, load_image
+
+blank_image = cv2.imread(path.join(path_conf.samples, "dialog_screen_blank.png"))
+dataset = DialogBodiesDataset(lazy_load=True)
+
+for (langcode, playersex), idxes_and_metas in load_idxes_and_metas_by_langcode_and_playersex(dataset).items():
+    model = DialogBodyModel(language=Language.load(langcode), player_name=None, player_sex=playersex)
+    images = [(load_image(dataset.img_path(idx), meta, blank_image), meta.body_ocr)
+              for idx, meta in idxes_and_metas]
+    for tight_crop in (False, True):
+        ocr = DialogBodyOCR(language_code=langcode, whitelist=model.symbols, tight_crop=tight_crop)
+        ocr_cache.cache.clear()
+        matches = 0
+        duration = 0.0
+        for image, body_ocr_exp in images:
+            ocr.ocr(image)  # Dry run to simulate two identical images in a row
+            start = time.perf_counter()
+            body_ocr = ocr.ocr(image)
+            duration += time.perf_counter() - start
+            matches += body_ocr == body_ocr_exp
+        print(f"{langcode} {playersex.value if isinstance(playersex, PlayerSex) else playersex} "
+              f"tight_crop={tight_crop}: "
+              f"accuracy {matches}/{len(images)}, "
+              f"{duration / max(len(images), 1) * 1000:.1f} ms per image")
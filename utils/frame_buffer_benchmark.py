@@ -0,0 +1,77 @@
+"""Memory allocated per captured frame: a new array per screenshot against the FrameBufferRing
+
+Usage: frame_buffer_benchmark.py [--frames N] [--held N] [--monitor IDX]
+Without --monitor mss grabs are emulated by a raw BGRA buffer of the full HD resolution
+(mss allocates the raw buffer of a grab itself, it's not counted).
+--held is the number of the latest frames referred by the pipeline and events at once,
+a ring frame is released once it's not held.
+"""
+import argparse
+from collections import deque
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from wa_screen_manager.FrameBufferRing import FrameBufferRing
+from wa_screen_manager.ScreenCapture import ScreenCapture
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--frames", type=int, default=200)
+parser.add_argument("--held", type=int, default=3)
+parser.add_argument("--monitor", type=int, default=None)
+args = parser.parse_args()
+
+shape = (1080, 1920, 4)
+raw = bytearray(np.random.default_rng(0).integers(0, 256, shape, dtype=np.uint8).tobytes())
+
+
+def array_frames():
+    while True:
+        yield np.array(np.frombuffer(raw, dtype=np.uint8).reshape(shape))[:, :, :3]
+
+
+ring = FrameBufferRing((*shape[:2], 3), size=args.held + 1)
+
+
+def ring_frames():
+    while True:
+        buffer = ring.acquire()
+        cv2.cvtColor(np.frombuffer(raw, dtype=np.uint8).reshape(shape), cv2.COLOR_BGRA2BGR, dst=buffer)
+        yield buffer
+
+
+def measure(name, frames, release=None):
+    held = deque()
+
+    def hold(frame):
+        held.append(frame)
+        if len(held) > args.held:
+            released = held.popleft()
+            if release is not None:
+                release(released)
+
+    # warm up: fill the ring and the held frames
+    for _ in range(args.held + 4):
+        hold(next(frames))
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(args.frames):
+        hold(next(frames))
+    duration = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size for stat in snapshot.statistics("filename"))
+    print(f"{name:>6}: {duration / args.frames * 1000:.2f} ms per frame, "
+          f"traced peak {peak / 2 ** 20:.1f} MiB, retained {allocated / 2 ** 20:.1f} MiB")
+
+
+if args.monitor is None:
+    measure("array", array_frames())
+    measure("ring", ring_frames(), ring.release)
+else:
+    capture = ScreenCapture(args.monitor, buffers=args.held + 1)
+    measure("ring", iter(capture), capture.release)
+    print(f"Frame buffers: {capture.ring}")
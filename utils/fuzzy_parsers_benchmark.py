@@ -0,0 +1,125 @@
+"""Time of the fuzzy parsers on synthetic OCR results
+
+Usage: fuzzy_parsers_benchmark.py [--language en] [--samples N] [--typos N]
+OCR results are language values (with random variables for calendars) spoiled by random typos.
+The same OCR results are parsed again to measure parsing of repeated ones.
+Bodies are parsed with and without the bind cache of the language.
+The parsing by datasets tests are the reference benchmark, this one doesn't need the datasets.
+"""
+import argparse
+import logging
+import random
+import time
+
+import numpy as np
+import rapidfuzz as fz
+
+from wa_language import Language
+from wa_language.LanguageModel import LanguageModel
+from wa_model import calendar_model
+from wa_model.calendar_model import YEAR_VAR, DAY_VAR
+from wa_model.dialog_model.DialogBodyModel import DialogBodyModel
+from wa_model.troop_keys import is_troop_key
+from wa_types import LanguageCode
+from wa_screen_manager.BaseScreen.FuzzyChoices import FuzzyChoices
+from wa_screen_manager.BaseScreen.ModelFuzzyParser import ModelFuzzyParser
+from wa_screen_manager.DialogScreen.DialogScreenTitleFuzzyParser import DialogScreenTitleFuzzyParser
+from wa_screen_manager.MapScreen.MapScreenCalendarFuzzyParser import MapScreenCalendarFuzzyParser
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--language", default="en")
+parser.add_argument("--samples", type=int, default=200)
+parser.add_argument("--typos", type=int, default=2)
+args = parser.parse_args()
+# best matches with different texts are expected for spoiled OCR results
+logging.disable(logging.WARNING)
+
+rnd = random.Random(0)
+
+
+def spoil(text: str) -> str:
+    chars = list(text)
+    for _ in range(rnd.randint(0, args.typos)):
+        if chars:
+            chars[rnd.randrange(len(chars))] = rnd.choice("abcdefghij ")
+    return "".join(chars)
+
+
+def measure(name, parse, ocrs):
+    start = time.perf_counter()
+    bound = sum(1 for ocr in ocrs if parse(ocr))
+    duration = time.perf_counter() - start
+    print(f"{name:>24}: {duration / len(ocrs) * 1000:.3f} ms per OCR result, {bound} of {len(ocrs)} bound")
+
+
+start = time.perf_counter()
+lang = Language.load(LanguageCode(args.language))
+print(f"Language loaded in {time.perf_counter() - start:.2f} s")
+
+date_model = LanguageModel(calendar_model.date_model, lang)
+timeofday_model = LanguageModel(calendar_model.timeofday_model, lang)
+calendar_parser = MapScreenCalendarFuzzyParser(date_model, timeofday_model)
+calendar_ocrs = []
+for _ in range(args.samples):
+    date = (rnd.choice(list(date_model.language.values()))
+            .bind(YEAR_VAR, rnd.randint(1257, 1277))
+            .bind(DAY_VAR, rnd.randint(1, 31)))
+    timeofday = rnd.choice(list(timeofday_model.language.values()))
+    calendar_ocrs.append(f"{spoil(str(date))}\n{spoil(str(timeofday))}")
+measure("calendar", calendar_parser.calendar, calendar_ocrs)
+measure("calendar again", calendar_parser.calendar, calendar_ocrs)
+
+body_model = DialogBodyModel(lang, None, None)
+model_fuzzy_parser = ModelFuzzyParser(score_cutoff=80)
+models = list({id(model): model for model in body_model.values()}.values())
+body_ocrs = []
+for _ in range(args.samples):
+    model = rnd.choice(models)
+    body_ocrs.append((model, spoil(str(rnd.choice(model.purge_spread)))))
+measure("body", lambda model_ocr: model_fuzzy_parser.bounds(*model_ocr).bounds, body_ocrs)
+measure("body again", lambda model_ocr: model_fuzzy_parser.bounds(*model_ocr).bounds, body_ocrs)
+
+# the same dates and bodies are recognized in a row of frames with other typos,
+# so they miss the memos of fresh parsers but bind the same values,
+# the bind cache is cleared before every OCR result or not
+def uncached(parse):
+    def parse_uncached(ocr):
+        lang.bind_cache.clear()
+        return parse(ocr)
+    return parse_uncached
+
+
+frames = 10
+framed_calendar_ocrs = []
+for calendar_ocr in calendar_ocrs[:args.samples // frames]:
+    date_ocr, timeofday_ocr = calendar_ocr.split("\n")
+    framed_calendar_ocrs.extend(f"{spoil(date_ocr)}\n{timeofday_ocr}" for _ in range(frames))
+framed_body_ocrs = [(model, spoil(body_ocr))
+                    for model, body_ocr in body_ocrs[:args.samples // frames]
+                    for _ in range(frames)]
+for name, parse in (("uncached", uncached), ("cached", lambda parse: parse)):
+    hits, misses = lang.bind_cache.hits, lang.bind_cache.misses
+    fuzzy_calendar_parser = MapScreenCalendarFuzzyParser(date_model, timeofday_model, decode=False)
+    measure(f"fuzzy calendar {name}", parse(fuzzy_calendar_parser.calendar), framed_calendar_ocrs)
+    framed_body_parser = ModelFuzzyParser(score_cutoff=80)
+    measure(f"body {name}",
+            parse(lambda model_ocr: framed_body_parser.bounds(*model_ocr).bounds),
+            framed_body_ocrs)
+print(f"Bind cache: {lang.bind_cache.hits - hits} hits, {lang.bind_cache.misses - misses} misses while cached")
+
+title_parser = DialogScreenTitleFuzzyParser(lang)
+titles = list(is_troop_key.lang(lang).values())
+title_ocrs = [spoil(str(rnd.choice(titles))) for _ in range(args.samples)]
+measure("title", title_parser.keys, title_ocrs)
+measure("title again", title_parser.keys, title_ocrs)
+
+# NGramIndex shortlisting against scoring all the troop titles
+plain_titles = FuzzyChoices(is_troop_key.lang(lang))
+indexed_titles = FuzzyChoices(is_troop_key.lang(lang), indexed=True)
+for name, choices in (("plain", plain_titles), ("indexed", indexed_titles)):
+    measure(f"{name} titles",
+            lambda ocr: choices.scores(ocr, scorer=fz.fuzz.token_set_ratio, score_cutoff=75).any(),
+            title_ocrs)
+print("same title scores:", all(np.array_equal(plain_titles.scores(ocr, fz.fuzz.token_set_ratio, 75),
+                                               indexed_titles.scores(ocr, fz.fuzz.token_set_ratio, 75))
+                                for ocr in title_ocrs))
@@ -0,0 +1,61 @@
+"""Memory and time of building dialog body and calendar models and their spread values
+
+Usage: lang_values_memory_benchmark.py
+For en and ru languages the dialog body and date models are built and then all the values
+of all their models are spread by their spreadings (as the fuzzy parsing did before templates).
+Retained memory is measured by tracemalloc, times without tracing
+(both with freshly loaded languages, so the values are parsed by the building).
+"""
+import gc
+import logging
+import time
+import tracemalloc
+
+from wa_language import Language
+from wa_language.LangVar import PlayerSex
+from wa_language.LanguageModel import LanguageModel
+from wa_model import calendar_model
+from wa_model.dialog_model.DialogBodyModel import DialogBodyModel
+from wa_types import LanguageCode
+
+# warnings of the language loading are not the subject of the benchmark
+logging.disable(logging.WARNING)
+
+
+def build_models(language_code):
+    lang = Language.load(language_code)
+    body_model = DialogBodyModel(lang, None, PlayerSex.MALE)
+    models = {id(model): model for model in body_model.values()}
+    date_model = LanguageModel(calendar_model.date_model, lang)
+    models[id(date_model)] = date_model
+    return tuple(models.values())
+
+
+def spread_values(models):
+    return [list(value.spread(model[key]))
+            for model in models
+            for key, value in model.language.items()]
+
+
+def measure(function, *args):
+    gc.collect()
+    start = time.perf_counter()
+    function(*args)
+    duration = time.perf_counter() - start
+    gc.collect()
+    tracemalloc.start()
+    result = function(*args)
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, duration, size
+
+
+for language_code in (LanguageCode.EN, LanguageCode.RU):
+    models, models_duration, models_size = measure(build_models, language_code)
+    _, lang_duration, lang_size = measure(Language.load, language_code)
+    values, spread_duration, spread_size = measure(spread_values, models)
+    print(f"{language_code}: models {(models_duration - lang_duration) * 1000:.0f} ms "
+          f"{(models_size - lang_size) / 2 ** 20:.1f} MiB, "
+          f"{sum(len(key_values) for key_values in values)} spread values "
+          f"{spread_duration * 1000:.0f} ms {spread_size / 2 ** 20:.1f} MiB")
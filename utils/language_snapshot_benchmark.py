@@ -0,0 +1,59 @@
+"""Time of language loading from csv files (cold start) and from a language snapshot (warm start)
+
+Usage: language_snapshot_benchmark.py [--repeats N]
+Loading of csv files is measured by one thread and by the thread pool of the loader.
+Snapshots are saved to a temporary directory instead of path_conf.language_snapshots.
+Time of building the dialog body model from a loaded language is given for reference,
+it's the same for both starts.
+"""
+import argparse
+import logging
+from os import path
+import tempfile
+import time
+
+import path_conf
+from wa_language import Language, loader
+from wa_language.LangVar import PlayerSex
+from wa_model.dialog_model.DialogBodyModel import DialogBodyModel
+from wa_types import LanguageCode
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--repeats", type=int, default=5)
+args = parser.parse_args()
+# warnings of loading are not printed, but still recorded to snapshots
+language_logger = logging.getLogger("wa_language")
+language_logger.addHandler(logging.NullHandler())
+language_logger.propagate = False
+
+
+def measure(load) -> float:
+    durations = []
+    for _ in range(args.repeats):
+        start = time.perf_counter()
+        load()
+        durations.append(time.perf_counter() - start)
+    return min(durations)
+
+
+with tempfile.TemporaryDirectory() as snapshots_path:
+    path_conf.language_snapshots = snapshots_path
+    for language_code in (LanguageCode.EN, LanguageCode.RU):
+        file_paths = loader.find_files(path.join(path_conf.language, str(language_code)))
+        serial = measure(lambda: loader.load_files(*file_paths, max_workers=1))
+        threads = measure(lambda: loader.load_files(*file_paths))
+        print(f"{language_code}: {len(file_paths)} csv files, "
+              f"one thread {serial * 1000:.0f} ms, thread pool {threads * 1000:.0f} ms")
+        cold = measure(lambda: Language.load(language_code, snapshot=False))
+        start = time.perf_counter()
+        lang = Language.load(language_code)
+        build = time.perf_counter() - start
+        warm = measure(lambda: Language.load(language_code))
+        start = time.perf_counter()
+        DialogBodyModel(lang, None, PlayerSex.MALE)
+        body_model = time.perf_counter() - start
+        print(f"{language_code}: {len(lang)} values, "
+              f"cold {cold * 1000:.0f} ms, "
+              f"cold with saving snapshot {build * 1000:.0f} ms, "
+              f"warm {warm * 1000:.0f} ms, "
+              f"body model {body_model * 1000:.0f} ms")
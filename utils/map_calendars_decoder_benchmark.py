@@ -0,0 +1,104 @@
+"""Time and accuracy of calendar parsing with MapScreenCalendarDecoder against fuzzy parsing of calendar models
+
+Usage: map_calendars_decoder_benchmark.py [--samples N] [--typos N]
+Calendar OCR results and expected dates are taken from metas of the map_calendars dataset
+(images and Tesseract are not needed). Without the datasets the calendars of en and ru languages
+spoiled by random typos are parsed, fuzzy parsing results are expected for them.
+"""
+import argparse
+from collections import defaultdict
+import logging
+import random
+import time
+
+import path_conf
+from wa_language import Language
+from wa_language.LanguageModel import LanguageModel
+from wa_model import calendar_model
+from wa_model.calendar_model import YEAR_VAR, DAY_VAR
+from wa_types import LanguageCode
+from wa_screen_manager.MapScreen.MapScreenCalendarDecoder import MapScreenCalendarDecoder
+from wa_screen_manager.MapScreen.MapScreenCalendarFuzzyParser import MapScreenCalendarFuzzyParser, SCORE_CUTOFF
+from wa_screen_manager.MapScreen.MapScreenEvent import DateTimeofday
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--samples", type=int, default=1000)
+parser.add_argument("--typos", type=int, default=2)
+args = parser.parse_args()
+# best matches with different texts are expected for spoiled OCR results
+logging.disable(logging.WARNING)
+
+rnd = random.Random(0)
+
+
+def spoil(text: str) -> str:
+    chars = list(text)
+    for _ in range(rnd.randint(0, args.typos)):
+        if chars:
+            chars[rnd.randrange(len(chars))] = rnd.choice("abcdefghij 1")
+    return "".join(chars)
+
+
+def models(language_code: LanguageCode):
+    lang = Language.load(language_code)
+    return (LanguageModel(calendar_model.date_model, lang),
+            LanguageModel(calendar_model.timeofday_model, lang))
+
+
+def dataset_samples():
+    from wa_datasets.MapCalendarsDataset import (MapCalendarsDataset,
+                                                 VERIFICATION_SCREEN_TEARING,
+                                                 VERIFICATION_FALSE_NEGATIVE)
+    samples = defaultdict(list)
+    for meta in MapCalendarsDataset(lazy_load=True).meta_dict.values():
+        if meta.verification in (VERIFICATION_SCREEN_TEARING, VERIFICATION_FALSE_NEGATIVE):
+            continue
+        expected = (None if meta.date_key is None else
+                    DateTimeofday(date_key=meta.date_key,
+                                  year=meta.year,
+                                  day=meta.day,
+                                  timeofday_key=meta.timeofday_key))
+        samples[LanguageCode(meta.language)].append((meta.calendar_ocr, expected))
+    return samples
+
+
+def synthetic_samples():
+    samples = {}
+    for language_code in (LanguageCode.EN, LanguageCode.RU):
+        date_model, timeofday_model = models(language_code)
+        fuzzy_parser = MapScreenCalendarFuzzyParser(date_model, timeofday_model, decode=False)
+        calendar_ocrs = []
+        for _ in range(args.samples):
+            date = (rnd.choice(list(date_model.language.values()))
+                    .bind(YEAR_VAR, rnd.randint(1257, 1277))
+                    .bind(DAY_VAR, rnd.randint(1, 31)))
+            timeofday = rnd.choice(list(timeofday_model.language.values()))
+            calendar_ocrs.append(f"{spoil(str(date))}\n{spoil(str(timeofday))}")
+        samples[language_code] = [(calendar_ocr, fuzzy_parser.calendar(calendar_ocr))
+                                  for calendar_ocr in calendar_ocrs]
+    return samples
+
+
+if path_conf.datasets:
+    print("map_calendars dataset")
+    samples_by_language = dataset_samples()
+else:
+    print(f"Synthetic calendars with up to {args.typos} typos, fuzzy parsing results are expected")
+    samples_by_language = synthetic_samples()
+
+for language_code, samples in samples_by_language.items():
+    date_model, timeofday_model = models(language_code)
+    decoder = MapScreenCalendarDecoder(date_model, timeofday_model, score_cutoff=SCORE_CUTOFF)
+    decoded = sum(1 for calendar_ocr, _ in samples
+                  if len(calendar_ocr.split("\n")) == 2 and decoder.date(calendar_ocr.split("\n")[0]) is not None)
+    print(f"{language_code}: {decoded} of {len(samples)} dates are decoded")
+    for name, decode in (("fuzzy", False), ("decoder", True)):
+        parser = MapScreenCalendarFuzzyParser(date_model, timeofday_model, decode=decode)
+        # warm up caches of the models
+        parser.calendar(samples[0][0])
+        start = time.perf_counter()
+        results = [parser.calendar(calendar_ocr) for calendar_ocr, _ in samples]
+        duration = time.perf_counter() - start
+        correct = sum(1 for result, (_, expected) in zip(results, samples) if result == expected)
+        print(f"{language_code} {name:>7}: {duration / len(samples) * 1000:.3f} ms per calendar, "
+              f"{correct} of {len(samples)} as expected")
@@ -0,0 +1,32 @@
+"""End-to-end throughput of GameScreenManager on a replayed session
+
+Usage: replay_benchmark.py PATH [--repeat N] [--pipelined]
+PATH is a directory of screenshots or a video file.
+Frames are repeated to be recognized as still screenshots (GameScreenManager.stable_screenshots by default).
+"""
+import argparse
+import time
+
+from wa_screen_manager.GameScreenManager import GameScreenManager
+from wa_screen_manager.FrameSource import ArrayFrameSource, DirectoryFrameSource, VideoFrameSource
+
+parser = argparse.ArgumentParser()
+parser.add_argument("path")
+parser.add_argument("--repeat", type=int, default=None)
+parser.add_argument("--pipelined", action="store_true")
+parser.add_argument("--language", default=None)
+args = parser.parse_args()
+
+# load frames in advance to measure processing only
+try:
+    frames = list(DirectoryFrameSource(args.path))
+except NotADirectoryError:
+    frames = list(VideoFrameSource(args.path))
+game_screen_manager = GameScreenManager(None, None, None, args.language)
+source = ArrayFrameSource(frames, repeat=args.repeat or game_screen_manager.stable_screenshots)
+start = time.perf_counter()
+game_screen_manager.run(source, pipelined=args.pipelined)
+duration = time.perf_counter() - start
+print(f"{len(source)} frames in {duration:.2f} s: {len(source) / duration:.1f} fps")
+if game_screen_manager.pipeline is not None:
+    print(f"Pipeline: {game_screen_manager.pipeline}")
@@ -0,0 +1,68 @@
+"""Routing cost of ScreenRegistry against the number of registered screens
+
+Usage: screen_registry_benchmark.py [--screens 2 4 8 16 32] [--number N]
+Screens are synthesized from the map screen blank: every screen has its own painted sample boxes.
+The registry is compared with trying the screen samplers one by one,
+the way screens were matched before the registry.
+"""
+import argparse
+import timeit
+
+import cv2
+import numpy as np
+
+from wa_types import Box
+from wa_screen_manager import config
+from wa_screen_manager.BaseScreen.BaseSampler import BaseSampler
+from wa_screen_manager.MapScreen.map_screen_config import map_screen_blank_img_path
+from wa_screen_manager.SampleMatch import SampleMatch
+from wa_screen_manager.ScreenRegistry import ScreenRegistry
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--screens", type=int, nargs="+", default=[2, 4, 8, 16, 32])
+parser.add_argument("--number", type=int, default=1000)
+args = parser.parse_args()
+
+
+class Manager:
+    """Screen manager without processing to measure routing only"""
+    def __init__(self, screen_sampler):
+        self.screen_sampler = screen_sampler
+
+    def process(self, img, screen_sample_matches=None):
+        if screen_sample_matches is None:
+            screen_sample_matches = self.screen_sampler.check(img)
+        return screen_sample_matches
+
+
+def trial_and_error(managers, img):
+    for manager in managers:
+        if manager.process(img) is not SampleMatch.FAIL:
+            return True
+    return False
+
+
+blank = cv2.imread(map_screen_blank_img_path)
+rng = np.random.default_rng(0)
+width, height = config.resolution
+managers = []
+screenshots = {}
+for idx in range(max(args.screens)):
+    # a screen is recognized by two groups of boxes like the real screens
+    boxes = [Box(left, top, left + 64, top + 6)
+             for left, top in zip(rng.integers(0, width - 64, 4), rng.integers(0, height - 6, 4))]
+    sample = blank.copy()
+    for box in boxes:
+        sample[box.slice] = rng.integers(0, 256, (box.b - box.t, box.r - box.l, 3), dtype=np.uint8)
+    managers.append(Manager(BaseSampler(sample, config.resolution, (tuple(boxes[:2]), tuple(boxes[2:])))))
+    screenshots[idx] = sample
+
+print(f"{'screens':>8} {'frame':>8} {'registry, us':>13} {'one by one, us':>15}")
+for screens in args.screens:
+    registry = ScreenRegistry(managers[:screens])
+    for frame, img in (("last", screenshots[screens - 1]), ("unknown", blank)):
+        assert registry.process(img) == trial_and_error(managers[:screens], img)
+        registry_time = timeit.timeit(lambda: registry.process(img), number=args.number) / args.number
+        one_by_one_time = timeit.timeit(lambda: trial_and_error(managers[:screens], img),
+                                        number=args.number) / args.number
+        print(f"{screens:>8} {frame:>8} {registry_time * 1e6:>13.1f} {one_by_one_time * 1e6:>15.1f}")
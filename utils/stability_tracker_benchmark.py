@@ -0,0 +1,55 @@
+"""Time of tracking stability of OCR crops per frame: StabilityTracker against np.array_equal of crops
+
+Usage: stability_tracker_benchmark.py [--repeats N]
+The baseline compares the crop with the previous crop (a view of the previous screenshot) by np.array_equal.
+The crops are cut from a random full HD BGR screenshot by the crop boxes of the dialog and map screen OCRs.
+A stable frame is the same crop again, a changing frame is a crop with one changed row
+(the worst case for the subsample: the full comparison is done) or with all the rows changed.
+"""
+import argparse
+import timeit
+
+import numpy as np
+
+from wa_screen_manager.BaseScreen.StabilityTracker import StabilityTracker
+from wa_screen_manager.DialogScreen import dialog_screen_config
+from wa_screen_manager.MapScreen import map_screen_config
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--repeats", type=int, default=200)
+args = parser.parse_args()
+
+rng = np.random.default_rng(0)
+screenshots = [rng.integers(0, 256, (1080, 1920, 3), dtype=np.uint8) for _ in range(2)]
+
+
+def measure(update, crops) -> float:
+    """Time of updating by the last crop after the previous ones"""
+    def run():
+        for crop in crops:
+            update(crop)
+    return min(timeit.repeat(run, number=args.repeats, repeat=5)) / args.repeats / len(crops)
+
+
+for name, box in (("body", dialog_screen_config.body_box),
+                  ("title", dialog_screen_config.title_box),
+                  ("relation", dialog_screen_config.relation_box),
+                  ("calendar", map_screen_config.map_calendar_box)):
+    crop = screenshots[0][box.slice]
+    row_changed = crop.copy()
+    row_changed[crop.shape[0] // 2 + 1] ^= 1
+    all_changed = screenshots[1][box.slice]
+    for frames_name, crops in (("stable", (crop, crop)),
+                               ("row changed", (crop, row_changed)),
+                               ("all changed", (crop, all_changed))):
+        prev_crop = [None]
+
+        def baseline(img):
+            equal = np.array_equal(img, prev_crop[0])
+            prev_crop[0] = img
+            return equal
+
+        tracker = StabilityTracker()
+        print(f"{name} {crop.shape[1]}x{crop.shape[0]}, {frames_name}: "
+              f"array_equal {measure(baseline, crops) * 1e6:.0f} us, "
+              f"tracker {measure(tracker.update, crops) * 1e6:.0f} us")
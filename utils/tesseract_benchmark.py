@@ -0,0 +1,41 @@
+"""Tesseract engines benchmark: the persistent C API engine vs pytesseract
+
+Recognizes rendered calendar-like lines with every available engine.
+Set TESSDATA_PREFIX and LIBTESSERACT if tesseract is not installed to the default locations.
+"""
+import time
+
+import cv2
+import numpy as np
+
+from wa_config import screen_conf
+from wa_types import LanguageCode
+from wa_screen_manager.BaseScreen.TesseractEngine import tesseract_engine
+
+LINES = ("January 3, 1257", "Morning", "February 28, 1261", "Evening")
+ROUNDS = 20
+
+
+def render(text: str) -> np.ndarray:
+    img = np.full((60, 500), 255, dtype=np.uint8)
+    cv2.putText(img, text, (10, 45), cv2.FONT_HERSHEY_SIMPLEX, 1.2, 0, 2)
+    return img
+
+
+images = [render(line) for line in LINES]
+whitelist = screen_conf.ALPHABET[LanguageCode.EN] + screen_conf.PUNCTUATION + screen_conf.DIGITS
+for backend in ("capi", "pytesseract"):
+    try:
+        start = time.perf_counter()
+        engine = tesseract_engine("eng", whitelist, backend=backend)
+        texts = [engine.ocr(img).strip() for img in images]
+        first = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            for img in images:
+                engine.ocr(img)
+        duration = (time.perf_counter() - start) / (ROUNDS * len(images))
+    except Exception as error:
+        print(f"{backend:12}: unavailable ({error!r})")
+        continue
+    print(f"{backend:12}: first round {first * 1000:.0f} ms, then {duration * 1000:.1f} ms per image, {texts}")
@@ -1,6 +1,7 @@
 #!/usr/bin/python3
 
 import argparse
+import json
 import logging
 import os
 import sys
@@ -14,6 +15,10 @@ logging.basicConfig(format="%(asctime)s %(levelname)s %(name)s : %(message)s")
 import path_conf
 from wa_language.LangVar import PlayerSex
 from wa_screen_manager.GameScreenManager import GameScreenManager
+from wa_screen_manager.FrameSource import DirectoryFrameSource, VideoFrameSource
+from wa_screen_manager.BatchAnalyzer import BatchAnalyzer
+from wa_screen_manager.CaptureScheduler import CaptureScheduler
+from wa_screen_manager.BaseScreen.OCRCache import ocr_cache
 import wa_screen_manager, wa_datasets, wa_language
 
 
@@ -27,9 +32,24 @@ def main(args):
     game_Screen_manager = GameScreenManager(player_name=args.playername,
                                             player_sex=args.playersex,
                                             datasets=args.datasets if path_conf.datasets else None,
-                                            language_code = args.language_code)
+                                            language_code = args.language_code,
+                                            glyphs=args.glyphs,
+                                            parallel_ocr=args.parallel_ocr)
     # run
-    monitor = args.monitor
+    if args.replay is None:
+        source = args.monitor
+    elif os.path.isdir(args.replay):
+        # still screenshots have to be shown several times to be stable for OCRs
+        source = DirectoryFrameSource(args.replay, repeat=game_Screen_manager.stable_screenshots)
+    else:
+        source = VideoFrameSource(args.replay)
+    ocr_cache_path = None
+    if args.ocr_cache:
+        if path_conf.datasets:
+            ocr_cache_path = os.path.join(path_conf.datasets, "ocr_cache", "ocr_cache.json")
+            ocr_cache.load(ocr_cache_path)
+        else:
+            print("OCR cache persistence OFF (absent datasets path)")
     if args.datasets:
         if path_conf.datasets:
             print("START", "datasets:", ", ".join(args.datasets))
@@ -38,10 +58,36 @@ def main(args):
     else:
         print("START", "datasets", "OFF")
     try:
-        game_Screen_manager.run(monitor)
+        game_Screen_manager.run(source,
+                                pipelined=args.pipelined,
+                                ring_size=args.ring_size,
+                                regions=args.regions,
+                                min_interval=args.min_interval,
+                                max_interval=args.max_interval)
     except KeyboardInterrupt:
         print("\b\b  \b\b", end="")
         print("STOP")
+    finally:
+        if ocr_cache_path is not None:
+            ocr_cache.save(ocr_cache_path)
+
+
+def analyze(args):
+    log_level = logging.DEBUG if args.verbose else logging.INFO
+    logging.getLogger(wa_screen_manager.__name__).setLevel(log_level)
+    logging.getLogger(__name__).setLevel(log_level)
+    file_paths = DirectoryFrameSource(args.dir).paths
+    analyzer = BatchAnalyzer(language_code=args.language_code,
+                             player_name=args.playername,
+                             player_sex=args.playersex,
+                             jobs=args.jobs)
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for record in analyzer.analyze(file_paths):
+            print(json.dumps(record, ensure_ascii=False), file=output)
+    finally:
+        if output is not sys.stdout:
+            output.close()
 
 
 class UniqueOnceAction(argparse.Action):
@@ -75,6 +121,45 @@ parser.add_argument("-p", "--player",
                     dest='playername', action="append", type=str, default=[],
                     help="A player name",
                     metavar="'Sid Neil'")
+parser.add_argument("-pl", "--pipelined",
+                    action="store_true",
+                    help="Capture screenshots within a separate thread while the previous one is being processed. "
+                         "Stale screenshots are dropped.")
+parser.add_argument("--ring-size",
+                    type=int, default=2,
+                    help="The number of captured screenshots kept in memory in the pipelined mode (default is 2).",
+                    metavar="2")
+parser.add_argument("-roi", "--regions",
+                    action="store_true",
+                    help="Capture the screen samplers' regions first "
+                         "and capture the regions to be recognized only if a screen sampler matches. "
+                         "Ignored if a dataset is processed (datasets save full screenshots).")
+parser.add_argument("--min-interval",
+                    type=float, default=CaptureScheduler.MIN_INTERVAL,
+                    help="The interval between screen captures in seconds while a screen is recognized "
+                         f"(default is {CaptureScheduler.MIN_INTERVAL}, i.e. the full rate).",
+                    metavar=str(CaptureScheduler.MIN_INTERVAL))
+parser.add_argument("--max-interval",
+                    type=float, default=CaptureScheduler.MAX_INTERVAL,
+                    help="The longest interval between screen captures in seconds. "
+                         "While no screen is recognized the interval grows exponentially up to it "
+                         f"(default is {CaptureScheduler.MAX_INTERVAL}).",
+                    metavar=str(CaptureScheduler.MAX_INTERVAL))
+parser.add_argument("--replay",
+                    type=str,
+                    help="Process a directory of screenshots or a video file instead of capturing a monitor.",
+                    metavar="PATH")
+parser.add_argument("--ocr-cache",
+                    action="store_true",
+                    help="Load OCR results cache from the datasets path at start and save it at stop.")
+parser.add_argument("--parallel-ocr",
+                    action="store_true",
+                    help="Recognize title, body and relation of a dialog screen concurrently. "
+                         "A new dialog is dispatched once with its body instead of without a body first.")
+parser.add_argument("--glyphs",
+                    action="store_true",
+                    help="Recognize calendars and relations by glyph atlases before Tesseract. "
+                         "Atlases are built from the datasets by utils/build_glyph_atlas.py.")
 parser_sex_group = parser.add_mutually_exclusive_group()
 parser_sex_group.add_argument('-male', '--male',
                               dest='playersex', action='store_const', const=PlayerSex.MALE,
@@ -90,6 +175,21 @@ parser_language_code_group.add_argument('-ru', '--ru',
                                         dest='language_code', action='store_const', const='ru',
                                         help='ru language')
 parser.set_defaults(func=main)
+subparsers = parser.add_subparsers()
+parser_analyze = subparsers.add_parser("analyze",
+                                       help="Analyze a directory of screenshots offline "
+                                            "and write screen events as JSON lines in the order of file names.")
+parser_analyze.add_argument("dir",
+                            help="A directory of screenshots.")
+parser_analyze.add_argument("-o", "--output",
+                            type=str,
+                            help="An output JSONL file (default is stdout).",
+                            metavar="events.jsonl")
+parser_analyze.add_argument("-j", "--jobs",
+                            type=int,
+                            help="The number of worker processes (default is the number of CPUs).",
+                            metavar="4")
+parser_analyze.set_defaults(func=analyze)
 
 
 if __name__ == "__main__":
@@ -100,6 +200,18 @@ if __name__ == "__main__":
     if sys_args.playername is not None and len(sys_args.playername) > 1:
         parser.error("argument -p/--player cannot be specified twice.")
     sys_args.playername = sys_args.playername[0] if sys_args.playername else None
+    if sys_args.ring_size < 1:
+        parser.error("argument --ring-size must be positive.")
+    if sys_args.min_interval < 0:
+        parser.error("argument --min-interval cannot be negative.")
+    if sys_args.max_interval < sys_args.min_interval:
+        parser.error("argument --max-interval cannot be less than --min-interval.")
+    if getattr(sys_args, "dir", None) is not None and not os.path.isdir(sys_args.dir):
+        parser.error(f"argument dir: Not a directory: '{sys_args.dir}'")
+    if getattr(sys_args, "jobs", None) is not None and sys_args.jobs < 1:
+        parser.error("argument -j/--jobs must be positive.")
+    if sys_args.replay is not None and not os.path.exists(sys_args.replay):
+        parser.error(f"argument --replay: No such file or directory: '{sys_args.replay}'")
     if sys_args.datasets is None:
         sys_args.datasets = []
     elif len(sys_args.datasets) == 0: